@@ -0,0 +1,5 @@
+import sys
+
+from benchmarks.parser_benchmark import main
+
+sys.exit(main())
@@ -0,0 +1,84 @@
+import json
+import os
+import random
+
+"""
+Benchmark corpus.
+
+The corpus is built from the inputs the tests use, the inputs of the JSON fixtures in tests/fixtures and synthetic
+long inputs. Everything is generated locally and deterministically, so runs on different days and machines parse
+the same utterances.
+"""
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures')
+
+# The inputs of tests/test_parser.py
+TEST_INPUTS = (
+    'SAH5KSEHSFUHL',
+    'PREHNTIHS',
+    'AENIHZAAGAEMAXS',
+    '/HEHLOW , MAY NEYM IHZ SAEM.',
+    'IHZ KAORREHKT, PLEY5 AXGEH4N? AOR DUW YUW PRIY4FER PAONX?',
+    'JAH5ST TEHSTIHNX',
+    'WAH4N ZIY4ROW POYNT FAY4V PERSEH4NT',
+    'WAH4N  TUW4  THRIY4  FOH4R  FAY4V  SIH4KS  ZIY4ROW POYNT FAY4V, AY4 KAEN KAWNT',
+    'KAHMPYUWTER',
+    '/HEHLOW',
+    'WIHZAA5RD',
+)
+
+# Words the synthetic inputs are made of
+WORDS = (
+    'SAH5KSEHSFUHL', 'PREHNTIHS', '/HEHLOW', 'MAY', 'NEYM', 'IHZ', 'SAEM', 'KAORREHKT', 'PLEY5', 'AXGEH4N',
+    'AOR', 'DUW', 'YUW', 'PRIY4FER', 'PAONX', 'JAH5ST', 'TEHSTIHNX', 'WAH4N', 'ZIY4ROW', 'POYNT', 'FAY4V',
+    'PERSEH4NT', 'KAHMPYUWTER', 'WIHZAA5RD', 'OY5L', 'KAW', 'CHUW', 'MEHDUL',
+)
+
+# The lengths of the synthetic inputs, in characters
+SYNTHETIC_LENGTHS = (1000, 10000)
+
+
+def fixture_inputs(path=FIXTURES_PATH):
+    """
+    :param path: The folder of the JSON fixtures
+    :return: List of the 'input' strings of all fixtures, in file name order
+    """
+    inputs = []
+    for file_name in sorted(os.listdir(path)):
+        if not file_name.endswith('.json'):
+            continue
+        with open(os.path.join(path, file_name), 'r') as json_file:
+            inputs.extend(test['input'] for test in json.load(json_file))
+    return inputs
+
+
+def synthetic_input(length, seed=0):
+    """
+    Make a long input of random words. Clauses are short and end with punctuation, so the breath groups stay within
+    the limits of insert_breath.
+
+    :param length: The minimum number of characters
+    :param seed: Seed of the random generator
+    :return: String of phonemes
+    """
+    rng = random.Random(seed)
+    clauses = []
+    size = 0
+    while size < length:
+        clause = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))) + rng.choice((', ', '. ', '? '))
+        clauses.append(clause)
+        size += len(clause)
+    return ''.join(clauses)
+
+
+def build_corpus(synthetic_lengths=SYNTHETIC_LENGTHS, fixtures_path=FIXTURES_PATH):
+    """
+    :param synthetic_lengths: The lengths of the synthetic inputs to add
+    :param fixtures_path: The folder of the JSON fixtures, None to leave them out
+    :return: List of distinct input strings
+    """
+    corpus = list(TEST_INPUTS)
+    if fixtures_path is not None:
+        corpus.extend(fixture_inputs(fixtures_path))
+    corpus.extend(synthetic_input(length, seed) for seed, length in enumerate(synthetic_lengths))
+    return list(dict.fromkeys(corpus))
@@ -0,0 +1,213 @@
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from common.constants import END
+from parser_engine.parser import parser, parser1, STAGES
+from parser_engine.phoneme_buffer import PhonemeBuffer
+from benchmarks.corpus import build_corpus
+
+"""
+Parser benchmark.
+
+Every stage of parser() is timed on its own: each utterance is run through parser1 and the STAGES one by one, and the
+time of every stage is summed over the corpus. parser() is timed end to end in a separate pass. A round parses the
+whole corpus, the best of all rounds is reported, so a background task slowing down one round does not count.
+
+The results are written as JSON. Given the JSON of an earlier run, the benchmark fails when a stage got slower by more
+than the threshold.
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --baseline results.json --threshold 0.2
+"""
+
+FORMAT_VERSION = 1
+
+# The names results are reported under, in pipeline order
+STAGE_NAMES = ('parser1',) + tuple(name for name, _ in STAGES) + ('parser',)
+
+"""
+A stage that got slower than allowed
+
+Args:
+    stage (str): The stage name
+    baseline (float): Microseconds per utterance of the baseline
+    current (float): Microseconds per utterance of this run
+    change (float): The relative change, 0.25 is 25% slower
+"""
+Regression = namedtuple('Regression', ['stage', 'baseline', 'current', 'change'])
+
+
+def prepare_corpus(corpus):
+    """
+    Drop the inputs parser() fails on, so every round runs the same work.
+
+    :param corpus: List of input strings
+    :return: Tuple of (list of usable inputs, total number of output phonemes, number of dropped inputs)
+    """
+    inputs = []
+    phonemes = 0
+    for input_string in corpus:
+        try:
+            result = parser(input_string)
+        except Exception:
+            result = False
+        if not result:
+            continue
+        inputs.append(input_string)
+        phonemes += len(result) - 1  # without END
+    return inputs, phonemes, len(corpus) - len(inputs)
+
+
+def time_stages(inputs):
+    """
+    Run the inputs through the stages once.
+
+    :param inputs: List of input strings
+    :return: Dictionary of stage name -> seconds spent in the stage
+    """
+    clock = time.perf_counter
+    totals = dict.fromkeys(STAGE_NAMES, 0.0)
+    for input_string in inputs:
+        buffer = PhonemeBuffer(len(input_string) + 1)
+        start = clock()
+        parser1(input_string, buffer.append_phoneme, buffer.set_last_stress)
+        buffer.append_phoneme(END)
+        end = clock()
+        totals['parser1'] += end - start
+        for name, run_stage in STAGES:
+            start = clock()
+            run_stage(buffer)
+            end = clock()
+            totals[name] += end - start
+
+    start = clock()
+    for input_string in inputs:
+        parser(input_string)
+    totals['parser'] = clock() - start
+    return totals
+
+
+def run_benchmark(corpus=None, rounds=5):
+    """
+    :param corpus: List of input strings, defaults to build_corpus()
+    :param rounds: The number of times the corpus is parsed
+    :return: Dictionary of results, see format_report() and compare()
+    """
+    if corpus is None:
+        corpus = build_corpus()
+    inputs, phonemes, skipped = prepare_corpus(corpus)
+    if not inputs:
+        raise ValueError('No usable input in the corpus')
+
+    best = dict.fromkeys(STAGE_NAMES, float('inf'))
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            for name, seconds in time_stages(inputs).items():
+                best[name] = min(best[name], seconds)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    stages = {}
+    for name in STAGE_NAMES:
+        seconds = best[name]
+        stages[name] = {
+            'seconds': seconds,
+            'phonemes_per_second': phonemes / seconds if seconds else None,
+            'us_per_utterance': seconds * 1e6 / len(inputs),
+        }
+
+    return {
+        'format': FORMAT_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_implementation() + ' ' + platform.python_version(),
+        'platform': platform.platform(),
+        'rounds': rounds,
+        'corpus': {
+            'utterances': len(inputs),
+            'characters': sum(len(input_string) for input_string in inputs),
+            'phonemes': phonemes,
+            'skipped': skipped,
+        },
+        'stages': stages,
+    }
+
+
+def compare(baseline, current, threshold=0.1):
+    """
+    Find the stages that got slower. Stages missing from either run are ignored.
+
+    :param baseline: Results of the earlier run
+    :param current: Results of this run
+    :param threshold: The allowed relative slowdown, 0.1 allows 10%
+    :return: List of Regression
+    """
+    regressions = []
+    for name, result in current['stages'].items():
+        if name not in baseline.get('stages', {}):
+            continue
+        before = baseline['stages'][name]['us_per_utterance']
+        after = result['us_per_utterance']
+        if before and after > before * (1 + threshold):
+            regressions.append(Regression(name, before, after, after / before - 1))
+    return regressions
+
+
+def format_report(results, regressions=()):
+    """
+    :param results: Results of run_benchmark()
+    :param regressions: List of Regression to mark in the report
+    :return: The results as a text table
+    """
+    corpus = results['corpus']
+    slower = {regression.stage: regression for regression in regressions}
+    lines = [
+        f"{corpus['utterances']} utterances, {corpus['phonemes']} phonemes, best of {results['rounds']} rounds",
+        f"{'stage':<34}{'phonemes/s':>14}{'us/utterance':>14}",
+    ]
+    for name, result in results['stages'].items():
+        line = f"{name:<34}{result['phonemes_per_second'] or 0:>14,.0f}{result['us_per_utterance']:>14.2f}"
+        if name in slower:
+            line += f"  REGRESSION +{slower[name].change:.0%} (was {slower[name].baseline:.2f})"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    """
+    :param argv: The command line arguments, defaults to sys.argv[1:]
+    :return: The exit status, 1 if a stage regressed
+    """
+    argument_parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmark the parser stages')
+    argument_parser.add_argument('--rounds', type=int, default=5, help='the number of rounds, the best is reported')
+    argument_parser.add_argument('--output', help='write the results as JSON to this file')
+    argument_parser.add_argument('--baseline', help='JSON results of an earlier run to compare with')
+    argument_parser.add_argument('--threshold', type=float, default=0.1,
+                                 help='the allowed relative slowdown per stage (default 0.1)')
+    arguments = argument_parser.parse_args(argv)
+
+    results = run_benchmark(rounds=arguments.rounds)
+    regressions = []
+    if arguments.baseline:
+        with open(arguments.baseline, 'r') as json_file:
+            regressions = compare(json.load(json_file), results, arguments.threshold)
+        results['baseline'] = {'path': arguments.baseline, 'threshold': arguments.threshold,
+                               'regressions': [regression._asdict() for regression in regressions]}
+
+    print(format_report(results, regressions))
+    if arguments.output:
+        with open(arguments.output, 'w') as json_file:
+            json.dump(results, json_file, indent=2)
+    if regressions:
+        print(f'{len(regressions)} stage(s) slower than the baseline by more than {arguments.threshold:.0%}',
+              file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,284 @@
+import argparse
+import gc
+import json
+import math
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+
+from common.constants import END
+from parser_engine.parser import parser, parser1, STAGES
+from parser_engine.phoneme_buffer import PhonemeBuffer
+from benchmarks.corpus import synthetic_input
+
+"""
+Scaling harness.
+
+Runs parser() and each of its stages on inputs of growing length and fits the growth exponent k of runtime and peak
+memory, assuming cost ~ n^k for n phonemes. A linear stage has k close to 1, a stage shifting the whole buffer on
+every insertion shows up with k close to 2.
+
+Below about a thousand phonemes the fixed cost of a call dominates, so the exponents are fitted on the larger sizes
+only. Every stage is checked against O(n log n): over the fitted range n log n itself has an exponent slightly above
+1, a stage is flagged when its exponent exceeds that by more than the tolerance.
+
+    python -m benchmarks.scaling
+    python -m benchmarks.scaling --sizes 1000 10000 100000 --json scaling.json
+"""
+
+SIZES = (10, 30, 100, 300, 1000, 3000, 10000, 30000, 100000)
+
+# The smallest size used to fit the exponents
+MIN_FIT_SIZE = 1000
+
+# How much an exponent may exceed the one of n log n
+TOLERANCE = 0.15
+
+# Peaks below this are a few temporary objects, they are raised to it before fitting
+MIN_PEAK_BYTES = 4096
+
+# The names results are reported under, in pipeline order
+STAGE_NAMES = ('parser1',) + tuple(name for name, _ in STAGES) + ('parser',)
+
+"""
+Scaling of one stage
+
+Args:
+    stage (str): The stage name
+    phonemes (list): The number of phonemes of every input
+    seconds (list): The best runtime for every input
+    peak_bytes (list): The peak memory allocated while the stage ran, for every input
+    time_exponent (float): The fitted runtime exponent
+    memory_exponent (float): The fitted peak memory exponent
+    limit (float): The largest exponent accepted
+"""
+StageScaling = namedtuple('StageScaling', [
+    'stage', 'phonemes', 'seconds', 'peak_bytes', 'time_exponent', 'memory_exponent', 'limit'
+])
+
+
+def make_input(size):
+    """
+    :param size: The approximate number of phonemes
+    :return: String of phonemes
+    """
+    return synthetic_input(size, seed=size)
+
+
+def run_stages(input_string, measure):
+    """
+    Run an input through parser1 and the stages.
+
+    :param input_string: The input string
+    :param measure: Context manager factory called with the stage name, wrapped around every stage
+    :return: The PhonemeBuffer after the last stage
+    """
+    buffer = PhonemeBuffer(len(input_string) + 1)
+    with measure('parser1'):
+        parser1(input_string, buffer.append_phoneme, buffer.set_last_stress)
+        buffer.append_phoneme(END)
+    for name, run_stage in STAGES:
+        with measure(name):
+            run_stage(buffer)
+    return buffer
+
+
+class Timer:
+    """
+    Collects the best runtime of every stage over several runs.
+    """
+
+    def __init__(self):
+        self.best = {}
+        self.name = None
+        self.start = 0.0
+
+    def __call__(self, name):
+        self.name = name
+        return self
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        seconds = time.perf_counter() - self.start
+        self.best[self.name] = min(self.best.get(self.name, seconds), seconds)
+
+
+class PeakMemory:
+    """
+    Records the peak memory allocated while each stage runs, on top of what was allocated before it started.
+    tracemalloc has to be tracing.
+    """
+
+    def __init__(self):
+        self.peak = {}
+        self.name = None
+        self.before = 0
+
+    def __call__(self, name):
+        self.name = name
+        return self
+
+    def __enter__(self):
+        tracemalloc.reset_peak()
+        self.before = tracemalloc.get_traced_memory()[0]
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.peak[self.name] = max(tracemalloc.get_traced_memory()[1] - self.before, 0)
+
+
+def measure_size(input_string, repeat):
+    """
+    :param input_string: The input string
+    :param repeat: The number of timed runs, the best is kept
+    :return: Tuple of (number of phonemes, dict of stage name -> seconds, dict of stage name -> peak bytes)
+    """
+    timer = Timer()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            run_stages(input_string, timer)
+            with timer('parser'):
+                result = parser(input_string)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    # A full collection also empties the free lists, the tuples freed by the timed runs would hide allocations
+    gc.collect()
+    memory = PeakMemory()
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        run_stages(input_string, memory)
+        with memory('parser'):
+            parser(input_string)
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    return len(result) - 1, timer.best, memory.peak
+
+
+def fit_exponent(sizes, values):
+    """
+    Least squares fit of log(value) = k * log(size) + c.
+
+    :param sizes: The input sizes
+    :param values: The measured values, all positive
+    :return: The exponent k
+    """
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(value) for value in values]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if not variance:
+        raise ValueError('At least two different sizes are needed to fit an exponent')
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+
+def n_log_n_exponent(sizes):
+    """
+    :param sizes: The input sizes
+    :return: The exponent fit_exponent() finds for a cost of exactly n log n
+    """
+    return fit_exponent(sizes, [size * math.log(size) for size in sizes])
+
+
+def measure_scaling(sizes=SIZES, min_fit_size=MIN_FIT_SIZE, tolerance=TOLERANCE, repeat=None):
+    """
+    :param sizes: The approximate input sizes in phonemes
+    :param min_fit_size: The smallest size used to fit the exponents
+    :param tolerance: How much an exponent may exceed the one of n log n
+    :param repeat: The number of timed runs per size, defaults to more runs for smaller inputs
+    :return: List of StageScaling, in pipeline order
+    """
+    phonemes = []
+    seconds = {name: [] for name in STAGE_NAMES}
+    peak_bytes = {name: [] for name in STAGE_NAMES}
+    for size in sizes:
+        count, best, peak = measure_size(make_input(size), repeat or max(3, min(200, 30000 // size)))
+        phonemes.append(count)
+        for name in STAGE_NAMES:
+            seconds[name].append(best[name])
+            peak_bytes[name].append(peak[name])
+
+    fitted = [i for i, size in enumerate(sizes) if size >= min_fit_size]
+    if len(fitted) < 2:
+        fitted = list(range(len(sizes)))
+    fit_sizes = [phonemes[i] for i in fitted]
+    limit = n_log_n_exponent(fit_sizes) + tolerance
+
+    results = []
+    for name in STAGE_NAMES:
+        time_exponent = fit_exponent(fit_sizes, [max(seconds[name][i], 1e-9) for i in fitted])
+        memory_exponent = fit_exponent(fit_sizes, [max(peak_bytes[name][i], MIN_PEAK_BYTES) for i in fitted])
+        results.append(StageScaling(
+            name, phonemes, seconds[name], peak_bytes[name], time_exponent, memory_exponent, limit
+        ))
+    return results
+
+
+def superlinear_stages(results):
+    """
+    :param results: List of StageScaling
+    :return: List of the StageScaling whose runtime or peak memory grows faster than O(n log n)
+    """
+    return [result for result in results
+            if result.time_exponent > result.limit or result.memory_exponent > result.limit]
+
+
+def format_report(results):
+    """
+    :param results: List of StageScaling
+    :return: The results as a text table, runtime in milliseconds
+    """
+    phonemes = results[0].phonemes
+    flagged = {result.stage for result in superlinear_stages(results)}
+    lines = [
+        f"{'stage':<34}" + ''.join(f'{count:>10}' for count in phonemes)
+        + f"{'time k':>8}{'peak KiB':>10}{'mem k':>8}",
+    ]
+    for result in results:
+        flag = '  SUPERLINEAR' if result.stage in flagged else ''
+        lines.append(
+            f'{result.stage:<34}' + ''.join(f'{seconds * 1e3:>10.3f}' for seconds in result.seconds)
+            + f'{result.time_exponent:>8.2f}{result.peak_bytes[-1] / 1024:>10.1f}{result.memory_exponent:>8.2f}'
+            + flag
+        )
+    lines.append(f'Runtime in ms per phoneme count, k is the fitted exponent, limit {results[0].limit:.2f}')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    """
+    :param argv: The command line arguments, defaults to sys.argv[1:]
+    :return: The exit status, 1 if a stage grows faster than O(n log n)
+    """
+    argument_parser = argparse.ArgumentParser(prog='python -m benchmarks.scaling',
+                                              description='Fit the growth exponents of the parser stages')
+    argument_parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='input sizes in phonemes')
+    argument_parser.add_argument('--min-fit-size', type=int, default=MIN_FIT_SIZE,
+                                 help='the smallest size used to fit the exponents')
+    argument_parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                                 help='how much an exponent may exceed the one of n log n')
+    argument_parser.add_argument('--json', help='write the results as JSON to this file')
+    arguments = argument_parser.parse_args(argv)
+
+    results = measure_scaling(arguments.sizes, arguments.min_fit_size, arguments.tolerance)
+    print(format_report(results))
+    if arguments.json:
+        with open(arguments.json, 'w') as json_file:
+            json.dump([result._asdict() for result in results], json_file, indent=2)
+    if superlinear_stages(results):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+import argparse
+import os
+import subprocess
+import sys
+from collections import namedtuple
+
+"""
+Startup benchmark.
+
+Measures what a short-lived process pays before its first result: importing parser_engine.parser and parsing one
+input, each in a fresh interpreter. The best of several runs is reported, together with the modules that took the
+longest to import according to python -X importtime.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 20 --top 15
+"""
+
+RUNS = 10
+
+# The number of modules listed by import time
+TOP = 10
+
+INPUT = '/HEHLOW, WERLD.'
+
+# Run in the fresh interpreter, prints the import and first parse time in seconds
+SCRIPT = f'''\
+import time
+start = time.perf_counter()
+from parser_engine.parser import parser
+imported = time.perf_counter()
+parser({INPUT!r})
+print(imported - start, time.perf_counter() - imported)
+'''
+
+"""
+Startup cost of a fresh interpreter
+
+Args:
+    import_seconds (float): The best time of `from parser_engine.parser import parser`
+    parse_seconds (float): The best time of the first parse after the import
+    total_seconds (float): The best time of the import plus the first parse
+    modules (list): (cumulative seconds, module name) tuples of the slowest imports, slowest first
+"""
+Startup = namedtuple('Startup', ['import_seconds', 'parse_seconds', 'total_seconds', 'modules'])
+
+
+def run_python(arguments):
+    """
+    :param arguments: The interpreter arguments
+    :return: The completed process, with stdout and stderr as text
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+    return subprocess.run([sys.executable] + arguments, capture_output=True, text=True, check=True, cwd=root,
+                          env=environment)
+
+
+def parse_importtime(output):
+    """
+    :param output: The stderr of python -X importtime
+    :return: Dict of module name -> cumulative import time in seconds
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # The header line
+        modules[fields[2].strip()] = int(fields[1]) / 1e6
+    return modules
+
+
+def measure_startup(runs=RUNS, top=TOP):
+    """
+    :param runs: The number of fresh interpreters timed, the best is kept
+    :param top: The number of slowest imports listed
+    :return: Startup
+    """
+    import_seconds = parse_seconds = total_seconds = float('inf')
+    for _ in range(runs):
+        imported, parsed = map(float, run_python(['-c', SCRIPT]).stdout.split())
+        import_seconds = min(import_seconds, imported)
+        parse_seconds = min(parse_seconds, parsed)
+        total_seconds = min(total_seconds, imported + parsed)
+    modules = parse_importtime(run_python(['-X', 'importtime', '-c', SCRIPT]).stderr)
+    slowest = sorted(((seconds, name) for name, seconds in modules.items()), reverse=True)[:top]
+    return Startup(import_seconds, parse_seconds, total_seconds, slowest)
+
+
+def format_report(startup):
+    """
+    :param startup: Startup
+    :return: The measurement as text, times in milliseconds
+    """
+    lines = [
+        f'import parser_engine.parser {startup.import_seconds * 1e3:8.2f} ms',
+        f'first parse                 {startup.parse_seconds * 1e3:8.2f} ms',
+        f'import and first parse      {startup.total_seconds * 1e3:8.2f} ms',
+        '',
+        'Slowest imports, cumulative:',
+    ]
+    lines.extend(f'{seconds * 1e3:8.2f} ms  {name}' for seconds, name in startup.modules)
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    """
+    :param argv: The command line arguments, defaults to sys.argv[1:]
+    :return: The exit status
+    """
+    argument_parser = argparse.ArgumentParser(prog='python -m benchmarks.startup',
+                                              description='Time the import and first parse in a fresh interpreter')
+    argument_parser.add_argument('--runs', type=int, default=RUNS, help='the number of fresh interpreters timed')
+    argument_parser.add_argument('--top', type=int, default=TOP, help='the number of slowest imports listed')
+    arguments = argument_parser.parse_args(argv)
+
+    print(format_report(measure_startup(arguments.runs, arguments.top)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
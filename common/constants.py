@@ -1,4 +1,2 @@
 BREAK = 254
 END = 255
-
-DEV_MODE = True
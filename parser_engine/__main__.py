@@ -0,0 +1,7 @@
+import sys
+
+from parser_engine.cli import main
+
+# Guarded, the worker processes of --jobs may import this module again
+if __name__ == '__main__':
+    sys.exit(main())
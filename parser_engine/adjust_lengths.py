@@ -1,11 +1,13 @@
-from parser_engine.tables import phoneme_name_table, phoneme_flags
 from common.constants import END
-from parser_engine.constants import (
-    FLAG_PUNCT, FLAG_NASAL, FLAG_LIQUIC, FLAG_FRICATIVE,
-    FLAG_UNVOICED_STOPCONS, FLAG_STOPCONS, FLAG_VOICED,
-    FLAG_CONSONANT, FLAG_VOWEL
+from parser_engine.flag_tables import (
+    IS_PUNCT, IS_NASAL, IS_LIQUIC, IS_FRICATIVE,
+    IS_UNVOICED_STOPCONS, IS_STOPCONS, IS_VOICED,
+    IS_CONSONANT, IS_VOWEL
+)
+from parser_engine.rules import (
+    RULE_LENGTHEN_PUNCT, RULE_VOWEL_RX_LX_CONSONANT, RULE_VOWEL_UNVOICED_PLOSIVE,
+    RULE_VOWEL_VOICED, RULE_NASAL_STOPCONS, RULE_STOPCONS_STOPCONS, RULE_STOPCONS_LIQUID
 )
-from parser_engine.util import phoneme_has_flag, dev_print, matches_bitmask
 
 
 def adjust_lengths(get_phoneme, set_length, get_length):
@@ -25,8 +27,6 @@ def adjust_lengths(get_phoneme, set_length, get_length):
     :param get_length: Callback for getting phoneme length
     :return: None
     """
-    dev_print("adjust_lengths()")
-
     '''
     LENGTHEN VOWELS PRECEDING PUNCTUATION
     
@@ -38,14 +38,14 @@ def adjust_lengths(get_phoneme, set_length, get_length):
     position = 0
     while get_phoneme(position) != END:
         # Not punctuation?
-        if not phoneme_has_flag(get_phoneme(position), FLAG_PUNCT):
+        if not IS_PUNCT[get_phoneme(position)]:
             position += 1
             continue
 
         loop_index = position
         while True:
             position -= 1
-            if position > 1 and (not phoneme_has_flag(get_phoneme(position), FLAG_VOWEL)):
+            if position > 1 and (not IS_VOWEL[get_phoneme(position)]):
                 continue
             else:
                 break
@@ -57,14 +57,10 @@ def adjust_lengths(get_phoneme, set_length, get_length):
         # Now handle everything between position and loop_index
         for vowel in range(position, loop_index):
             # Test for not fricative/unvoiced or not voiced
-            if not phoneme_has_flag(get_phoneme(position), FLAG_FRICATIVE) or phoneme_has_flag(get_phoneme(position), FLAG_VOICED):
+            if not IS_FRICATIVE[get_phoneme(position)] or IS_VOICED[get_phoneme(position)]:
                 A  = get_length(position)
                 # Change phoneme length to (length * 1.5) + 1
-                dev_print(f"{position} RULE: Lengthen <!FRICATIVE> or <VOICED> "
-                          f"{phoneme_name_table[get_phoneme(position)]} between VOWEL:"
-                          f"{phoneme_name_table[get_phoneme(vowel)]} and PUNCTUATION:"
-                          f"{phoneme_name_table[get_phoneme(position)]} by 1.5")
-                set_length(position, (A >> 1) + A + 1)
+                set_length(position, (A >> 1) + A + 1, RULE_LENGTHEN_PUNCT)
             position += 1
         position += 1
 
@@ -81,52 +77,46 @@ def adjust_lengths(get_phoneme, set_length, get_length):
             break
 
         # Vowel?
-        if phoneme_has_flag(phoneme, FLAG_VOWEL):
+        if IS_VOWEL[phoneme]:
             # Get next phoneme
             position += 1
             phoneme = get_phoneme(position)
             # Not a consonant
-            if not phoneme_has_flag(phoneme, FLAG_CONSONANT):
+            if not IS_CONSONANT[phoneme]:
                 # 'RX' or 'LX'?
                 position += 1
-                if (phoneme == 18 or phoneme == 19) and phoneme_has_flag(get_phoneme(position), FLAG_CONSONANT):
+                if (phoneme == 18 or phoneme == 19) and IS_CONSONANT[get_phoneme(position)]:
                     # Followed by consonant?
-                    dev_print(f"{loop_index} RULE: <VOWEL {phoneme_name_table[get_phoneme(loop_index)]}> "
-                              f"{phoneme_name_table[phoneme]} "
-                              f"<CONSONANT: {phoneme_name_table[get_phoneme(position)]}> "
-                              f"- decrease length of vowel by 1")
                     # Decrease length of vowel by 1 frame
-                    set_length(loop_index, get_length(loop_index) - 1)
+                    set_length(loop_index, get_length(loop_index) - 1, RULE_VOWEL_RX_LX_CONSONANT)
                 continue
             # Got here if not <VOWEL>
-            # FIXME: the case when  phoneme == END is taken over by !phoneme_has_flag(phoneme, FLAG_CONSONANT)
-            flags = FLAG_CONSONANT | FLAG_UNVOICED_STOPCONS if phoneme == END else phoneme_flags[phoneme]
+            # FIXME: the case when  phoneme == END is taken over by !IS_CONSONANT[phoneme]
+            # END is treated as FLAG_CONSONANT | FLAG_UNVOICED_STOPCONS
             # Unvoiced
-            if not matches_bitmask(flags, FLAG_VOICED):
+            if not IS_VOICED[phoneme]:
                 # *, .*, ? *, , *, - *, DX, S *, SH, F *, TH, / H, / X, CH, P *, T *, K *, KX
 
                 # Unvoiced plosive
-                if matches_bitmask(flags, FLAG_UNVOICED_STOPCONS):
+                if IS_UNVOICED_STOPCONS[phoneme] or phoneme == END:
                     # RULE: <VOWEL> <UNVOICED PLOSIVE>
                     # <VOWEL> <P*, T*, K*, KX>
-                    dev_print(f"{loop_index} <VOWEL> <UNVOICED PLOSIVE> - decrease vowel by 1/8th")
                     A = get_length(loop_index)
-                    set_length(loop_index, A - (A >> 3))
+                    set_length(loop_index, A - (A >> 3), RULE_VOWEL_UNVOICED_PLOSIVE)
                 continue
 
             # RULE: <VOWEL> <VOWEL or VOICED CONSONANT>
             # < VOWEL > < IY, IH, EH, AE, AA, AH, AO, UH, AX, IX, ER, UX, OH, RX, LX, WX, YX, WH, R *, L *, W *,
             # Y *, M *, N *, NX, Q *, Z *, ZH, V *, DH, J *, EY, AY, OY, AW, OW, UW, B *, D *, G *, GX >
-            dev_print(f"{loop_index} RULE: <VOWEL> <VOWEL or VOICED CONSONANT> - increase vowel by 1/4 + 1")
             A = get_length(loop_index)
-            set_length(loop_index, (A >> 2) + A + 1)  # 5 / 4 * A + 1
+            set_length(loop_index, (A >> 2) + A + 1, RULE_VOWEL_VOICED)  # 5 / 4 * A + 1
             continue
 
         # *, .*, ?*, ,*, -*, WH, R*, L*, W*, Y*, M*, N*, NX, DX, Q*, S*, SH, F*,
         # TH, /H, /X, Z*, ZH, V*, DH, CH, J*, B*, D*, G*, GX, P*, T*, K*, KX
 
         # Nasal?
-        if phoneme_has_flag(phoneme, FLAG_NASAL):
+        if IS_NASAL[phoneme]:
             # RULE: <NASAL> <STOP CONSONANT>
             # Set punctuation length to 6
             # Set stop consonant length to 5
@@ -135,18 +125,17 @@ def adjust_lengths(get_phoneme, set_length, get_length):
             position += 1
             phoneme = get_phoneme(position)
             # Is next phoneme a stop consonant?
-            if phoneme != END and phoneme_has_flag(phoneme, FLAG_STOPCONS):
+            if phoneme != END and IS_STOPCONS[phoneme]:
                 # B*, D*, G*, GX, P*, T*, K*, KX
-                dev_print(f"{position} RULE: <NASAL> <STOP CONSONANT> - set nasal = 5, consonant = 6")
-                set_length(position, 6) # Set stop consonant length to 6
-                set_length(position - 1, 5) # Set nasal length to 5
+                set_length(position, 6, RULE_NASAL_STOPCONS)  # Set stop consonant length to 6
+                set_length(position - 1, 5, RULE_NASAL_STOPCONS)  # Set nasal length to 5
             continue
 
         # *, .*, ? *, , *, - *, WH, R *, L *, W *, Y *, DX, Q *, S *, SH, F *, TH,
         # / H, / X, Z *, ZH, V *, DH, CH, J *, B *, D *, G *, GX, P *, T *, K *, KX
 
         # Stop consonant?
-        if phoneme_has_flag(phoneme, FLAG_STOPCONS):
+        if IS_STOPCONS[phoneme]:
             # B*, D*,  G*, GX
 
             # RULE: <STOP CONSONANT> {optional silence} <STOP CONSONANT>
@@ -157,12 +146,10 @@ def adjust_lengths(get_phoneme, set_length, get_length):
                 if phoneme != 0:
                     break  # Exit the loop when phoneme is not equal to 0
             # If another stop consonant, process
-            if phoneme != END and phoneme_has_flag(phoneme, FLAG_STOPCONS):
+            if phoneme != END and IS_STOPCONS[phoneme]:
                 # RULE: <STOP CONSONANT> {optional silence} <STOP CONSONANT>
-                dev_print(f"{position} RULE: <STOP CONSONANT> {{optional silence}} "
-                          f"<STOP CONSONANT> - shorten both to 1/2 + 1")
-                set_length(position, (get_length(position) >> 1) + 1)
-                set_length(loop_index, (get_length(loop_index) >> 1) + 1)
+                set_length(position, (get_length(position) >> 1) + 1, RULE_STOPCONS_STOPCONS)
+                set_length(loop_index, (get_length(loop_index) >> 1) + 1, RULE_STOPCONS_STOPCONS)
             continue
 
         # *, .*, ? *, , *, - *, WH, R *, L *, W *, Y *, DX, Q *, S *, SH, F *, TH,
@@ -171,13 +158,12 @@ def adjust_lengths(get_phoneme, set_length, get_length):
         # Liquic consonant?
         if (
             position > 0
-            and phoneme_has_flag(phoneme, FLAG_LIQUIC)
-            and phoneme_has_flag(get_phoneme(position - 1), FLAG_STOPCONS)
+            and IS_LIQUIC[phoneme]
+            and IS_STOPCONS[get_phoneme(position - 1)]
         ):
             # R*, L*, W*, Y*
             # RULE: <STOP CONSONANT> <LIQUID>
             #       Decrease <LIQUID> by 2
             # Prior phoneme is a stop consonant
-            dev_print(f"{position} RULE: <STOP CONSONANT> <LIQUID> - decrease by 2")
             # Decrease the phoneme length by 2 frames (20 ms)
-            set_length(position, get_length(position) - 2)
+            set_length(position, get_length(position) - 2, RULE_STOPCONS_LIQUID)
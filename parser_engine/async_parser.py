@@ -0,0 +1,165 @@
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from parser_engine.batch import ParseResult
+from parser_engine.parser import parser
+
+"""
+asyncio front end of the parser.
+
+The parser is CPU bound, AsyncParser runs it on an executor so the event loop keeps serving other requests:
+
+    async with AsyncParser(max_in_flight=8) as async_parser:
+        phonemes = await async_parser.parse_async('/HEHLOW', timeout=0.5)
+        async for result in async_parser.parse_stream(lines):
+            ...
+
+At most max_in_flight inputs are parsed at the same time, further requests wait for a free slot, so a burst of
+requests queues up in the event loop instead of in the executor. Concurrent requests for the same input are merged
+and parsed once. A request that times out or is cancelled stops waiting; the parse itself is cancelled once no
+request waits for it any more, or dropped if it is already running.
+
+A thread executor keeps the loop responsive, a ProcessPoolExecutor (with parser_engine.batch.init_worker as the
+initializer) also uses more than one core.
+"""
+
+
+class AsyncParser:
+    """
+    Runs parser() on an executor with bounded concurrency, deadlines and merging of identical requests.
+
+    Use it from a single event loop. runs counts the inputs handed to the executor, merged the requests that were
+    answered by the parse of another request.
+    """
+
+    def __init__(self, executor=None, max_in_flight=None, timeout=None, function=parser):
+        """
+        :param executor: concurrent.futures.Executor running the parser. Defaults to a thread pool with
+            max_in_flight threads, which is shut down by close()
+        :param max_in_flight: The maximum number of inputs parsed at the same time, defaults to 2 per CPU
+        :param timeout: The default deadline of a request in seconds, None to wait as long as it takes
+        :param function: The parse function, called with the input string. Must be picklable for process pools
+        """
+        if max_in_flight is None:
+            max_in_flight = 2 * (os.cpu_count() or 1)
+        if max_in_flight < 1:
+            raise ValueError('max_in_flight must be at least 1')
+        self.max_in_flight = max_in_flight
+        self.own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_in_flight, thread_name_prefix='async-parser')
+        self.timeout = timeout
+        self.function = function
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.jobs = {}  # input string -> [task, number of waiting requests]
+        self.runs = 0
+        self.merged = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Cancel the pending parses and shut down the default executor.
+        """
+        for task, _ in list(self.jobs.values()):
+            task.cancel()
+        if self.own_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, input_string):
+        """
+        Parse an input on the executor once a slot is free. The slot is held until the executor is done with it,
+        even if the task is cancelled while the parse runs.
+        """
+        await self.semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future = self.executor.submit(self.function, input_string)
+        except BaseException:
+            self.semaphore.release()
+            raise
+        self.runs += 1
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self.semaphore.release))
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    def forget(self, input_string, job):
+        # A finished job is not merged with, later requests for the same input start a new one
+        if self.jobs.get(input_string) is job:
+            del self.jobs[input_string]
+
+    async def parse_async(self, input_string, timeout=None):
+        """
+        Parse a string of phonemes.
+
+        :param input_string: The phonemes, for example "/HEHLOW"
+        :param timeout: The deadline in seconds, defaults to the timeout of the AsyncParser
+        :return: The parser() result. A merged request gets its own copy of a list result
+        :raise TimeoutError: If the deadline passes first
+        """
+        job = self.jobs.get(input_string)
+        merged = job is not None
+        if merged:
+            self.merged += 1
+        else:
+            task = asyncio.ensure_future(self.run(input_string))
+            job = self.jobs[input_string] = [task, 0]
+            task.add_done_callback(lambda _: self.forget(input_string, job))
+        job[1] += 1
+        try:
+            result = await asyncio.wait_for(asyncio.shield(job[0]), self.timeout if timeout is None else timeout)
+        finally:
+            job[1] -= 1
+            if not job[1] and not job[0].done():
+                job[0].cancel()
+        return list(result) if merged and isinstance(result, list) else result
+
+    async def parse_stream(self, inputs, timeout=None):
+        """
+        Parse a stream of inputs, yielding the results in input order.
+
+        At most max_in_flight inputs are taken from the stream ahead of the result being yielded, a slow consumer
+        slows down the reading of the inputs.
+
+        :param inputs: Iterable or async iterable of input strings
+        :param timeout: The deadline of every input in seconds, defaults to the timeout of the AsyncParser
+        :return: Async generator of ParseResult, failed and timed out inputs have the error set
+        """
+        pending = deque()
+
+        async def parse_item(index, input_string):
+            try:
+                return ParseResult(index, input_string, await self.parse_async(input_string, timeout), None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                return ParseResult(index, input_string, None, f"{type(e).__name__}: {e}")
+
+        async def items():
+            if hasattr(inputs, '__aiter__'):
+                async for input_string in inputs:
+                    yield input_string
+            else:
+                for input_string in inputs:
+                    yield input_string
+
+        try:
+            index = 0
+            async for input_string in items():
+                if len(pending) >= self.max_in_flight:
+                    yield await pending.popleft()
+                pending.append(asyncio.ensure_future(parse_item(index, input_string)))
+                index += 1
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,117 @@
+import os
+from collections import namedtuple, deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+from parser_engine.parser import parser
+
+"""
+The result of parsing one input of a batch
+
+Args:
+    index (int): The position of the input in the batch
+    input (str): The input string
+    output (list): The parser() result, a PackedPhonemes for packed batches, None if parsing failed
+    error (str): Description of the exception raised while parsing, None on success
+"""
+ParseResult = namedtuple('ParseResult', ['index', 'input', 'output', 'error'])
+
+
+def parse_item(index, input_string, packed=False):
+    """
+    Parse one input, catching the exception if it fails.
+
+    :param index: The position of the input in the batch
+    :param input_string: The input string
+    :param packed: Return the phonemes as a PackedPhonemes, see packed.py
+    :return: ParseResult
+    """
+    try:
+        return ParseResult(index, input_string, parser(input_string, packed=packed), None)
+    except Exception as e:
+        return ParseResult(index, input_string, None, f"{type(e).__name__}: {e}")
+
+
+def parse_chunk(chunk, packed=False):
+    """
+    Parse a chunk of inputs. Runs in the worker processes.
+
+    :param chunk: List of (index, input string) tuples
+    :param packed: Return the phonemes as PackedPhonemes, which are much cheaper to send back than lists of tuples
+    :return: List of ParseResult
+    """
+    return [parse_item(index, input_string, packed) for index, input_string in chunk]
+
+
+def init_worker():
+    # The tables and stage modules are imported together with this module, so a worker loads them exactly once,
+    # before it receives its first chunk
+    import parser_engine.parser  # noqa: F401
+
+
+def chunked(inputs, chunksize):
+    """
+    Split the inputs into lists of (index, input string) tuples.
+
+    :param inputs: Iterable of input strings
+    :param chunksize: The number of inputs per chunk
+    :return: Generator of chunks
+    """
+    iterator = enumerate(inputs)
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_many(inputs, workers=None, chunksize=64, ordered=True, max_pending=None, packed=False):
+    """
+    Parse many inputs, fanning the work out to a process pool.
+
+    The inputs are consumed lazily and grouped into chunks of `chunksize` inputs, each chunk is one task for the pool.
+    At most `max_pending` chunks are in flight at any time, so memory stays bounded for generators of any length.
+
+    A failing input does not stop the batch, its ParseResult has the error set instead.
+
+    :param inputs: Iterable of input strings
+    :param workers: The number of worker processes, defaults to the number of CPUs. 0 or 1 parses in this process
+    :param chunksize: The number of inputs per task
+    :param ordered: Yield the results in input order. If False, results are yielded as soon as their chunk completes
+    :param max_pending: The maximum number of chunks in flight, defaults to 4 per worker
+    :param packed: Return the phonemes as PackedPhonemes instead of lists of tuples
+    :return: Generator of ParseResult
+    """
+    if chunksize < 1:
+        raise ValueError('chunksize must be at least 1')
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    chunks = chunked(inputs, chunksize)
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield from parse_chunk(chunk, packed)
+        return
+
+    if max_pending is None:
+        max_pending = workers * 4
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        pending = deque(executor.submit(parse_chunk, chunk, packed) for chunk in islice(chunks, max_pending))
+        try:
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                for future in done:
+                    chunk = next(chunks, None)
+                    if chunk is not None:
+                        pending.append(executor.submit(parse_chunk, chunk, packed))
+                    yield from future.result()
+        finally:
+            for future in pending:
+                future.cancel()
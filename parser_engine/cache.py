@@ -0,0 +1,143 @@
+import sys
+from collections import namedtuple, OrderedDict
+from threading import Lock
+
+from parser_engine.parser import parser
+
+"""
+Cache statistics
+
+Args:
+    hits (int): The number of lookups answered from the cache
+    misses (int): The number of lookups that had to run the parser
+    evictions (int): The number of entries dropped to stay within the budget
+    entries (int): The number of cached results
+    bytes (int): The estimated memory used by the cached keys and results
+"""
+CacheStats = namedtuple('CacheStats', ['hits', 'misses', 'evictions', 'entries', 'bytes'])
+
+# Every result item is a tuple of three small ints, which are shared and not counted
+ITEM_SIZE = sys.getsizeof((0, 0, 0))
+
+
+def entry_size(key, result):
+    """
+    Estimate the memory used by a cache entry.
+
+    :param key: The normalized input string
+    :param result: Tuple of (phoneme index, phoneme length, stress) tuples
+    :return: The size in bytes
+    """
+    return sys.getsizeof(key) + sys.getsizeof(result) + len(result) * ITEM_SIZE
+
+
+class ParserCache:
+    """
+    LRU cache in front of parser().
+
+    Results are stored and returned as tuples of (phoneme index, phoneme length, stress) tuples, so callers can not
+    change a cached result. The cache is bounded by the number of entries and, optionally, by the estimated number
+    of bytes. The least recently used entries are evicted first.
+
+    Lookups are thread-safe. The parser runs outside the lock, two threads missing on the same input at the same
+    time both parse it and the second result replaces the first.
+
+    Inputs that make the parser raise are not cached, the exception is passed on to the caller.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=None, normalize=None):
+        """
+        :param max_entries: The maximum number of cached results
+        :param max_bytes: The maximum estimated memory of the cached results, None for no limit
+        :param normalize: Callable turning an input string into the cache key. It must only merge inputs that
+            parse to the same result. Defaults to using the input string as it is
+        """
+        if max_entries < 1:
+            raise ValueError('max_entries must be at least 1')
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.normalize = normalize
+        self.entries = OrderedDict()  # key -> (result, size)
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def parse(self, input_string):
+        """
+        Parse a string of phonemes, using the cached result if there is one.
+
+        :param input_string: The phonemes, for example "/HEHLOW"
+        :return: Tuple of (phoneme index, phoneme length, stress) tuples, False if the input is empty
+        """
+        key = input_string if self.normalize is None else self.normalize(input_string)
+        if not key:
+            return False
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        result = tuple(parser(key))
+        self.store(key, result)
+        return result
+
+    def store(self, key, result):
+        size = entry_size(key, result)
+        max_bytes = self.max_bytes
+        if max_bytes is not None and size > max_bytes:
+            return
+
+        with self.lock:
+            entries = self.entries
+            previous = entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            entries[key] = (result, size)
+            self.bytes += size
+            while len(entries) > self.max_entries or (max_bytes is not None and self.bytes > max_bytes):
+                _, (_, evicted_size) = entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def warm_up(self, phrases):
+        """
+        Parse and cache a list of phrases, for example at process start. Phrases that fail to parse are skipped.
+
+        :param phrases: Iterable of input strings
+        :return: The number of phrases that were cached
+        """
+        count = 0
+        for phrase in phrases:
+            try:
+                if self.parse(phrase) is not False:
+                    count += 1
+            except Exception:
+                continue
+        return count
+
+    def stats(self):
+        """
+        :return: CacheStats
+        """
+        with self.lock:
+            return CacheStats(self.hits, self.misses, self.evictions, len(self.entries), self.bytes)
+
+    def clear(self):
+        """
+        Drop all cached results and reset the statistics.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.bytes = 0
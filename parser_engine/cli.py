@@ -0,0 +1,224 @@
+import argparse
+import json
+import mmap
+import os
+import stat
+import struct
+import sys
+import time
+from collections import namedtuple
+
+from parser_engine.batch import parse_many
+
+"""
+Command line batch parser.
+
+Parses a file of phoneme strings, one per line, and streams the results to stdout or a file:
+
+    python -m parser_engine corpus.txt -o corpus.jsonl
+    python -m parser_engine corpus.txt --format binary --jobs 4 -o corpus.bin
+    cat corpus.txt | python -m parser_engine -
+
+Regular files are read through mmap, so only the pages around the current line are resident, and the results are
+written as they come, so memory stays bounded for corpora of any size. With --jobs the lines are parsed on a process
+pool in chunks (see batch.py), the output keeps the input order.
+
+Output formats:
+
+    jsonl   One JSON object per line, {"line": 1, "phonemes": [[phoneme index, phoneme length, stress], ...]}, or
+            {"line": 2, "input": "...", "error": "..."} for a line that failed to parse
+    binary  One record per parsed line: the line number and the number of phonemes as two big-endian 32 bit unsigned
+            integers (RECORD_HEADER), followed by 3 bytes per phoneme as in packed.py
+
+Line numbers start at 1. Blank lines produce no output. A line that fails to parse is reported on stderr and the run
+goes on, the exit status is 1 if any line failed. A throughput summary is printed on stderr at the end.
+
+The input is decoded as Latin-1, every byte maps to one character and bytes that are not phonemes fail in the parser
+like any other invalid character.
+"""
+
+FORMATS = ('jsonl', 'binary')
+
+# The number of lines sent to a worker process at once
+CHUNKSIZE = 256
+
+# Line number and number of phonemes in front of every binary record
+RECORD_HEADER = struct.Struct('>II')
+
+"""
+Totals of a run
+
+Args:
+    lines (int): The number of lines read
+    parsed (int): The number of lines parsed
+    errors (int): The number of lines that failed to parse
+    blank (int): The number of blank lines
+    phonemes (int): The number of phonemes in the results, END included
+    input_bytes (int): The number of bytes read
+    output_bytes (int): The number of bytes written
+    seconds (float): The wall clock time of the run
+"""
+RunSummary = namedtuple('RunSummary', [
+    'lines', 'parsed', 'errors', 'blank', 'phonemes', 'input_bytes', 'output_bytes', 'seconds'
+])
+
+
+class LineReader:
+    """
+    Iterates over the lines of a binary file, without the line ends, decoded as Latin-1.
+
+    Regular files are memory mapped, other files (pipes, terminals, in-memory files) are read line by line.
+    bytes_read counts the bytes read so far.
+    """
+
+    def __init__(self, file):
+        """
+        :param file: File opened in binary mode
+        """
+        self.file = file
+        self.bytes_read = 0
+
+    def __iter__(self):
+        try:
+            fileno = self.file.fileno()
+            mode = os.fstat(fileno).st_mode
+        except (AttributeError, OSError, ValueError):
+            fileno = mode = None
+        # mmap refuses empty files, there is nothing to read from them anyway
+        if mode is not None and stat.S_ISREG(mode) and os.fstat(fileno).st_size:
+            yield from self.mapped_lines(fileno)
+        else:
+            for line in self.file:
+                self.bytes_read += len(line)
+                yield line.rstrip(b'\r\n').decode('latin-1')
+
+    def mapped_lines(self, fileno):
+        with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, 'madvise'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            size = len(mapped)
+            start = 0
+            while start < size:
+                end = mapped.find(b'\n', start)
+                if end == -1:
+                    end = size
+                line = mapped[start:end]
+                self.bytes_read += min(end + 1, size) - start
+                start = end + 1
+                yield line.rstrip(b'\r').decode('latin-1')
+
+
+def write_jsonl(file, line, result):
+    """
+    :param file: Binary output file
+    :param line: The line number
+    :param result: batch.ParseResult with the phonemes as PackedPhonemes
+    :return: The number of bytes written
+    """
+    if result.error is not None:
+        record = {'line': line, 'input': result.input, 'error': result.error}
+    else:
+        record = {'line': line, 'phonemes': result.output.to_list()}
+    data = (json.dumps(record, separators=(',', ':')) + '\n').encode('ascii')
+    file.write(data)
+    return len(data)
+
+
+def write_binary(file, line, result):
+    """
+    :param file: Binary output file
+    :param line: The line number
+    :param result: batch.ParseResult with the phonemes as PackedPhonemes, errors are not written
+    :return: The number of bytes written
+    """
+    if result.error is not None:
+        return 0
+    file.write(RECORD_HEADER.pack(line, len(result.output)))
+    file.write(result.output.data)
+    return RECORD_HEADER.size + len(result.output.data)
+
+
+WRITERS = {
+    'jsonl': write_jsonl,
+    'binary': write_binary,
+}
+
+
+def parse_file(input_file, output_file, output_format='jsonl', jobs=1, chunksize=CHUNKSIZE, error_file=None):
+    """
+    Parse every line of a file and write the results.
+
+    :param input_file: Binary input file, one phoneme string per line
+    :param output_file: Binary output file
+    :param output_format: One of FORMATS
+    :param jobs: The number of worker processes, 0 or 1 parses in this process, None uses one per CPU
+    :param chunksize: The number of lines per task of a worker
+    :param error_file: Text file the failed lines are reported to, None to not report them
+    :return: RunSummary
+    """
+    write = WRITERS[output_format]
+    reader = LineReader(input_file)
+    parsed = errors = blank = phonemes = output_bytes = 0
+    start = time.perf_counter()
+    for result in parse_many(reader, workers=jobs, chunksize=chunksize, packed=True):
+        line = result.index + 1
+        if result.error is not None:
+            errors += 1
+            if error_file is not None:
+                print(f'line {line}: {result.error}', file=error_file)
+        elif result.output is False:
+            blank += 1
+            continue
+        else:
+            parsed += 1
+            phonemes += len(result.output)
+        output_bytes += write(output_file, line, result)
+    output_file.flush()
+    return RunSummary(parsed + errors + blank, parsed, errors, blank, phonemes, reader.bytes_read, output_bytes,
+                      time.perf_counter() - start)
+
+
+def format_summary(summary):
+    """
+    :param summary: RunSummary
+    :return: The summary as one line of text
+    """
+    seconds = max(summary.seconds, 1e-9)
+    return (f'{summary.lines} lines ({summary.parsed} parsed, {summary.errors} failed, {summary.blank} blank), '
+            f'{summary.phonemes} phonemes in {summary.seconds:.3f} s: {summary.lines / seconds:.0f} lines/s, '
+            f'{summary.input_bytes / seconds / 1e6:.2f} MB/s in, {summary.output_bytes / seconds / 1e6:.2f} MB/s out')
+
+
+def main(argv=None):
+    """
+    :param argv: The command line arguments, defaults to sys.argv[1:]
+    :return: The exit status, 1 if a line failed to parse
+    """
+    argument_parser = argparse.ArgumentParser(prog='python -m parser_engine',
+                                              description='Parse a file of phoneme strings, one per line')
+    argument_parser.add_argument('input', help='input file, - for stdin')
+    argument_parser.add_argument('-o', '--output', default='-', help='output file, defaults to stdout')
+    argument_parser.add_argument('-f', '--format', choices=FORMATS, default='jsonl', help='output format')
+    argument_parser.add_argument('-j', '--jobs', type=int, default=1,
+                                 help='worker processes, 0 for one per CPU, defaults to parsing in this process')
+    argument_parser.add_argument('--chunksize', type=int, default=CHUNKSIZE, help='lines per task of a worker')
+    argument_parser.add_argument('-q', '--quiet', action='store_true', help='do not print the summary')
+    arguments = argument_parser.parse_args(argv)
+
+    input_file = sys.stdin.buffer if arguments.input == '-' else open(arguments.input, 'rb')
+    output_file = sys.stdout.buffer if arguments.output == '-' else open(arguments.output, 'wb')
+    try:
+        summary = parse_file(input_file, output_file, arguments.format, arguments.jobs or None, arguments.chunksize,
+                             sys.stderr)
+    except BrokenPipeError:
+        # The reader of stdout went away, for example head. Python would report the failed flush at exit again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if input_file is not sys.stdin.buffer:
+            input_file.close()
+        if output_file is not sys.stdout.buffer:
+            output_file.close()
+    if not arguments.quiet:
+        print(format_summary(summary), file=sys.stderr)
+    return 1 if summary.errors else 0
@@ -0,0 +1,112 @@
+import os
+import sys
+
+import parser_engine.constants as constants
+import parser_engine.tables as tables
+
+"""
+Generator of compiled_tables.py.
+
+tables.py is the readable source of the tables, with one flag or length expression per phoneme. Evaluating it and
+deriving the lookup tables from it costs more at import time than loading finished constants, so the parser imports
+the generated compiled_tables.py instead, which holds the results as literals: the flag lookup tables as bytes of 256
+entries, the 16 bit tables as tuples and the parse1 lookup dictionaries as dict literals. Python stores them in the
+.pyc file and loads them without running any code.
+
+Run after changing tables.py or the FLAG_ constants:
+
+    python -m parser_engine.compile_tables
+
+tests/test_compiled_tables.py fails while the generated module is out of date.
+"""
+
+OUTPUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'compiled_tables.py')
+
+HEADER = '''\
+# Generated by python -m parser_engine.compile_tables from tables.py, do not edit.
+'''
+
+
+def flag_names():
+    """
+    :return: List of (name, flag) tuples of the FLAG_ constants, IS_<name> is the lookup table of the flag
+    """
+    return [(name[len('FLAG_'):], getattr(constants, name)) for name in sorted(dir(constants))
+            if name.startswith('FLAG_')]
+
+
+def build_flag_table(flag):
+    """
+    :param flag: The flag (or flags) to test
+    :return: bytes of 256 entries, 1 where the phoneme has the flag
+    """
+    phoneme_flags = tables.phoneme_flags
+    return bytes(i < len(phoneme_flags) and (phoneme_flags[i] & flag) != 0 for i in range(256))
+
+
+def build_indexes():
+    """
+    Build the lookup dictionaries used by the parse1 tokenizer.
+
+    The original implementation scanned phonemeNameTable for every input character. Matching the first entry of the
+    table with the same name keeps the exact semantics of that scan.
+
+    :return: Tuple of (full match dict, wildcard match dict, stress dict)
+    """
+    full = {}
+    wild = {}
+    for i, value in enumerate(tables.phoneme_name_table):
+        if value[1] != '*':
+            full.setdefault(value, i)
+        else:
+            wild.setdefault(value[0], i)
+    # The stress table is searched backwards and index 0 means "no match"
+    stress = {}
+    for i in range(len(tables.stress_table) - 1, 0, -1):
+        stress.setdefault(tables.stress_table[i], i)
+    return full, wild, stress
+
+
+def render_module():
+    """
+    :return: The source of compiled_tables.py
+    """
+    full, wild, stress = build_indexes()
+    lines = [
+        HEADER,
+        f'stress_table = {tuple(tables.stress_table)!r}',
+        f'phoneme_name_table = {tuple(tables.phoneme_name_table)!r}',
+        f'phoneme_flags = {tuple(tables.phoneme_flags)!r}',
+        f'combined_phoneme_length_table = {tuple(tables.combined_phoneme_length_table)!r}',
+        '',
+        f'full_match_index = {full!r}',
+        f'wild_match_index = {wild!r}',
+        f'stress_index = {stress!r}',
+        '',
+    ]
+    for name, flag in flag_names():
+        lines.append(f'IS_{name} = {build_flag_table(flag)!r}')
+    return '\n'.join(lines) + '\n'
+
+
+def main(argv=None):
+    """
+    Write compiled_tables.py, or with --check only compare it.
+
+    :return: 0 on success, 1 if --check finds the module out of date
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    source = render_module()
+    if '--check' in argv:
+        with open(OUTPUT_PATH, encoding='utf-8') as file:
+            if file.read() != source:
+                print(f'{OUTPUT_PATH} is out of date, run python -m parser_engine.compile_tables', file=sys.stderr)
+                return 1
+        return 0
+    with open(OUTPUT_PATH, 'w', encoding='utf-8') as file:
+        file.write(source)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -48,3 +48,6 @@ FLAG_VOICED             = int(0x0004)  # 4
 FLAG_STOPCONS           = int(0x0002)  # 2
 
 FLAG_UNVOICED_STOPCONS  = int(0x0001)  # 1
+
+# Inputs of at least this many characters are parsed with the vectorized stages, see parser() and vectorized.py
+MIN_VECTORIZED_LENGTH = 256
@@ -1,6 +1,6 @@
 from common.constants import END
-from parser_engine.constants import FLAG_VOWEL, FLAG_CONSONANT
-from parser_engine.util import phoneme_has_flag
+from parser_engine.flag_tables import IS_VOWEL, IS_CONSONANT
+from parser_engine.rules import RULE_COPY_STRESS
 
 
 def copy_stress(get_phoneme, get_stress, set_stress):
@@ -25,10 +25,10 @@ def copy_stress(get_phoneme, get_stress, set_stress):
     phoneme = None
 
     while (phoneme := get_phoneme(position)) != END:
-        if phoneme_has_flag(phoneme, FLAG_CONSONANT):
+        if IS_CONSONANT[phoneme]:
             following_phoneme = get_phoneme(position + 1)
-            if following_phoneme != END and phoneme_has_flag(following_phoneme, FLAG_VOWEL):
+            if following_phoneme != END and IS_VOWEL[following_phoneme]:
                 stress = get_stress(position + 1)
                 if stress != 0 and stress < 0x80:
-                    set_stress(position, stress + 1)
+                    set_stress(position, stress + 1, RULE_COPY_STRESS)
         position += 1
@@ -0,0 +1,643 @@
+import argparse
+import gc
+import os
+import selectors
+import signal
+import socket
+import struct
+import sys
+import time
+import traceback
+from collections import namedtuple
+from threading import Thread
+
+from parser_engine.packed import PackedPhonemes
+from parser_engine.parser import parser
+
+"""
+Pre-forked parser daemon on a Unix domain socket.
+
+Starting Python and importing the tables costs far more than parsing a short prompt. The daemon does that once: it
+imports and warms up the parser, moves everything allocated so far out of the garbage collector's reach with
+gc.freeze() and then forks the workers, which share these pages copy-on-write. The workers accept connections on
+the same listening socket.
+
+    python -m parser_engine.daemon serve --socket /tmp/sam-parser.sock --workers 4
+    python -m parser_engine.daemon load --socket /tmp/sam-parser.sock --connections 8 --depth 4
+
+Protocol, all lengths are 4 byte unsigned big endian:
+
+    request:  length, input string (UTF-8)
+    response: length, status, payload
+        STATUS_OK:    the phonemes packed 3 bytes each (phoneme index, length, stress, see packed.py), empty for an
+                      empty input
+        STATUS_ERROR: the error message (UTF-8)
+
+A connection may send any number of requests without waiting, the responses come back in request order. A client
+may shut down its sending side after the last request, it still receives every response before the daemon closes
+the connection. A worker gathers the requests arriving within batch_window seconds of the first one into a
+micro-batch, parses identical inputs of a batch once and queues the responses of each connection together. A client
+that does not read its responses is not read from either once MAX_BACKLOG bytes wait for it.
+"""
+
+HEADER = struct.Struct('>I')
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+DEFAULT_SOCKET = '/tmp/sam-parser.sock'
+
+# Longer requests are answered with an error and the connection is closed
+MAX_REQUEST_SIZE = 1 << 20
+
+# A worker stops reading from a connection with more unsent response bytes than this
+MAX_BACKLOG = 1 << 20
+
+# The number of requests DaemonClient.parse_many() sends before reading their responses
+PIPELINE_WINDOW = 256
+
+# How often the workers look for the stop signal when idle, in seconds
+POLL_INTERVAL = 0.5
+
+# A worker exiting sooner than this after it was forked counts as failing, in seconds
+MIN_WORKER_LIFETIME = 1.0
+
+# The delay before respawning a failing worker starts here and doubles up to the maximum, in seconds
+RESPAWN_DELAY = 0.1
+MAX_RESPAWN_DELAY = 10.0
+
+WARM_UP_INPUT = 'IHZ KAORREHKT, PLEY5 AXGEH4N? AOR DUW YUW PRIY4FER PAONX?'
+
+LOAD_INPUTS = (
+    'SAH5KSEHSFUHL', 'PREHNTIHS', '/HEHLOW , MAY NEYM IHZ SAEM.', 'KAHMPYUWTER', 'WIHZAA5RD',
+    'IHZ KAORREHKT, PLEY5 AXGEH4N? AOR DUW YUW PRIY4FER PAONX?', 'WAH4N ZIY4ROW POYNT FAY4V PERSEH4NT',
+)
+
+
+class DaemonError(Exception):
+    """
+    The daemon could not parse the input, the message is the error it reported.
+    """
+
+
+def encode_request(input_string):
+    data = input_string.encode('utf-8')
+    return HEADER.pack(len(data)) + data
+
+
+def encode_response(status, payload):
+    return HEADER.pack(len(payload) + 1) + bytes((status,)) + payload
+
+
+def decode_response(data):
+    """
+    :param data: A complete response
+    :return: Tuple of (status, payload)
+    """
+    size, = HEADER.unpack_from(data)
+    return data[HEADER.size], bytes(data[HEADER.size + 1:HEADER.size + size])
+
+
+def parse_batch(inputs):
+    """
+    Parse the inputs of a micro-batch, each distinct input once.
+
+    :param inputs: List of input strings
+    :return: List of encoded responses
+    """
+    responses = {}
+    for input_string in inputs:
+        if input_string in responses:
+            continue
+        try:
+            result = parser(input_string, packed=True)
+            responses[input_string] = encode_response(STATUS_OK, result.data if result else b'')
+        except Exception as e:
+            responses[input_string] = encode_response(STATUS_ERROR, f"{type(e).__name__}: {e}".encode('utf-8'))
+    return [responses[input_string] for input_string in inputs]
+
+
+class Connection:
+    """
+    A client connection of a worker.
+
+    data holds the bytes received but not parsed into requests yet, output the responses not sent yet. pending counts
+    the requests of the current batch not answered yet. A connection stops reading at EOF or after an oversized
+    request, whose error is queued once the requests before it are answered, and is closed once everything is sent.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.data = bytearray()
+        self.output = bytearray()
+        self.pending = 0
+        self.error = None
+        self.reading = True
+        self.closed = False
+        self.events = 0
+
+    def read_requests(self):
+        """
+        :return: List of the complete requests received. Reading stops at EOF or on an oversized request
+        """
+        try:
+            chunk = self.sock.recv(1 << 16)
+        except (BlockingIOError, InterruptedError):
+            return []
+        if not chunk:
+            self.reading = False
+            return []
+        data = self.data
+        data += chunk
+        requests = []
+        start = 0
+        while len(data) - start >= HEADER.size:
+            size, = HEADER.unpack_from(data, start)
+            if size > MAX_REQUEST_SIZE:
+                self.error = encode_response(STATUS_ERROR, b'Request too large')
+                self.reading = False
+                break
+            end = start + HEADER.size + size
+            if len(data) < end:
+                break
+            requests.append(data[start + HEADER.size:end].decode('utf-8', errors='replace'))
+            start = end
+        del data[:start]
+        return requests
+
+    def flush(self):
+        """
+        Send as much of the output as the socket takes without blocking.
+        """
+        try:
+            sent = self.sock.send(self.output)
+        except (BlockingIOError, InterruptedError):
+            return
+        del self.output[:sent]
+
+    def done(self):
+        """
+        :return: True if the connection has nothing left to read, answer or send
+        """
+        return not self.reading and not self.pending and self.error is None and not self.output
+
+
+class Worker:
+    """
+    Accepts connections on the shared listening socket and answers their requests in micro-batches.
+
+    The client sockets are non-blocking, responses a client does not read yet wait in the output of its connection.
+    A connection with more than MAX_BACKLOG bytes waiting is not read from until the client catches up, so a client
+    that sends without reading neither blocks the worker nor grows its memory without bounds.
+    """
+
+    def __init__(self, listener, batch_window, max_batch):
+        self.listener = listener
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.selector = selectors.DefaultSelector()
+        self.stopping = False
+
+    def stop(self, signum=None, frame=None):
+        self.stopping = True
+
+    def accept(self):
+        try:
+            sock, _ = self.listener.accept()
+        except (BlockingIOError, InterruptedError):
+            # Another worker was faster
+            return
+        sock.setblocking(False)
+        self.update(Connection(sock))
+
+    def close(self, connection):
+        if connection.events:
+            self.selector.unregister(connection.sock)
+            connection.events = 0
+        connection.sock.close()
+        connection.closed = True
+
+    def update(self, connection):
+        """
+        Queue the error of an oversized request once the requests before it are answered, close a finished
+        connection and select the events to wait for: reading unless the backlog is full, writing while output waits.
+        """
+        if connection.closed:
+            return
+        if connection.error is not None and not connection.pending:
+            connection.output += connection.error
+            connection.error = None
+        if connection.output:
+            connection.flush()
+        if connection.done():
+            self.close(connection)
+            return
+        events = 0
+        if connection.reading and len(connection.output) <= MAX_BACKLOG:
+            events |= selectors.EVENT_READ
+        if connection.output:
+            events |= selectors.EVENT_WRITE
+        if events == connection.events:
+            return
+        if not connection.events:
+            self.selector.register(connection.sock, events, connection)
+        elif not events:
+            self.selector.unregister(connection.sock)
+        else:
+            self.selector.modify(connection.sock, events, connection)
+        connection.events = events
+
+    def handle(self, connection, events):
+        """
+        Send waiting output and read requests from a connection.
+
+        :return: List of the complete requests received
+        """
+        requests = []
+        try:
+            if events & selectors.EVENT_WRITE:
+                connection.flush()
+            if events & selectors.EVENT_READ:
+                requests = connection.read_requests()
+        except OSError:
+            # The client went away, nobody is left to answer
+            self.close(connection)
+            return []
+        connection.pending += len(requests)
+        self.update(connection)
+        return requests
+
+    def gather(self):
+        """
+        Wait for requests, then keep gathering until the batch window has passed or the batch is full.
+
+        :return: List of (Connection, input string) tuples
+        """
+        batch = []
+        timeout = POLL_INTERVAL
+        deadline = None
+        while not self.stopping:
+            for key, events in self.selector.select(timeout):
+                connection = key.data
+                if connection is None:
+                    self.accept()
+                    continue
+                batch.extend((connection, input_string) for input_string in self.handle(connection, events))
+            if not batch:
+                timeout = POLL_INTERVAL
+                continue
+            if len(batch) >= self.max_batch:
+                break
+            now = time.monotonic()
+            if deadline is None:
+                deadline = now + self.batch_window
+            timeout = deadline - now
+            if timeout <= 0:
+                break
+        return batch
+
+    def answer(self, batch):
+        """
+        Parse a batch and queue the responses, in request order per connection.
+        """
+        responses = parse_batch([input_string for _, input_string in batch])
+        connections = {}
+        for (connection, _), response in zip(batch, responses):
+            connection.output += response
+            connections[connection] = None
+        for connection in connections:
+            connection.pending = 0
+            try:
+                self.update(connection)
+            except OSError:
+                self.close(connection)
+
+    def run(self):
+        self.listener.setblocking(False)
+        self.selector.register(self.listener, selectors.EVENT_READ, None)
+        while not self.stopping:
+            batch = self.gather()
+            if batch:
+                self.answer(batch)
+        # Give the clients a last chance to receive the answers of the final batch
+        for key in list(self.selector.get_map().values()):
+            connection = key.data
+            if connection is None:
+                continue
+            try:
+                connection.sock.settimeout(POLL_INTERVAL)
+                connection.sock.sendall(connection.output)
+            except OSError:
+                pass
+            connection.sock.close()
+
+
+class ParserDaemon:
+    """
+    Forks the workers and restarts the ones that die until stopped.
+
+    A worker that dies within MIN_WORKER_LIFETIME of its start is respawned after a delay that doubles with every
+    such failure, so a worker failing on startup does not turn into a fork loop.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET, workers=None, batch_window=0.0003, max_batch=64):
+        """
+        :param path: The path of the Unix domain socket
+        :param workers: The number of worker processes, defaults to the number of CPUs
+        :param batch_window: How long a worker gathers requests after the first one, in seconds
+        :param max_batch: The largest micro-batch
+        """
+        if not hasattr(os, 'fork'):
+            raise OSError('The parser daemon needs os.fork()')
+        self.path = path
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.listener = None
+        self.pids = {}  # pid -> time.monotonic() when it was forked
+        self.respawn_delay = 0.0
+        self.stopping = False
+
+    def start(self):
+        """
+        Warm up the parser, freeze the heap, bind the socket and fork the workers.
+        """
+        parser(WARM_UP_INPUT)
+        parser(WARM_UP_INPUT, packed=True)
+        gc.collect()
+        gc.freeze()
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.path)
+        self.listener.listen(128)
+        for _ in range(self.workers):
+            self.spawn()
+
+    def spawn(self):
+        pid = os.fork()
+        if pid:
+            self.pids[pid] = time.monotonic()
+            return
+        # Worker process, it never returns into the caller
+        status = 0
+        try:
+            worker = Worker(self.listener, self.batch_window, self.max_batch)
+            signal.signal(signal.SIGTERM, worker.stop)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            worker.run()
+        except BaseException:
+            print(f'Parser daemon worker {os.getpid()} failed:', file=sys.stderr)
+            traceback.print_exc()
+            status = 1
+        finally:
+            # os._exit() does not flush the buffers
+            sys.stderr.flush()
+            os._exit(status)
+
+    def stop(self, signum=None, frame=None):
+        """
+        Stop the workers. They finish the batch they are working on.
+        """
+        self.stopping = True
+        for pid in self.pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def serve_forever(self):
+        """
+        Start the daemon and supervise the workers until SIGTERM or SIGINT.
+        """
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.start()
+        try:
+            while self.pids:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+                started = self.pids.pop(pid, None)
+                if self.stopping:
+                    continue
+                lifetime = time.monotonic() - started if started is not None else MIN_WORKER_LIFETIME
+                if lifetime < MIN_WORKER_LIFETIME:
+                    self.respawn_delay = min(max(self.respawn_delay * 2, RESPAWN_DELAY), MAX_RESPAWN_DELAY)
+                else:
+                    self.respawn_delay = 0.0
+                print(f'Parser daemon worker {pid} exited with status {os.waitstatus_to_exitcode(status)} after '
+                      f'{lifetime:.1f}s, respawning in {self.respawn_delay:.1f}s', file=sys.stderr)
+                self.sleep(self.respawn_delay)
+                if not self.stopping:
+                    self.spawn()
+        finally:
+            self.stop()
+            self.close()
+
+    def sleep(self, seconds):
+        # Wakes up early when stopped
+        deadline = time.monotonic() + seconds
+        while not self.stopping and time.monotonic() < deadline:
+            time.sleep(max(min(deadline - time.monotonic(), POLL_INTERVAL), 0))
+
+    def close(self):
+        for pid in list(self.pids):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            self.pids.pop(pid, None)
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+class DaemonClient:
+    """
+    Client of the parser daemon. One connection, not thread-safe.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET, timeout=10):
+        """
+        :param path: The path of the Unix domain socket
+        :param timeout: Socket timeout in seconds
+        """
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path)
+        self.data = bytearray()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.sock.close()
+
+    def receive(self):
+        """
+        :return: PackedPhonemes of the next response
+        :raise DaemonError: If the response is an error
+        """
+        data = self.data
+        while True:
+            if len(data) >= HEADER.size:
+                size, = HEADER.unpack_from(data)
+                if len(data) >= HEADER.size + size:
+                    break
+            chunk = self.sock.recv(1 << 16)
+            if not chunk:
+                raise ConnectionError('The daemon closed the connection')
+            data += chunk
+        status, payload = decode_response(data)
+        del data[:HEADER.size + size]
+        if status != STATUS_OK:
+            raise DaemonError(payload.decode('utf-8', errors='replace'))
+        return PackedPhonemes(payload)
+
+    def parse(self, input_string):
+        """
+        :param input_string: The phonemes, for example "/HEHLOW"
+        :return: PackedPhonemes, empty for an empty input
+        :raise DaemonError: If the daemon could not parse the input
+        """
+        self.sock.sendall(encode_request(input_string))
+        return self.receive()
+
+    def parse_many(self, inputs, window=PIPELINE_WINDOW):
+        """
+        Send the inputs in windows of `window` requests, reading the responses of a window before sending the next.
+        Sending everything first would deadlock once the responses fill the socket buffers.
+
+        :param inputs: List of input strings
+        :param window: The number of requests in flight
+        :return: List of PackedPhonemes, or DaemonError for the inputs that failed
+        """
+        if window < 1:
+            raise ValueError('window must be at least 1')
+        results = []
+        for start in range(0, len(inputs), window):
+            batch = inputs[start:start + window]
+            self.sock.sendall(b''.join(encode_request(input_string) for input_string in batch))
+            for _ in batch:
+                try:
+                    results.append(self.receive())
+                except DaemonError as e:
+                    results.append(e)
+        return results
+
+
+"""
+The result of a load test
+
+Args:
+    requests (int): The number of requests answered
+    errors (int): The number of requests answered with an error
+    seconds (float): The wall time of the test
+    requests_per_second (float): requests / seconds
+    p50 (float): The median latency in seconds
+    p99 (float): The 99th percentile of the latency in seconds
+"""
+LoadReport = namedtuple('LoadReport', ['requests', 'errors', 'seconds', 'requests_per_second', 'p50', 'p99'])
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run_load(path=DEFAULT_SOCKET, inputs=LOAD_INPUTS, connections=4, requests=10000, depth=1):
+    """
+    Send requests to the daemon from several connections and measure the latency.
+
+    Every connection runs in its own thread and keeps `depth` requests in flight. The latency of a request is the time
+    from sending it to receiving its response.
+
+    :param path: The path of the Unix domain socket
+    :param inputs: The input strings, sent round robin
+    :param connections: The number of concurrent connections
+    :param requests: The total number of requests
+    :param depth: The number of requests each connection sends before reading the responses
+    :return: LoadReport
+    """
+    latencies = []
+    errors = []
+
+    def work(count, offset):
+        connection_latencies = []
+        connection_errors = 0
+        with DaemonClient(path) as client:
+            sent = 0
+            while sent < count:
+                batch = [inputs[(offset + sent + i) % len(inputs)] for i in range(min(depth, count - sent))]
+                started = time.perf_counter()
+                client.sock.sendall(b''.join(encode_request(input_string) for input_string in batch))
+                for _ in batch:
+                    try:
+                        client.receive()
+                    except DaemonError:
+                        connection_errors += 1
+                    connection_latencies.append(time.perf_counter() - started)
+                sent += len(batch)
+        latencies.extend(connection_latencies)
+        errors.append(connection_errors)
+
+    threads = [Thread(target=work, args=(requests // connections + (i < requests % connections), i))
+               for i in range(connections)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - started
+
+    latencies.sort()
+    return LoadReport(len(latencies), sum(errors), seconds, len(latencies) / seconds if seconds else 0.0,
+                      percentile(latencies, 0.5), percentile(latencies, 0.99))
+
+
+def format_load_report(report):
+    return (f'{report.requests} requests, {report.errors} errors in {report.seconds:.2f}s: '
+            f'{report.requests_per_second:.0f} requests/s, p50 {report.p50 * 1e3:.3f}ms, p99 {report.p99 * 1e3:.3f}ms')
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(prog='python -m parser_engine.daemon', description='Pre-forked parser daemon')
+    commands = argument_parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help='Run the daemon')
+    serve.add_argument('--socket', default=DEFAULT_SOCKET, help='Path of the Unix domain socket')
+    serve.add_argument('--workers', type=int, default=None, help='Worker processes, defaults to the number of CPUs')
+    serve.add_argument('--batch-window', type=float, default=300, help='Micro-batch window in microseconds')
+    serve.add_argument('--max-batch', type=int, default=64, help='Largest micro-batch')
+
+    load = commands.add_parser('load', help='Run a load test against a running daemon')
+    load.add_argument('--socket', default=DEFAULT_SOCKET, help='Path of the Unix domain socket')
+    load.add_argument('--connections', type=int, default=4, help='Concurrent connections')
+    load.add_argument('--requests', type=int, default=10000, help='Total number of requests')
+    load.add_argument('--depth', type=int, default=1, help='Requests in flight per connection')
+    load.add_argument('--input', help='File with one input per line, defaults to built-in prompts')
+
+    args = argument_parser.parse_args(argv)
+    if args.command == 'serve':
+        ParserDaemon(args.socket, args.workers, args.batch_window / 1e6, args.max_batch).serve_forever()
+        return 0
+
+    inputs = LOAD_INPUTS
+    if args.input:
+        with open(args.input, encoding='utf-8') as file:
+            inputs = [line.rstrip('\n') for line in file if line.strip()]
+    print(format_load_report(run_load(args.socket, inputs, args.connections, args.requests, args.depth)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+from importlib.util import find_spec
+
+from parser_engine.compiled_tables import (
+    phoneme_flags, IS_8000, IS_4000, IS_FRICATIVE, IS_LIQUIC, IS_NASAL, IS_ALVEOLAR, IS_0200, IS_PUNCT, IS_VOWEL,
+    IS_CONSONANT, IS_DIP_YX, IS_DIPTHONG, IS_0008, IS_VOICED, IS_STOPCONS, IS_UNVOICED_STOPCONS
+)
+
+"""
+Per-flag lookup tables.
+
+IS_VOWEL[phoneme] is the same as phoneme_has_flag(phoneme, FLAG_VOWEL) without the two function calls. Every table
+has 256 entries so that END, BREAK and every other value a phoneme byte can hold resolve to 0 instead of needing a
+bounds check. The tables are bytes of 0 and 1, generated into compiled_tables.py (see compile_tables.py).
+
+numpy is optional and takes longer to import than the rest of the parser, it is only imported on first use:
+HAVE_NUMPY tells whether it is installed, `from parser_engine.flag_tables import np` imports it (np is None without
+numpy).
+"""
+
+HAVE_NUMPY = find_spec('numpy') is not None
+
+
+def __getattr__(name):
+    if name == 'np':
+        if not HAVE_NUMPY:
+            return None
+        import numpy
+        return numpy
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def build_flag_table(flag):
+    """
+    :param flag: The flag (or flags) to test
+    :return: Tuple of 256 booleans, True where the phoneme has the flag
+    """
+    return tuple(i < len(phoneme_flags) and (phoneme_flags[i] & flag) != 0 for i in range(256))
+
+
+_masks = {}
+
+
+def flag_mask(flag):
+    """
+    NumPy equivalent of the lookup tables, for vectorized callers: flag_mask(FLAG_VOWEL)[phonemes] is a boolean
+    array that is True where the uint8 phoneme array holds a vowel.
+
+    :param flag: The flag (or flags) to test
+    :return: Read-only numpy boolean array with 256 entries
+    """
+    if not HAVE_NUMPY:
+        raise ImportError('flag_mask() requires numpy')
+    import numpy as np
+    mask = _masks.get(flag)
+    if mask is None:
+        mask = np.array(build_flag_table(flag), dtype=bool)
+        mask.flags.writeable = False
+        _masks[flag] = mask
+    return mask
@@ -0,0 +1,43 @@
+from common.constants import END
+from parser_engine.flag_tables import IS_VOWEL, IS_CONSONANT
+from parser_engine.rules import RULE_COPY_STRESS
+from parser_engine.compiled_tables import combined_phoneme_length_table
+
+"""
+Stages combined into a single walk over the phoneme buffer.
+
+A fused stage makes exactly the same changes as the stages it replaces run one after the other, only the order of
+the changes differs. parser() uses them when it is neither traced nor instrumented, so traces and per-stage
+measurements keep showing the individual stages.
+"""
+
+
+def copy_stress_and_set_phoneme_length(get_phoneme, get_stress, set_stress, set_length):
+    """
+    copy_stress followed by set_phoneme_length, in one pass.
+
+    copy_stress only changes the stress of the current phoneme, reading the stress of the following one, which it has
+    not changed yet. Once it has moved on, the stress of the current phoneme is final, so its length can be set right
+    away. Every phoneme is read once, the phoneme looked ahead at becomes the current one of the next step.
+
+    :param get_phoneme: Callback for retrieving phonemes
+    :param get_stress: Callback for retrieving phoneme stress
+    :param set_stress: Callback for setting phoneme stress
+    :param set_length: Callback for setting phoneme length
+    """
+    position = 0
+    phoneme = get_phoneme(0)
+    while phoneme != END:
+        following_phoneme = get_phoneme(position + 1)
+        stress = get_stress(position)
+        if IS_CONSONANT[phoneme] and following_phoneme != END and IS_VOWEL[following_phoneme]:
+            following_stress = get_stress(position + 1)
+            if following_stress != 0 and following_stress < 0x80:
+                stress = following_stress + 1
+                set_stress(position, stress, RULE_COPY_STRESS)
+        if stress == 0 or stress > 0x7F:
+            set_length(position, combined_phoneme_length_table[phoneme] & 0xFF)
+        else:
+            set_length(position, combined_phoneme_length_table[phoneme] >> 8)
+        phoneme = following_phoneme
+        position += 1
@@ -1,34 +1,44 @@
 from common.constants import BREAK, END
-from parser_engine.constants import FLAG_PUNCT
-from parser_engine.util import phoneme_has_flag
+from parser_engine.flag_tables import IS_PUNCT
+from parser_engine.rules import RULE_BREATH_PUNCT, RULE_BREATH_GLOTTAL_STOP
 
 
-def insert_breath(get_phoneme, set_phoneme, insert_phoneme, set_stress, get_length, set_length):
+def insert_breath(get_phoneme, set_phoneme, insert_phoneme, set_stress, get_length, set_length, state=None):
     """
+    Insert a break after every punctuation. If 232 frames pass without punctuation, the last pause is replaced with a
+    glottal stop followed by a break.
+
+    The state returned at END can be passed back in after more phonemes have been added in front of the END marker,
+    to continue exactly as if the buffer had been complete in the first place.
+
     :param get_phoneme: Callback for retrieving phonemes
     :param set_phoneme: Callback for setting phonemes
     :param insert_phoneme: Callback for inserting phonemes
     :param set_stress: Callback for setting phoneme stress
     :param get_length: Callback for getting phoneme length
     :param set_length: Callback for setting phoneme length
-    :return:
+    :param state: Optional (position, length, last pause) tuple returned by a previous call
+    :return: Tuple of (last processed position, accumulated length, position of the last pause)
     """
-    mem54 = 255
-    len_val = 0  # mem55
-    pos = -1
+    if state is None:
+        mem54 = 255
+        len_val = 0  # mem55
+        pos = -1
+    else:
+        pos, len_val, mem54 = state
 
     while True:
         pos += 1
         index = get_phoneme(pos)
         if index == END:
-            break
+            return pos - 1, len_val, mem54
 
         len_val += get_length(pos)
 
         if len_val < 232:
-            if phoneme_has_flag(index, FLAG_PUNCT):
+            if IS_PUNCT[index]:
                 len_val = 0
-                insert_phoneme(pos + 1, BREAK, 0, 0)
+                insert_phoneme(pos + 1, BREAK, 0, 0, RULE_BREATH_PUNCT)
                 continue
 
             if index == 0:
@@ -37,8 +47,8 @@ def insert_breath(get_phoneme, set_phoneme, insert_phoneme, set_stress, get_leng
             continue
 
         pos = mem54
-        set_phoneme(pos, 31)  # 'Q*' (glottal stop)
-        set_length(pos, 4)
-        set_stress(pos, 0)
+        set_phoneme(pos, 31, RULE_BREATH_GLOTTAL_STOP)  # 'Q*' (glottal stop)
+        set_length(pos, 4, RULE_BREATH_GLOTTAL_STOP)
+        set_stress(pos, 0, RULE_BREATH_GLOTTAL_STOP)
         len_val = 0
-        insert_phoneme(pos + 1, BREAK, 0, 0)
+        insert_phoneme(pos + 1, BREAK, 0, 0, RULE_BREATH_GLOTTAL_STOP)
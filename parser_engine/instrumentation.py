@@ -0,0 +1,268 @@
+import time
+import tracemalloc
+from bisect import bisect_left
+from collections import namedtuple
+from math import ceil
+from threading import Lock
+
+"""
+Per-stage instrumentation of parser().
+
+A StageHooks object passed to parser() is called before and after every stage (parser1 and the STAGES of
+parser.py). It measures the wall time of the stage, the number of phonemes before and after it and, optionally, the
+memory allocated while it ran, and hands a StageRecord to a StageAggregator. The aggregator keeps running totals and
+a histogram per stage, so a long-running worker can share one and dump or scrape it at any time.
+
+Without hooks parser() runs the stages exactly as before, the instrumentation costs nothing.
+
+    aggregator = StageAggregator()
+    hooks = StageHooks(aggregator)
+    for line in lines:
+        parser(line, hooks=hooks)
+    print(aggregator.format_report())
+"""
+
+"""
+The measurements of one stage of one parser() call
+
+Args:
+    stage (str): The stage name
+    seconds (float): The wall time of the stage
+    phonemes_in (int): The number of phonemes in the buffer before the stage, including END
+    phonemes_out (int): The number of phonemes in the buffer after the stage, including END
+    insertions (int): The number of phonemes inserted. The stages never remove phonemes, so this is
+        phonemes_out - phonemes_in
+    allocated_bytes (int): The peak memory allocated while the stage ran, None if allocations are not tracked
+"""
+StageRecord = namedtuple('StageRecord', [
+    'stage', 'seconds', 'phonemes_in', 'phonemes_out', 'insertions', 'allocated_bytes'
+])
+
+
+class Histogram:
+    """
+    Histogram with logarithmic buckets.
+
+    Every octave between `lowest` and `highest` is split into `buckets_per_octave` buckets, so percentiles are
+    accurate to a fixed relative error (about 9% with 8 buckets per octave) whatever the scale of the values.
+    Recording a value is a binary search and an increment.
+    """
+
+    def __init__(self, lowest=1e-7, highest=100.0, buckets_per_octave=8):
+        """
+        :param lowest: The upper bound of the first bucket
+        :param highest: Values above are counted in an overflow bucket
+        :param buckets_per_octave: The number of buckets between a value and its double
+        """
+        bounds = []
+        bound = lowest
+        step = 2 ** (1 / buckets_per_octave)
+        while bound < highest:
+            bounds.append(bound)
+            bound *= step
+        bounds.append(highest)
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, percent):
+        """
+        :param percent: The percentile, from 0 to 100
+        :return: The upper bound of the bucket holding the percentile, at most the largest value. None if nothing
+            was recorded
+        """
+        if not self.count:
+            return None
+        rank = max(ceil(self.count * percent / 100), 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                if index == len(self.bounds):
+                    return self.max
+                return max(min(self.bounds[index], self.max), self.min)
+        return self.max
+
+    def buckets(self):
+        """
+        :return: List of (upper bound, cumulative count) of the non-empty buckets, the overflow bucket has the bound
+            float('inf')
+        """
+        result = []
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                seen += count
+                result.append((self.bounds[index] if index < len(self.bounds) else float('inf'), seen))
+        return result
+
+
+class StageStats:
+    """
+    The running totals of one stage.
+    """
+
+    def __init__(self):
+        self.seconds = Histogram()
+        self.phonemes_in = 0
+        self.phonemes_out = 0
+        self.insertions = 0
+        self.allocated_bytes = 0
+        self.max_allocated_bytes = 0
+
+    def record(self, record):
+        self.seconds.record(record.seconds)
+        self.phonemes_in += record.phonemes_in
+        self.phonemes_out += record.phonemes_out
+        self.insertions += record.insertions
+        if record.allocated_bytes is not None:
+            self.allocated_bytes += record.allocated_bytes
+            self.max_allocated_bytes = max(self.max_allocated_bytes, record.allocated_bytes)
+
+    def summary(self):
+        """
+        :return: Dictionary of the totals and the runtime percentiles in seconds
+        """
+        seconds = self.seconds
+        return {
+            'count': seconds.count,
+            'total_seconds': seconds.total,
+            'mean_seconds': seconds.total / seconds.count if seconds.count else None,
+            'p50_seconds': seconds.percentile(50),
+            'p90_seconds': seconds.percentile(90),
+            'p99_seconds': seconds.percentile(99),
+            'max_seconds': seconds.max,
+            'phonemes_in': self.phonemes_in,
+            'phonemes_out': self.phonemes_out,
+            'insertions': self.insertions,
+            'allocated_bytes': self.allocated_bytes,
+            'max_allocated_bytes': self.max_allocated_bytes,
+        }
+
+
+class StageAggregator:
+    """
+    Collects StageRecords into per-stage totals and histograms. Thread-safe, one aggregator can be shared by all the
+    threads of a worker.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.stages = {}
+
+    def record(self, record):
+        """
+        :param record: StageRecord
+        """
+        with self.lock:
+            stats = self.stages.get(record.stage)
+            if stats is None:
+                stats = self.stages[record.stage] = StageStats()
+            stats.record(record)
+
+    def snapshot(self):
+        """
+        :return: Dictionary of stage name -> StageStats.summary(), in the order the stages were first seen
+        """
+        with self.lock:
+            return {name: stats.summary() for name, stats in self.stages.items()}
+
+    def reset(self):
+        with self.lock:
+            self.stages = {}
+
+    def format_report(self):
+        """
+        :return: The snapshot as a text table, times in microseconds
+        """
+        lines = [f"{'stage':<34}{'count':>8}{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}{'max us':>10}"
+                 f"{'inserted':>10}{'alloc KiB':>11}"]
+        for name, summary in self.snapshot().items():
+            lines.append(
+                f"{name:<34}{summary['count']:>8}{summary['p50_seconds'] * 1e6:>10.1f}"
+                f"{summary['p90_seconds'] * 1e6:>10.1f}{summary['p99_seconds'] * 1e6:>10.1f}"
+                f"{summary['max_seconds'] * 1e6:>10.1f}{summary['insertions']:>10}"
+                f"{summary['allocated_bytes'] / 1024:>11.1f}"
+            )
+        return '\n'.join(lines)
+
+
+class StageHooks:
+    """
+    Measures the stages of the parser() calls it is passed to.
+
+    stage_started() returns a token that parser() hands back to stage_finished(), the hooks keep no state between the
+    two calls and can be shared by several threads.
+
+    Tracking allocations uses tracemalloc, which slows down all allocations of the process while it is tracing. The
+    hooks start tracemalloc when needed, close() or leaving the `with` block stops it again. The peaks of stages
+    running at the same time in different threads are not separated.
+    """
+
+    def __init__(self, aggregator=None, track_allocations=False, sink=None):
+        """
+        :param aggregator: StageAggregator receiving the records, defaults to a new one
+        :param track_allocations: Measure the peak memory allocated by every stage
+        :param sink: Optional callable receiving every StageRecord as well
+        """
+        self.aggregator = aggregator if aggregator is not None else StageAggregator()
+        self.track_allocations = track_allocations
+        self.sink = sink
+        self.started_tracing = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Stop tracemalloc if the hooks started it.
+        """
+        if self.started_tracing:
+            self.started_tracing = False
+            tracemalloc.stop()
+
+    def stage_started(self, name, buffer):
+        """
+        :param name: The stage name
+        :param buffer: The PhonemeBuffer the stage runs on
+        :return: Token for stage_finished()
+        """
+        allocated = None
+        if self.track_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracing = True
+            tracemalloc.reset_peak()
+            allocated = tracemalloc.get_traced_memory()[0]
+        return len(buffer), allocated, time.perf_counter()
+
+    def stage_finished(self, name, buffer, token):
+        """
+        :param name: The stage name
+        :param buffer: The PhonemeBuffer the stage ran on
+        :param token: The result of stage_started()
+        """
+        end = time.perf_counter()
+        phonemes_in, allocated, start = token
+        if allocated is not None:
+            allocated = max(tracemalloc.get_traced_memory()[1] - allocated, 0)
+        phonemes_out = len(buffer)
+        record = StageRecord(name, end - start, phonemes_in, phonemes_out, phonemes_out - phonemes_in, allocated)
+        self.aggregator.record(record)
+        if self.sink is not None:
+            self.sink(record)
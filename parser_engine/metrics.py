@@ -0,0 +1,129 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+from parser_engine.rules import rule_names, rule_stages
+from parser_engine.rule_counters import rule_changes, rule_insertions
+
+"""
+Prometheus export of the parser metrics.
+
+format_prometheus() renders the rule counters of this process (see rule_counters.py) and, optionally, the per-stage
+histograms of a StageAggregator (see instrumentation.py) in the Prometheus text exposition format. serve_metrics()
+serves the same text on http://host:port/metrics from a background thread.
+
+    aggregator = StageAggregator()
+    serve_metrics(9464, aggregator=aggregator)
+    parser(line, hooks=StageHooks(aggregator))
+"""
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_NAMESPACE = 'sam_parser'
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def format_rule_counters(namespace=DEFAULT_NAMESPACE):
+    """
+    :param namespace: The prefix of the metric names
+    :return: List of lines
+    """
+    lines = []
+    for metric, counts, help_text in (
+        ('rule_changes_total', rule_changes, 'Changes made to the phoneme buffer by the parser rule.'),
+        ('rule_insertions_total', rule_insertions, 'Phonemes inserted by the parser rule.'),
+    ):
+        name = f'{namespace}_{metric}'
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        # Copy first so the lines of one scrape belong together
+        for rule, count in enumerate(counts.tolist()):
+            lines.append(f'{name}{{rule="{rule_names[rule]}",stage="{rule_stages[rule]}"}} {count}')
+    return lines
+
+
+def format_stage_histograms(aggregator, namespace=DEFAULT_NAMESPACE):
+    """
+    Only the non-empty buckets of the histograms are written. Their bounds come from a fixed grid, so a bucket keeps
+    its bound from one scrape to the next.
+
+    :param aggregator: StageAggregator
+    :param namespace: The prefix of the metric names
+    :return: List of lines
+    """
+    with aggregator.lock:
+        stages = [(stage, stats.seconds.buckets(), stats.seconds.count, stats.seconds.total, stats.insertions,
+                   stats.allocated_bytes) for stage, stats in aggregator.stages.items()]
+
+    name = f'{namespace}_stage_seconds'
+    lines = [f'# HELP {name} Wall time of the parser stages.', f'# TYPE {name} histogram']
+    for stage, buckets, count, total, _, _ in stages:
+        for bound, cumulative in buckets:
+            if bound != float('inf'):
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{format_value(bound)}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+        lines.append(f'{name}_sum{{stage="{stage}"}} {format_value(float(total))}')
+        lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+
+    for metric, column, help_text in (
+        ('stage_insertions_total', 4, 'Phonemes inserted by the parser stages.'),
+        ('stage_allocated_bytes_total', 5, 'Peak memory allocated by the parser stages, summed over the calls.'),
+    ):
+        name = f'{namespace}_{metric}'
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for stage in stages:
+            lines.append(f'{name}{{stage="{stage[0]}"}} {stage[column]}')
+    return lines
+
+
+def format_prometheus(aggregator=None, namespace=DEFAULT_NAMESPACE):
+    """
+    :param aggregator: Optional StageAggregator whose histograms are exported as well
+    :param namespace: The prefix of the metric names
+    :return: The metrics in the Prometheus text exposition format
+    """
+    lines = format_rule_counters(namespace)
+    if aggregator is not None:
+        lines.extend(format_stage_histograms(aggregator, namespace))
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """
+    Serves format_prometheus() on GET /metrics. The aggregator is taken from the server.
+    """
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = format_prometheus(getattr(self.server, 'aggregator', None)).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port=9464, host='127.0.0.1', aggregator=None):
+    """
+    Serve the metrics from a daemon thread.
+
+    :param port: The port, 0 picks a free one (see server.server_address)
+    :param host: The address to listen on
+    :param aggregator: Optional StageAggregator whose histograms are exported as well
+    :return: The HTTPServer, call shutdown() and server_close() to stop it
+    """
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    server.aggregator = aggregator
+    Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    return server
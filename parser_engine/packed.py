@@ -0,0 +1,142 @@
+from pickle import PickleBuffer
+
+from parser_engine.flag_tables import HAVE_NUMPY
+
+"""
+Compact parser output.
+
+parser(input_string, packed=True) returns a PackedPhonemes instead of a list of tuples. The phonemes are stored
+interleaved, 3 bytes per phoneme: phoneme index, phoneme length and stress. A list of tuples costs over 100 bytes per
+phoneme, a PackedPhonemes holds the same result in 3 bytes per phoneme plus a small fixed overhead.
+
+PackedPhonemes is a read-only sequence of (phoneme index, phoneme length, stress) tuples, so code written for the
+list output (render(), breath_groups(), ...) works with it unchanged. Numeric consumers can use the bytes directly:
+
+    packed.data          # bytes, 3 bytes per phoneme
+    memoryview(packed)   # the same bytes through the buffer protocol (Python 3.12+)
+    packed.columns()     # three strided memoryviews, one per column
+    packed.to_numpy()    # NumPy structured array with the fields phoneme, length and stress
+"""
+
+# Bytes per phoneme
+ITEM_SIZE = 3
+
+# The fields of the NumPy structured array, see to_numpy()
+PHONEME_FIELDS = [('phoneme', 'u1'), ('length', 'u1'), ('stress', 'u1')]
+
+
+class PackedPhonemes:
+    """
+    Immutable sequence of (phoneme index, phoneme length, stress) tuples stored as 3 interleaved bytes per phoneme.
+
+    Compares equal to a PackedPhonemes with the same bytes and to a list of the same tuples. Pickling with protocol 5
+    passes the bytes as a PickleBuffer, so they can be sent out of band without being copied.
+    """
+    __slots__ = ('data',)
+
+    def __init__(self, data=b''):
+        """
+        :param data: Bytes-like object of 3 bytes per phoneme. bytes are kept as they are, other objects are wrapped
+            in a read-only memoryview without copying them
+        """
+        if not isinstance(data, bytes):
+            data = memoryview(data).cast('B').toreadonly()
+        if len(data) % ITEM_SIZE:
+            raise ValueError(f'The length of the data must be a multiple of {ITEM_SIZE}, got {len(data)}')
+        self.data = data
+
+    @classmethod
+    def from_columns(cls, phoneme_index, phoneme_length, stress):
+        """
+        :param phoneme_index: Bytes-like object of phoneme indexes
+        :param phoneme_length: Bytes-like object of phoneme lengths, as long as phoneme_index
+        :param stress: Bytes-like object of stresses, as long as phoneme_index
+        :return: PackedPhonemes
+        """
+        data = bytearray(ITEM_SIZE * len(phoneme_index))
+        data[0::ITEM_SIZE] = phoneme_index
+        data[1::ITEM_SIZE] = phoneme_length
+        data[2::ITEM_SIZE] = stress
+        return cls(bytes(data))
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        :param buffer: PhonemeBuffer
+        :return: PackedPhonemes with the contents of the buffer
+        """
+        columns = buffer.view()
+        try:
+            return cls.from_columns(*columns)
+        finally:
+            for column in columns:
+                column.release()
+
+    @classmethod
+    def from_tuples(cls, phonemes):
+        """
+        :param phonemes: Iterable of (phoneme index, phoneme length, stress) tuples
+        :return: PackedPhonemes
+        """
+        return cls(bytes(value for phoneme in phonemes for value in phoneme))
+
+    def __len__(self):
+        return len(self.data) // ITEM_SIZE
+
+    def __iter__(self):
+        data = self.data
+        return zip(data[0::ITEM_SIZE], data[1::ITEM_SIZE], data[2::ITEM_SIZE])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return PackedPhonemes(self.data[ITEM_SIZE * start:ITEM_SIZE * max(start, stop)])
+            return PackedPhonemes.from_tuples(self[pos] for pos in range(start, stop, step))
+        pos = ITEM_SIZE * range(len(self))[index]
+        data = self.data
+        return data[pos], data[pos + 1], data[pos + 2]
+
+    def __eq__(self, other):
+        if isinstance(other, PackedPhonemes):
+            return self.data == other.data
+        if isinstance(other, list):
+            return len(other) == len(self) and list(self) == other
+        return NotImplemented
+
+    def __hash__(self):
+        data = self.data
+        return hash(data if isinstance(data, bytes) else data.tobytes())
+
+    def __repr__(self):
+        return f'PackedPhonemes({list(self)!r})'
+
+    def __buffer__(self, flags):
+        return memoryview(self.data)
+
+    def __reduce_ex__(self, protocol):
+        if protocol >= 5:
+            return PackedPhonemes, (PickleBuffer(self.data),)
+        return PackedPhonemes, (bytes(self.data),)
+
+    def columns(self):
+        """
+        :return: Tuple of (phoneme index, phoneme length, stress) memoryviews, strided views of the data
+        """
+        view = memoryview(self.data)
+        return view[0::ITEM_SIZE], view[1::ITEM_SIZE], view[2::ITEM_SIZE]
+
+    def to_list(self):
+        """
+        :return: List of (phoneme index, phoneme length, stress) tuples, the same as the default parser() output
+        """
+        return list(self)
+
+    def to_numpy(self):
+        """
+        :return: Read-only NumPy structured array of PHONEME_FIELDS sharing the data, use .copy() for a writable one
+        """
+        if not HAVE_NUMPY:
+            raise ImportError('to_numpy() requires numpy')
+        import numpy as np
+        return np.frombuffer(self.data, dtype=PHONEME_FIELDS)
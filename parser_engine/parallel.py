@@ -0,0 +1,158 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from common.constants import END
+from parser_engine.batch import init_worker
+from parser_engine.packed import PackedPhonemes
+from parser_engine.phoneme_buffer import PhonemeBuffer
+from parser_engine.parse1 import parser1
+from parser_engine.flag_tables import HAVE_NUMPY
+from parser_engine.parser import parser, run_insert_breath, FUSED_STAGES, VECTORIZED_STAGES
+from parser_engine.streaming import find_segment_end, parse_segment
+
+"""
+Parallel parsing of long inputs.
+
+The input is cut at the same points as in streaming.py, where the stages do not look across, and the pieces are
+parsed on a process pool. Every piece is a run of consecutive segments parsed in one buffer, long enough for the
+vectorized stages (see vectorized.py) to pay off. insert_breath keeps state across the whole input, so it is run once
+over the joined pieces in this process. The result is the same as parser() on the whole input.
+
+The first segment decides whether adjust_lengths keeps lengthening in the following segments, which changes where
+the input can be cut. It is parsed in this process before the rest is cut.
+
+The pieces travel to the workers as bytes of phonemes and stresses and come back packed (see packed.py), pickling
+lists of tuples would cost more than parsing them.
+
+If a piece fails, the whole input is parsed again with parser() so that the same exception is raised as by a
+sequential parse: the stages of the sequential parse run over the whole input one after the other, so its first
+error may come from a different piece.
+"""
+
+# Inputs shorter than this are not worth sending to the pool
+MIN_PARALLEL_LENGTH = 4096
+
+# The smallest number of tokens handed to a worker at once
+MIN_TASK_TOKENS = 1024
+
+# Tasks per worker, more tasks even out differences in the worker speed
+TASKS_PER_WORKER = 4
+
+# Stages run on the pieces, insert_breath is run on the joined pieces
+TASK_STAGES = tuple(
+    (name, run_stage) for name, run_stage in (VECTORIZED_STAGES if HAVE_NUMPY else FUSED_STAGES)
+    if name != 'insert_breath'
+)
+
+
+class Tokens:
+    """
+    The phonemes and stresses from parser1, collected in two bytearrays.
+
+    Indexing returns (phoneme, stress) tuples like the token lists of streaming.py, so find_segment_end() works on it.
+    """
+
+    def __init__(self):
+        self.phonemes = bytearray()
+        self.stresses = bytearray()
+
+    def __len__(self):
+        return len(self.phonemes)
+
+    def __getitem__(self, pos):
+        return self.phonemes[pos], self.stresses[pos]
+
+    def add_phoneme(self, value):
+        self.phonemes.append(value)
+        self.stresses.append(0)
+
+    def add_stress(self, value):
+        if not self.phonemes:
+            raise IndexError('Stress without a prior phoneme')
+        self.stresses[-1] = value
+
+    def slice(self, start, end):
+        """
+        :return: Tuple of (phonemes, stresses) bytes of the tokens from start to end
+        """
+        return bytes(self.phonemes[start:end]), bytes(self.stresses[start:end])
+
+
+def parse_task(phonemes, stresses, punct, stopped):
+    """
+    Parse a piece of the input. Runs in the worker processes.
+
+    :param phonemes: bytes of phoneme indexes
+    :param stresses: bytes of stresses, as long as phonemes
+    :param punct: The punctuation phoneme in front of the piece
+    :param stopped: True if adjust_lengths has stopped lengthening in the first segment
+    :return: PackedPhonemes
+    """
+    result, _ = parse_segment(list(zip(phonemes, stresses)), punct, stopped, TASK_STAGES)
+    return PackedPhonemes.from_tuples(result)
+
+
+def split_tasks(tokens, start, stopped, task_tokens):
+    """
+    Cut the tokens into pieces of at least task_tokens tokens, at points where they can be parsed independently.
+
+    :param tokens: Tokens
+    :param start: The position of the first token, the end of the first segment
+    :param stopped: True if adjust_lengths has stopped lengthening in the first segment
+    :param task_tokens: The smallest number of tokens in a piece, only the last one may be shorter
+    :return: List of (phonemes, stresses, punct) tuples
+    """
+    tasks = []
+    while start < len(tokens):
+        end = -1
+        if start + task_tokens < len(tokens):
+            end = find_segment_end(tokens, start + task_tokens, stopped)
+        if end == -1:
+            end = len(tokens)
+        tasks.append(tokens.slice(start, end) + (tokens[start - 1][0],))
+        start = end
+    return tasks
+
+
+def parse_parallel(input_string, workers=None, executor=None, min_length=MIN_PARALLEL_LENGTH):
+    """
+    Parse a long string of phonemes on several processes.
+
+    Starting a pool takes longer than parsing a few thousand phonemes, pass an executor to reuse one.
+
+    :param input_string: The phonemes, for example "/HEHLOW"
+    :param workers: The number of worker processes, defaults to the number of CPUs. With an executor, only used to
+        size the tasks
+    :param executor: Optional concurrent.futures.Executor to run the pieces on
+    :param min_length: Inputs shorter than this are parsed in this process
+    :return: List of (phoneme index, phoneme length, stress) tuples, False if the input is empty
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not input_string or len(input_string) < min_length or (executor is None and workers <= 1):
+        return parser(input_string)
+
+    tokens = Tokens()
+    parser1(input_string, tokens.add_phoneme, tokens.add_stress)
+    end = find_segment_end(tokens, 0, False)
+    if end == -1:
+        return parser(input_string)
+
+    try:
+        first, stopped = parse_segment(list(zip(*tokens.slice(0, end))), None, False)
+        tasks = split_tasks(tokens, end, stopped, max(MIN_TASK_TOKENS, len(tokens) // (workers * TASKS_PER_WORKER)))
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+                results = list(pool.map(parse_task, *zip(*tasks), [stopped] * len(tasks)))
+        else:
+            results = list(executor.map(parse_task, *zip(*tasks), [stopped] * len(tasks)))
+    except Exception:
+        return parser(input_string)
+
+    buffer = PhonemeBuffer(len(tokens) * 2)
+    buffer.extend(first)
+    for result in results:
+        buffer.extend_columns(*result.columns())
+    buffer.append_phoneme(END)
+    run_insert_breath(buffer)
+    return buffer.to_list()
@@ -1,8 +1,6 @@
-from parser_engine.util import dev_print
-import parser_engine.tables as tb
-
-phoneme_name_table = tb.phoneme_name_table
-stress_table = tb.stress_table
+from parser_engine.compiled_tables import (
+    phoneme_name_table, stress_table, full_match_index, wild_match_index, stress_index
+)
 
 
 def full_match(sign1, sign2):
@@ -13,8 +11,7 @@ def full_match(sign1, sign2):
     :param sign2:
     :return: Number
     """
-    index = next((i for i, value in enumerate(phoneme_name_table) if value == sign1 + sign2 and value[1] != '*'), -1)
-    return index if index != -1 else False
+    return full_match_index.get(sign1 + sign2, False)
 
 
 def wild_match(sign1):
@@ -24,11 +21,10 @@ def wild_match(sign1):
     :param sign1:
     :return: Number
     """
-    index = next((i for i, value in enumerate(phoneme_name_table) if value == sign1 + '*'), -1)
-    return index if index != -1 else False
+    return wild_match_index.get(sign1, False)
 
 
-def parser1(input_str, add_phoneme, add_stress):
+def parser1(input_str, add_phoneme, add_stress, final=True):
     """
     The input[] buffer contains a string of phonemes and stress markers along the lines of:
         DHAX KAET IHZ AH5GLIY.
@@ -70,41 +66,42 @@ def parser1(input_str, add_phoneme, add_stress):
     :param input_str: Holds the string of phonemes, each two bytes wide
     :param add_phoneme: The callback to use to store phoneme index values
     :param add_stress: The callback to use to store stress index values
-    :return: None
+    :param final: False if more input follows input_str. The last character is then left unparsed, as it may be the
+        first half of a phoneme that continues in the next piece of input
+    :return: The number of characters parsed
     """
-    src_pos = 0
-    while src_pos < len(input_str):
-        tmp = input_str.lower()
-        dev_print(f"processing \"{tmp[:src_pos]}{{{tmp[src_pos:src_pos+2].upper()}}}{tmp[src_pos+2:]}\"")
+    full = full_match_index
+    wild = wild_match_index
+    stress = stress_index
+    length = len(input_str) if final else len(input_str) - 1
 
+    src_pos = 0
+    while src_pos < length:
         sign1 = input_str[src_pos]
-        sign2 = input_str[src_pos + 1] if src_pos + 1 < len(input_str) else ''
-        match = full_match(sign1, sign2)
+        match = full.get(input_str[src_pos:src_pos + 2])
 
-        if match is not False:
+        if match is not None:
             # Matched both characters (no wildcards)
             src_pos += 2  # Skip the second character of the input as we have matched it already
             add_phoneme(match)
             continue
 
-        match = wild_match(sign1)
+        match = wild.get(sign1)
 
-        if match is not False:
+        if match is not None:
             # Matched the first character and the second is '*'
             add_phoneme(match)
             src_pos += 1  # Skip the second character of the input as we have matched it already
             continue
 
-        # Should be a stress character. Search through the stress table backwards
-        match = len(stress_table) - 1
-        while sign1 != stress_table[match] and match > 0:
-            match -= 1
+        # Should be a stress character
+        match = stress.get(sign1)
 
-        if match == 0:
-            dev_print(f"Could not parse char {sign1}")
-            raise Exception()
+        if match is None:
+            raise Exception(f"Could not parse char {sign1}")
 
         add_stress(match)  # Set the stress for the prior phoneme
 
         src_pos += 1
 
+    return src_pos
@@ -1,129 +1,238 @@
-from common.constants import BREAK, END, DEV_MODE
-from parser_engine.util import dev_print, set_list
-from parser_engine.tables import phoneme_name_table
+from threading import local
+
+from common.constants import END
+from parser_engine.constants import MIN_VECTORIZED_LENGTH
+from parser_engine.phoneme_buffer import PhonemeBuffer
 from parser_engine.parse1 import parser1
 from parser_engine.parse2 import parser2
 from parser_engine.adjust_lengths import adjust_lengths
-from parser_engine.copy_stress import copy_stress
-from parser_engine.set_phoneme_length import set_phoneme_length
+from parser_engine.fused_stages import copy_stress_and_set_phoneme_length
+from parser_engine.flag_tables import HAVE_NUMPY
 from parser_engine.insert_breath import insert_breath
 from parser_engine.prolong_plosive_stop_consonants import prolong_plosive_stop_consonants_code_41240
 
+# The modules only needed for tracing, packed results, the unfused stages and the vectorized stages are imported on
+# first use, so that a process parsing a few short inputs does not pay for them. numpy alone takes longer to import
+# than the rest of the parser.
 
-def parser(input_string):
-    if not input_string:
-        return False
 
-    def get_phoneme(pos):
-        if DEV_MODE:
-            if pos < 0 or pos >= len(phoneme_index):
-                raise ValueError('Out of bounds: ' + str(pos))
-        return END if pos == len(phoneme_index) - 1 else phoneme_index[pos]
+def run_parser2(buffer):
+    parser2(buffer.insert_phoneme, buffer.set_phoneme, buffer.get_phoneme, buffer.get_stress)
 
-    def set_phoneme(pos, value):
-        dev_print(f"{pos} CHANGE: {phoneme_name_table[phoneme_index[pos]]} -> {phoneme_name_table[value]}")
-        phoneme_index[pos] = value
 
-    def insert_phoneme(pos, value, stress_value, length=0):
-        if value == BREAK:
-            dev_print(f"{pos} INSERT: undefined")
-        else:
-            dev_print(f"{pos} INSERT: {phoneme_name_table[value]}")
-        for i in range(len(phoneme_index) - 1, pos - 1, -1):
-            set_list(phoneme_index, i + 1, phoneme_index[i])
-            set_list(phoneme_length, i + 1, get_length(i))
-            set_list(stress, i + 1, get_stress(i))
-        set_list(phoneme_index, pos, value)
-        set_list(phoneme_length, pos , length | 0)
-        set_list(stress, pos, stress_value)
-
-    def get_stress(pos):
-        return stress[pos] if stress[pos] is not None else 0
-
-    def set_stress(pos, stress_value):
-        dev_print(f"{pos} \"{phoneme_name_table[phoneme_index[pos]]}\" SET STRESS: {stress[pos]} -> {stress_value}")
-        stress[pos] = stress_value
-
-    def get_length(pos):
-        return phoneme_length[pos] if phoneme_length[pos] is not None else 0
-
-    def set_length(pos, length):
-        dev_print(f"{pos} \"{phoneme_name_table[phoneme_index[pos]]}\" SET LENGTH: {phoneme_length[pos]} -> {length}")
-        if DEV_MODE:
-            if (length & 128) != 0:
-                raise ValueError("Got the flag 0x80, see CopyStress() and SetPhonemeLength() comments!")
-            if pos < 0 or pos > len(phoneme_index):
-                raise ValueError("Out of bounds: " + str(pos))
-        phoneme_length[pos] = length
-
-    def process_phoneme(value):
-        nonlocal pos
-        set_list(stress, pos, 0)
-        set_list(phoneme_length, pos, 0)
-        set_list(phoneme_index, pos, value)
-        pos += 1
-
-    def process_stress(value):
-        nonlocal pos
-        if DEV_MODE:
-            if (value & 128) != 0:
-                raise ValueError('Got the flag 0x80, see CopyStress() and SetPhonemeLength() comments!')
-        set_list(stress, pos - 1, value)  # Set stress for the prior phoneme
-
-    stress = []  # numbers from  0 to 8
-    phoneme_length = []
-    phoneme_index = []
-
-    pos = 0
-    parser1(
-        input_string,
-        process_phoneme,
-        process_stress
+def run_copy_stress(buffer):
+    from parser_engine.copy_stress import copy_stress
+    copy_stress(buffer.get_phoneme, buffer.get_stress, buffer.set_stress)
+
+
+def run_set_phoneme_length(buffer):
+    from parser_engine.set_phoneme_length import set_phoneme_length
+    set_phoneme_length(buffer.get_phoneme, buffer.get_stress, buffer.set_length)
+
+
+def run_copy_stress_and_set_phoneme_length(buffer):
+    copy_stress_and_set_phoneme_length(buffer.get_phoneme, buffer.get_stress, buffer.set_stress, buffer.set_length)
+
+
+def run_vectorized_copy_stress_and_set_phoneme_length(buffer):
+    from parser_engine.vectorized import vectorized_copy_stress_and_set_phoneme_length
+    vectorized_copy_stress_and_set_phoneme_length(buffer)
+
+
+def run_adjust_lengths(buffer):
+    adjust_lengths(buffer.get_phoneme, buffer.set_length, buffer.get_length)
+
+
+def run_vectorized_adjust_lengths(buffer):
+    from parser_engine.vectorized import vectorized_adjust_lengths
+    vectorized_adjust_lengths(buffer)
+
+
+def run_prolong_plosive_stop_consonants(buffer):
+    prolong_plosive_stop_consonants_code_41240(buffer.get_phoneme, buffer.insert_phoneme, buffer.get_stress)
+
+
+def run_truncate(buffer):
+    buffer.truncate_invalid(80)  # error: delete all behind it
+
+
+def run_insert_breath(buffer, state=None):
+    return insert_breath(
+        buffer.get_phoneme,
+        buffer.set_phoneme,
+        buffer.insert_phoneme,
+        buffer.set_stress,
+        buffer.get_length,
+        buffer.set_length,
+        state
     )
-    set_list(phoneme_index, pos, END)
-    set_list(phoneme_length, pos, 0)
-    set_list(stress, pos, 0)
-
-    if DEV_MODE:
-        print_phonemes(phoneme_index, phoneme_length, stress)
-
-    parser2(insert_phoneme, set_phoneme, get_phoneme, get_stress)
-    copy_stress(get_phoneme, get_stress, set_stress)
-    set_phoneme_length(get_phoneme, get_stress, set_length)
-    adjust_lengths(get_phoneme, set_length, get_length)
-    prolong_plosive_stop_consonants_code_41240(get_phoneme, insert_phoneme, get_stress)
-
-    for i in range(len(phoneme_index)):
-        if phoneme_index[i] > 80:
-            phoneme_index[i] = END
-            break  # error: delete all behind it
-
-    insert_breath(get_phoneme, set_phoneme, insert_phoneme, set_stress, get_length, set_length)
-
-    if DEV_MODE:
-        print_phonemes(phoneme_index, phoneme_length, stress)
-
-    return [(v, phoneme_length[i], stress[i]) for i, v in enumerate(phoneme_index)]
-
-
-def print_phonemes(phoneme_index, phoneme_length, stress):
-    def pad(num):
-        s = "000" + str(num)
-        return s[-3:]
-
-    print("==================================")
-    print("Internal Phoneme presentation:")
-    print(" pos  idx  phoneme  length  stress")
-    print("----------------------------------")
-    for i in range(len(phoneme_index)):
-        def name(phoneme):
-            if phoneme_index[i] < 81:
-                return phoneme_name_table[phoneme_index[i]]
-            if phoneme == END:
-                return "  "
-            return "??"
-
-        print(
-            f" {pad(i)}  {pad(phoneme_index[i])}  {name(phoneme_index[i])}       {pad(phoneme_length[i])}     {pad(stress[i])}"
-        )
-    print("==================================")
+
+
+# The stages run after parser1, in order
+STAGES = (
+    ('parser2', run_parser2),
+    ('copy_stress', run_copy_stress),
+    ('set_phoneme_length', run_set_phoneme_length),
+    ('adjust_lengths', run_adjust_lengths),
+    ('prolong_plosive_stop_consonants', run_prolong_plosive_stop_consonants),
+    ('truncate', run_truncate),
+    ('insert_breath', run_insert_breath),
+)
+
+# STAGES with copy_stress and set_phoneme_length fused into one pass, see fused_stages.py. Used when the stages are
+# not traced or instrumented
+FUSED_STAGES = (
+    ('parser2', run_parser2),
+    ('copy_stress_and_set_phoneme_length', run_copy_stress_and_set_phoneme_length),
+    ('adjust_lengths', run_adjust_lengths),
+    ('prolong_plosive_stop_consonants', run_prolong_plosive_stop_consonants),
+    ('truncate', run_truncate),
+    ('insert_breath', run_insert_breath),
+)
+
+# FUSED_STAGES with the NumPy versions of copy_stress, set_phoneme_length and adjust_lengths, see vectorized.py.
+# Used instead of FUSED_STAGES for long inputs when numpy is installed
+VECTORIZED_STAGES = (
+    ('parser2', run_parser2),
+    ('copy_stress_and_set_phoneme_length', run_vectorized_copy_stress_and_set_phoneme_length),
+    ('adjust_lengths', run_vectorized_adjust_lengths),
+    ('prolong_plosive_stop_consonants', run_prolong_plosive_stop_consonants),
+    ('truncate', run_truncate),
+    ('insert_breath', run_insert_breath),
+)
+
+
+class Parser:
+    """
+    Parses strings of phonemes with a phoneme buffer that is allocated once and reused.
+
+    Between two calls the buffer is cleared in O(1) and keeps its storage, so parsing a short input allocates little
+    more than the result. A buffer grown beyond max_capacity by a long input is dropped after that parse, a single
+    long input does not pin its memory for the lifetime of the parser.
+
+    A Parser is not thread-safe, keep one per thread. parser() does that for you. A parse started from inside a
+    running one (for example from a tracer or from hooks) uses a temporary buffer.
+    """
+
+    def __init__(self, capacity=64, max_capacity=4096, pipeline=None):
+        """
+        :param capacity: The number of phonemes the buffer is allocated for, the expected input length is a good hint
+        :param max_capacity: The largest buffer kept between calls
+        :param pipeline: The Pipeline to run (see pipeline.py), defaults to the stages of parser()
+        """
+        self.pipeline = pipeline
+        self.capacity = capacity
+        self.max_capacity = max(capacity, max_capacity)
+        self.buffer = PhonemeBuffer(capacity)
+        self.busy = False
+
+    def parse(self, input_string, tracer=None, hooks=None, packed=False):
+        """
+        The same as parser(), see there.
+
+        :param input_string: The phonemes, for example "/HEHLOW"
+        :param tracer: Optional Tracer receiving the changes made by the stages, see tracing.py
+        :param hooks: Optional StageHooks called around every stage, see instrumentation.py
+        :param packed: Return a PackedPhonemes (3 bytes per phoneme, see packed.py) instead of a list
+        :return: List of (phoneme index, phoneme length, stress) tuples, False if the input is empty
+        """
+        if not input_string:
+            return False
+        if self.busy:
+            return run_parser(PhonemeBuffer(len(input_string) + 1), input_string, tracer, hooks, packed,
+                              self.pipeline)
+
+        self.busy = True
+        buffer = self.buffer
+        try:
+            buffer.clear()
+            buffer.reserve(len(input_string) + 1)
+            return run_parser(buffer, input_string, tracer, hooks, packed, self.pipeline)
+        finally:
+            if buffer.capacity > self.max_capacity:
+                self.buffer = PhonemeBuffer(self.capacity)
+            self.busy = False
+
+
+# The Parser of each thread, used by parser()
+thread_parsers = local()
+
+
+def parser(input_string, tracer=None, hooks=None, packed=False):
+    """
+    Parse a string of phonemes into (phoneme index, phoneme length, stress) tuples.
+
+    Runs on a Parser kept per thread, see Parser.
+
+    :param input_string: The phonemes, for example "/HEHLOW"
+    :param tracer: Optional Tracer receiving the changes made by the stages, see tracing.py
+    :param hooks: Optional StageHooks called around every stage, see instrumentation.py
+    :param packed: Return a PackedPhonemes (3 bytes per phoneme, see packed.py) instead of a list
+    :return: List of (phoneme index, phoneme length, stress) tuples, False if the input is empty
+    """
+    try:
+        default_parser = thread_parsers.parser
+    except AttributeError:
+        default_parser = thread_parsers.parser = Parser()
+    return default_parser.parse(input_string, tracer, hooks, packed)
+
+
+def packed_result(buffer):
+    from parser_engine.packed import PackedPhonemes
+    return PackedPhonemes.from_buffer(buffer)
+
+
+def run_parser(buffer, input_string, tracer, hooks, packed, pipeline=None):
+    """
+    Run parser1 and the stages on an empty buffer.
+
+    :param buffer: Empty PhonemeBuffer
+    :param input_string: The phonemes, not empty
+    :param tracer: Optional Tracer
+    :param hooks: Optional StageHooks
+    :param packed: Return a PackedPhonemes instead of a list
+    :param pipeline: Optional Pipeline, defaults to the stages of parser()
+    :return: List of (phoneme index, phoneme length, stress) tuples or PackedPhonemes
+    """
+    if hooks is None and (tracer is None or not tracer.level):
+        parser1(input_string, buffer.append_phoneme, buffer.set_last_stress)
+        buffer.append_phoneme(END)
+        if pipeline is not None:
+            stages = pipeline.steps
+        elif HAVE_NUMPY and len(input_string) >= MIN_VECTORIZED_LENGTH:
+            stages = VECTORIZED_STAGES
+        else:
+            stages = FUSED_STAGES
+        for _, run_stage in stages:
+            run_stage(buffer)
+        return packed_result(buffer) if packed else buffer.to_list()
+
+    if tracer is None or not tracer.level:
+        tracer = None
+        target = buffer
+    else:
+        from parser_engine.tracing import TracingBuffer
+        target = TracingBuffer(buffer, tracer)
+        tracer.stage = 'parser1'
+
+    if hooks is not None:
+        token = hooks.stage_started('parser1', buffer)
+    parser1(input_string, target.append_phoneme, target.set_last_stress)
+    target.append_phoneme(END)
+    if hooks is not None:
+        hooks.stage_finished('parser1', buffer, token)
+    if tracer is not None:
+        tracer.dump(buffer)
+
+    for name, run_stage in STAGES if pipeline is None else pipeline.traced_steps:
+        if tracer is not None:
+            tracer.stage = name
+        if hooks is not None:
+            token = hooks.stage_started(name, buffer)
+        run_stage(target)
+        if hooks is not None:
+            hooks.stage_finished(name, buffer, token)
+
+    if tracer is not None:
+        tracer.dump(buffer)
+    return packed_result(buffer) if packed else buffer.to_list()
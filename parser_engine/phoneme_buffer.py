@@ -0,0 +1,259 @@
+from common.constants import END
+from parser_engine.rule_counters import rule_changes, rule_insertions
+
+
+class PhonemeBuffer:
+    """
+    Working storage for the parser stages.
+
+    The phoneme index, phoneme length and stress of every phoneme are kept in three parallel bytearrays. The arrays
+    are used as a gap buffer: the unused capacity is a gap that sits at the last insertion point. Stages scan the
+    buffer from the start and insert right behind the current position, so the gap moves along with them and an
+    insertion only has to move the phonemes between the previous and the current insertion point. A whole stage is
+    therefore linear in the number of phonemes instead of shifting the tail of the buffer on every insertion.
+
+    Phoneme `pos` is stored at `pos` if it is in front of the gap and at `pos + gap_size` otherwise.
+
+    The bound methods (get_phoneme, set_phoneme, insert_phoneme, ...) follow the callback signatures documented in
+    typehints.py, so every stage can run against a buffer directly. The rule ids the stages pass to the setters are
+    counted in the process-wide rule counters (see rule_counters.py) and reported when tracing (see tracing.py).
+    """
+    __slots__ = ('phoneme_index', 'phoneme_length', 'stress', 'size', 'capacity', 'gap_start', 'gap_size')
+
+    def __init__(self, capacity=64):
+        capacity = max(int(capacity), 1)
+        self.phoneme_index = bytearray(capacity)
+        self.phoneme_length = bytearray(capacity)
+        self.stress = bytearray(capacity)  # numbers from 0 to 8
+        self.size = 0
+        self.capacity = capacity
+        self.gap_start = 0
+        self.gap_size = capacity
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        """
+        Forget all phonemes, keeping the allocated storage.
+        """
+        self.size = 0
+        self.gap_start = 0
+        self.gap_size = self.capacity
+
+    def reserve(self, capacity):
+        """
+        Make sure the buffer can hold at least `capacity` phonemes without reallocating.
+
+        :param capacity: The number of phonemes
+        """
+        if capacity <= self.capacity:
+            return
+        capacity = max(capacity, self.capacity * 2)
+        extra = bytes(capacity - self.capacity)
+        gap_start = self.gap_start
+        # Widen the gap, the phonemes behind it move to the end of the new storage
+        self.phoneme_index[gap_start:gap_start] = extra
+        self.phoneme_length[gap_start:gap_start] = extra
+        self.stress[gap_start:gap_start] = extra
+        self.gap_size += len(extra)
+        self.capacity = capacity
+
+    def move_gap(self, pos):
+        """
+        Move the gap in front of phoneme `pos`.
+
+        :param pos: The position in the phoneme array
+        """
+        gap_start = self.gap_start
+        if pos == gap_start:
+            return
+        gap_end = gap_start + self.gap_size
+        if pos < gap_start:
+            # Move the phonemes in [pos, gap_start) behind the gap
+            dest = gap_end - (gap_start - pos)
+            for column in (self.phoneme_index, self.phoneme_length, self.stress):
+                column[dest:gap_end] = column[pos:gap_start]
+        else:
+            # Move the phonemes in [gap_start, pos) in front of the gap
+            src_end = gap_end + (pos - gap_start)
+            for column in (self.phoneme_index, self.phoneme_length, self.stress):
+                column[gap_start:pos] = column[gap_end:src_end]
+        self.gap_start = pos
+
+    def compact(self):
+        """
+        Move the gap to the end so the phonemes are stored contiguously in the first `size` entries.
+        """
+        self.move_gap(self.size)
+
+    def append_phoneme(self, value):
+        """
+        Add a phoneme with no stress and no length to the end of the buffer. Used as the parser1 add_phoneme callback.
+
+        :param value: The phoneme index
+        """
+        self.insert_phoneme(self.size, value, 0, 0)
+
+    def extend(self, phonemes):
+        """
+        Add phonemes to the end of the buffer.
+
+        :param phonemes: Iterable of (phoneme index, phoneme length, stress) tuples
+        """
+        for phoneme, length, stress_value in phonemes:
+            self.insert_phoneme(self.size, phoneme, stress_value, length)
+
+    def extend_columns(self, phoneme_index, phoneme_length, stress):
+        """
+        Add phonemes to the end of the buffer, copying whole columns at once.
+
+        :param phoneme_index: Bytes-like object of phoneme indexes
+        :param phoneme_length: Bytes-like object of phoneme lengths, as long as phoneme_index
+        :param stress: Bytes-like object of stresses, as long as phoneme_index
+        """
+        count = len(phoneme_index)
+        if len(phoneme_length) != count or len(stress) != count:
+            raise ValueError('The columns must have the same length')
+        self.reserve(self.size + count)
+        self.move_gap(self.size)
+        end = self.size + count
+        self.phoneme_index[self.size:end] = phoneme_index
+        self.phoneme_length[self.size:end] = phoneme_length
+        self.stress[self.size:end] = stress
+        self.gap_start = end
+        self.gap_size -= count
+        self.size = end
+
+    def delete(self, pos, count=1):
+        """
+        Remove `count` phonemes starting at `pos`.
+
+        :param pos: The position of the first phoneme to remove
+        :param count: The number of phonemes to remove
+        """
+        if pos < 0 or count < 0 or pos + count > self.size:
+            raise IndexError('Out of bounds: ' + str(pos))
+        self.move_gap(pos + count)
+        self.gap_start = pos
+        self.gap_size += count
+        self.size -= count
+
+    def set_last_stress(self, value):
+        """
+        Set the stress of the most recently added phoneme. Used as the parser1 add_stress callback.
+
+        :param value: The stress value
+        """
+        if not self.size:
+            raise IndexError('Stress without a prior phoneme')
+        self.set_stress(self.size - 1, value)
+
+    def get(self, pos):
+        """
+        :param pos: The position in the phoneme array
+        :return: Tuple of (phoneme index, phoneme length, stress) stored at the position
+        """
+        if pos < 0 or pos >= self.size:
+            raise IndexError('Out of bounds: ' + str(pos))
+        if pos >= self.gap_start:
+            pos += self.gap_size
+        return self.phoneme_index[pos], self.phoneme_length[pos], self.stress[pos]
+
+    def get_phoneme(self, pos):
+        if pos < 0 or pos >= self.size:
+            raise ValueError('Out of bounds: ' + str(pos))
+        if pos == self.size - 1:
+            return END
+        return self.phoneme_index[pos if pos < self.gap_start else pos + self.gap_size]
+
+    def set_phoneme(self, pos, value, rule=None):
+        if pos >= self.size:
+            raise IndexError('Out of bounds: ' + str(pos))
+        self.phoneme_index[pos if pos < self.gap_start else pos + self.gap_size] = value
+        if rule is not None:
+            rule_changes[rule] += 1
+
+    def insert_phoneme(self, pos, value, stress_value, length=0, rule=None):
+        if pos < 0 or pos > self.size:
+            raise IndexError('Out of bounds: ' + str(pos))
+        if not self.gap_size:
+            self.reserve(self.capacity + 1)
+        if pos != self.gap_start:
+            self.move_gap(pos)
+        self.phoneme_index[pos] = value
+        self.phoneme_length[pos] = length
+        self.stress[pos] = stress_value
+        self.gap_start = pos + 1
+        self.gap_size -= 1
+        self.size += 1
+        if rule is not None:
+            rule_insertions[rule] += 1
+
+    def get_stress(self, pos):
+        if pos >= self.size:
+            raise IndexError('Out of bounds: ' + str(pos))
+        return self.stress[pos if pos < self.gap_start else pos + self.gap_size]
+
+    def set_stress(self, pos, stress_value, rule=None):
+        if pos >= self.size:
+            raise IndexError('Out of bounds: ' + str(pos))
+        self.stress[pos if pos < self.gap_start else pos + self.gap_size] = stress_value
+        if rule is not None:
+            rule_changes[rule] += 1
+
+    def get_length(self, pos):
+        if pos >= self.size:
+            raise IndexError('Out of bounds: ' + str(pos))
+        return self.phoneme_length[pos if pos < self.gap_start else pos + self.gap_size]
+
+    def set_length(self, pos, length, rule=None):
+        if pos >= self.size:
+            raise IndexError('Out of bounds: ' + str(pos))
+        # Lengths are stored in a byte and the 0x80 bit is reserved
+        if (length & 128) != 0:
+            raise ValueError("Got the flag 0x80, see CopyStress() and SetPhonemeLength() comments!")
+        self.phoneme_length[pos if pos < self.gap_start else pos + self.gap_size] = length
+        if rule is not None:
+            rule_changes[rule] += 1
+
+    def truncate_invalid(self, max_phoneme=80):
+        """
+        Replace the first phoneme above max_phoneme with END. Everything behind it is ignored by later stages.
+
+        :param max_phoneme: The highest valid phoneme index
+        :return: The position of the new END marker, or -1 if all phonemes are valid
+        """
+        self.compact()
+        phoneme_index = self.phoneme_index
+        for pos in range(self.size):
+            if phoneme_index[pos] > max_phoneme:
+                phoneme_index[pos] = END
+                return pos
+        return -1
+
+    def view(self):
+        """
+        Zero-copy view of the buffer contents.
+
+        The memoryviews keep the bytearrays from being resized, release them before modifying the buffer again.
+
+        :return: Tuple of (phoneme index, phoneme length, stress) memoryviews
+        """
+        self.compact()
+        size = self.size
+        return (
+            memoryview(self.phoneme_index)[:size],
+            memoryview(self.phoneme_length)[:size],
+            memoryview(self.stress)[:size]
+        )
+
+    def to_list(self, start=0, stop=None):
+        """
+        :param start: The position of the first phoneme
+        :param stop: The position behind the last phoneme, defaults to the end of the buffer
+        :return: List of (phoneme index, phoneme length, stress) tuples
+        """
+        self.compact()
+        stop = self.size if stop is None else min(stop, self.size)
+        return list(zip(self.phoneme_index[start:stop], self.phoneme_length[start:stop], self.stress[start:stop]))
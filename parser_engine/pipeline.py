@@ -0,0 +1,195 @@
+from collections import namedtuple
+from threading import local
+
+from parser_engine.flag_tables import HAVE_NUMPY
+from parser_engine.parser import Parser, run_parser2, run_copy_stress, run_set_phoneme_length, run_adjust_lengths
+from parser_engine.parser import run_copy_stress_and_set_phoneme_length, run_prolong_plosive_stop_consonants
+from parser_engine.parser import run_truncate, run_insert_breath
+from parser_engine.parser import run_vectorized_copy_stress_and_set_phoneme_length, run_vectorized_adjust_lengths
+
+"""
+Configurable parser pipelines.
+
+A Pipeline is the list of stages run after parser1. Stages can be dropped, the pipeline can be cut off after a stage
+and a stage can be swapped for another implementation:
+
+    # Normalized phonemes only, for example for alignment
+    DEFAULT_PIPELINE.until('parser2').parse('/HEHLOW')
+
+    # Short prompts never need a breath
+    DEFAULT_PIPELINE.without('insert_breath')
+
+    # copy_stress and set_phoneme_length in one pass, see fused_stages.py
+    DEFAULT_PIPELINE.replace('copy_stress', COPY_STRESS_AND_SET_PHONEME_LENGTH)
+
+Every stage names the stages it requires, the pipeline checks that each of them runs before it.
+"""
+
+"""
+A stage of a Pipeline
+
+Args:
+    name (str): The name shown in traces and in the instrumentation
+    run (callable): Runs the stage on a PhonemeBuffer
+    provides (tuple): The stages this one does the work of, usually only its own name. A fused stage provides the
+        stages it combines
+    requires (tuple): The stages that have to run before this one
+    traced_run (callable): Runs the stage on a TracingBuffer, used when tracing. Stages working on the buffer columns
+        (see vectorized.py) give the callback version here, which makes the same changes
+"""
+Stage = namedtuple('Stage', ['name', 'run', 'provides', 'requires', 'traced_run'])
+
+
+def make_stage(name, run, requires=(), provides=None, traced_run=None):
+    """
+    :param name: The name of the stage
+    :param run: Callable running the stage on a PhonemeBuffer
+    :param requires: The stages that have to run before this one
+    :param provides: The stages this one does the work of, defaults to its name
+    :param traced_run: Callable running the stage on a TracingBuffer, defaults to run
+    :return: Stage
+    """
+    return Stage(name, run, tuple(provides or (name,)), tuple(requires), traced_run or run)
+
+
+PARSER2 = make_stage('parser2', run_parser2)
+COPY_STRESS = make_stage('copy_stress', run_copy_stress, ('parser2',))
+SET_PHONEME_LENGTH = make_stage('set_phoneme_length', run_set_phoneme_length, ('copy_stress',))
+COPY_STRESS_AND_SET_PHONEME_LENGTH = make_stage(
+    'copy_stress_and_set_phoneme_length', run_copy_stress_and_set_phoneme_length, ('parser2',),
+    ('copy_stress', 'set_phoneme_length')
+)
+VECTORIZED_COPY_STRESS_AND_SET_PHONEME_LENGTH = make_stage(
+    'copy_stress_and_set_phoneme_length', run_vectorized_copy_stress_and_set_phoneme_length, ('parser2',),
+    ('copy_stress', 'set_phoneme_length'), run_copy_stress_and_set_phoneme_length
+)
+ADJUST_LENGTHS = make_stage('adjust_lengths', run_adjust_lengths, ('set_phoneme_length',))
+VECTORIZED_ADJUST_LENGTHS = make_stage(
+    'adjust_lengths', run_vectorized_adjust_lengths, ('set_phoneme_length',), traced_run=run_adjust_lengths
+)
+PROLONG_PLOSIVE_STOP_CONSONANTS = make_stage(
+    'prolong_plosive_stop_consonants', run_prolong_plosive_stop_consonants, ('copy_stress',)
+)
+TRUNCATE = make_stage('truncate', run_truncate)
+INSERT_BREATH = make_stage('insert_breath', run_insert_breath, ('set_phoneme_length',))
+
+
+class Pipeline:
+    """
+    Immutable list of stages run after parser1. without(), until() and replace() return new pipelines.
+
+    parse() runs on a Parser kept per thread and pipeline, parser() gives a Parser of your own.
+    """
+
+    def __init__(self, stages):
+        """
+        :param stages: Iterable of Stage, in the order they run
+        :raise ValueError: If a stage runs before a stage it requires, or if two stages provide the same stage
+        """
+        self.stages = tuple(stages)
+        provided = set()
+        for stage in self.stages:
+            missing = [name for name in stage.requires if name not in provided]
+            if missing:
+                raise ValueError(f"Stage {stage.name} requires {', '.join(missing)} to run before it")
+            twice = [name for name in stage.provides if name in provided]
+            if twice:
+                raise ValueError(f"Stage {stage.name} repeats {', '.join(twice)}")
+            provided.update(stage.provides)
+        self.steps = tuple((stage.name, stage.run) for stage in self.stages)
+        self.traced_steps = tuple((stage.name, stage.traced_run) for stage in self.stages)
+        self.parsers = local()
+
+    def __repr__(self):
+        return f"Pipeline({', '.join(self.names())})"
+
+    def names(self):
+        """
+        :return: List of the stage names, in the order they run
+        """
+        return [stage.name for stage in self.stages]
+
+    def index(self, name):
+        """
+        :param name: The name of a stage, or a stage provided by a fused stage
+        :return: The position of the stage doing its work
+        :raise ValueError: If no stage provides it
+        """
+        for pos, stage in enumerate(self.stages):
+            if stage.name == name or name in stage.provides:
+                return pos
+        raise ValueError(f'No stage {name} in {self!r}')
+
+    def without(self, *names):
+        """
+        :param names: The stages to drop
+        :return: Pipeline
+        :raise ValueError: If a stage is missing, or a remaining stage requires a dropped one
+        """
+        dropped = {self.index(name) for name in names}
+        return Pipeline(stage for pos, stage in enumerate(self.stages) if pos not in dropped)
+
+    def until(self, name):
+        """
+        :param name: The last stage to run
+        :return: Pipeline ending with the stage
+        """
+        return Pipeline(self.stages[:self.index(name) + 1])
+
+    def replace(self, name, stage):
+        """
+        Swap a stage for another implementation. Other stages whose work the new stage provides as well are dropped,
+        so replacing copy_stress with COPY_STRESS_AND_SET_PHONEME_LENGTH drops set_phoneme_length.
+
+        :param name: The stage to replace
+        :param stage: Stage
+        :return: Pipeline
+        """
+        pos = self.index(name)
+        stages = []
+        for current_pos, current in enumerate(self.stages):
+            if current_pos == pos:
+                stages.append(stage)
+            elif not set(current.provides) & set(stage.provides):
+                stages.append(current)
+        return Pipeline(stages)
+
+    def parser(self, capacity=64, max_capacity=4096):
+        """
+        :param capacity: See Parser
+        :param max_capacity: See Parser
+        :return: Parser running this pipeline
+        """
+        return Parser(capacity, max_capacity, self)
+
+    def parse(self, input_string, tracer=None, hooks=None, packed=False):
+        """
+        Parse a string of phonemes with this pipeline, see parser().
+
+        :param input_string: The phonemes, for example "/HEHLOW"
+        :param tracer: Optional Tracer receiving the changes made by the stages, see tracing.py
+        :param hooks: Optional StageHooks called around every stage, see instrumentation.py
+        :param packed: Return a PackedPhonemes (3 bytes per phoneme, see packed.py) instead of a list
+        :return: List of (phoneme index, phoneme length, stress) tuples, False if the input is empty
+        """
+        try:
+            pipeline_parser = self.parsers.parser
+        except AttributeError:
+            pipeline_parser = self.parsers.parser = self.parser()
+        return pipeline_parser.parse(input_string, tracer, hooks, packed)
+
+
+# The stages of parser(), one by one
+DEFAULT_PIPELINE = Pipeline((
+    PARSER2, COPY_STRESS, SET_PHONEME_LENGTH, ADJUST_LENGTHS, PROLONG_PLOSIVE_STOP_CONSONANTS, TRUNCATE, INSERT_BREATH
+))
+
+FUSED_PIPELINE = DEFAULT_PIPELINE.replace('copy_stress', COPY_STRESS_AND_SET_PHONEME_LENGTH)
+
+# Falls back to the fused stages without numpy
+if HAVE_NUMPY:
+    VECTORIZED_PIPELINE = FUSED_PIPELINE.replace(
+        'copy_stress', VECTORIZED_COPY_STRESS_AND_SET_PHONEME_LENGTH
+    ).replace('adjust_lengths', VECTORIZED_ADJUST_LENGTHS)
+else:
+    VECTORIZED_PIPELINE = FUSED_PIPELINE
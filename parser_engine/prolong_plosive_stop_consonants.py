@@ -1,7 +1,7 @@
 from common.constants import END
-from parser_engine.tables import combined_phoneme_length_table
-from parser_engine.constants import FLAG_0008, FLAG_STOPCONS, FLAG_UNVOICED_STOPCONS
-from parser_engine.util import phoneme_has_flag
+from parser_engine.compiled_tables import combined_phoneme_length_table
+from parser_engine.flag_tables import IS_0008, IS_STOPCONS, IS_UNVOICED_STOPCONS
+from parser_engine.rules import RULE_PROLONG_PLOSIVE
 
 
 def prolong_plosive_stop_consonants_code_41240(get_phoneme, insert_phoneme, get_stress):
@@ -14,20 +14,22 @@ def prolong_plosive_stop_consonants_code_41240(get_phoneme, insert_phoneme, get_
             break
 
         # Not a stop consonant, move to the next one
-        if not phoneme_has_flag(index, FLAG_STOPCONS):
+        if not IS_STOPCONS[index]:
             continue
 
         # If plosive, move to the next non-empty phoneme and validate the flags
-        if phoneme_has_flag(index, FLAG_UNVOICED_STOPCONS):
+        if IS_UNVOICED_STOPCONS[index]:
             next_non_empty = None
             X = pos
             while (next_non_empty := get_phoneme(X + 1)) == 0:
                 X += 1
 
             # If not END and either flag 0x0008 or '/H' or '/X'
-            if next_non_empty != END and (phoneme_has_flag(next_non_empty, FLAG_0008) or next_non_empty == 36 or next_non_empty == 37):
+            if next_non_empty != END and (IS_0008[next_non_empty] or next_non_empty == 36 or next_non_empty == 37):
                 continue
 
-        insert_phoneme(pos + 1, index + 1, get_stress(pos), combined_phoneme_length_table[index + 1] & int(0xFF))
-        insert_phoneme(pos + 2, index + 2, get_stress(pos), combined_phoneme_length_table[index + 2] & int(0xFF))
+        insert_phoneme(pos + 1, index + 1, get_stress(pos), combined_phoneme_length_table[index + 1] & int(0xFF),
+                       RULE_PROLONG_PLOSIVE)
+        insert_phoneme(pos + 2, index + 2, get_stress(pos), combined_phoneme_length_table[index + 2] & int(0xFF),
+                       RULE_PROLONG_PLOSIVE)
         pos += 2
@@ -0,0 +1,37 @@
+from array import array
+
+from parser_engine.rules import RULE_COUNT, rule_names
+
+"""
+Process-wide rule counters.
+
+The phoneme buffer counts every change a stage makes on behalf of a rule (see rules.py) in two preallocated arrays
+indexed by the rule id. Counting is an array increment, nothing is formatted or logged while parsing. The arrays
+are shared by all threads of the process; updates are not locked, so under heavy concurrency an occasional
+increment may be lost.
+
+A single firing of a rule can make more than one change, for example RULE_NASAL_STOPCONS sets two lengths and
+RULE_PROLONG_PLOSIVE inserts two phonemes.
+"""
+
+# Changes of phonemes, stresses and lengths, per rule id
+rule_changes = array('Q', bytes(8 * RULE_COUNT))
+
+# Inserted phonemes, per rule id
+rule_insertions = array('Q', bytes(8 * RULE_COUNT))
+
+
+def rule_counts():
+    """
+    :return: Dictionary of rule name -> (changes, insertions)
+    """
+    return {name: (rule_changes[rule], rule_insertions[rule]) for rule, name in enumerate(rule_names)}
+
+
+def reset_rule_counters():
+    """
+    Set all counters to zero. The arrays are cleared in place, references to them stay valid.
+    """
+    for rule in range(RULE_COUNT):
+        rule_changes[rule] = 0
+        rule_insertions[rule] = 0
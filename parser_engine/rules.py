@@ -0,0 +1,120 @@
+"""
+Stable identifiers for the rules applied by the parser stages.
+
+Every change a stage makes to the phoneme buffer is tagged with the id of the rule that caused it. The ids are
+indexes into rule_names and rule_descriptions, new rules have to be appended so existing ids never change.
+"""
+
+# parser2
+RULE_UW_ALVEOLAR            = 0   # <ALVEOLAR> UW -> <ALVEOLAR> UX
+RULE_CH                     = 1   # CH -> CH CH+1
+RULE_J                      = 2   # J -> J J+1
+RULE_DIPHTHONG_WX           = 3   # insert WX following diphthong NOT ending in IY sound
+RULE_DIPHTHONG_YX           = 4   # insert YX following diphthong ending in IY sound
+RULE_UL                     = 5   # UL -> AX L*
+RULE_UM                     = 6   # UM -> AX M*
+RULE_UN                     = 7   # UN -> AX N*
+RULE_GLOTTAL_STOP           = 8   # <STRESSED VOWEL> <SILENCE> <STRESSED VOWEL> -> ... Q <VOWEL>
+RULE_T_R                    = 9   # T* R* -> CH R*
+RULE_D_R                    = 10  # D* R* -> J* R*
+RULE_VOWEL_R                = 11  # <VOWEL> R* -> <VOWEL> RX
+RULE_VOWEL_L                = 12  # <VOWEL> L* -> <VOWEL> LX
+RULE_G_S                    = 13  # G S -> G Z
+RULE_G_GX                   = 14  # G <VOWEL OR DIPHTHONG NOT ENDING WITH IY> -> GX ...
+RULE_K_KX                   = 15  # K <VOWEL OR DIPHTHONG NOT ENDING WITH IY> -> KX ...
+RULE_S_UNVOICED_STOPCONS    = 16  # S* <UNVOICED STOP CONSONANT> -> S* <VOICED STOP CONSONANT>
+RULE_SOFTEN_T_D             = 17  # <UNSTRESSED VOWEL> T/D <PAUSE> -> <UNSTRESSED VOWEL> DX <PAUSE>
+
+# copy_stress
+RULE_COPY_STRESS            = 18  # <CONSONANT> <STRESSED VOWEL> - copy stress + 1 to the consonant
+
+# adjust_lengths
+RULE_LENGTHEN_PUNCT         = 19  # Lengthen <!FRICATIVE> or <VOICED> between <VOWEL> and <PUNCTUATION> by 1.5
+RULE_VOWEL_RX_LX_CONSONANT  = 20  # <VOWEL> <RX | LX> <CONSONANT> - decrease <VOWEL> length by 1
+RULE_VOWEL_UNVOICED_PLOSIVE = 21  # <VOWEL> <UNVOICED PLOSIVE> - decrease vowel by 1/8th
+RULE_VOWEL_VOICED           = 22  # <VOWEL> <VOWEL or VOICED CONSONANT> - increase vowel by 1/4 + 1
+RULE_NASAL_STOPCONS         = 23  # <NASAL> <STOP CONSONANT> - set nasal = 5, consonant = 6
+RULE_STOPCONS_STOPCONS      = 24  # <STOP CONSONANT> {optional silence} <STOP CONSONANT> - shorten both to 1/2 + 1
+RULE_STOPCONS_LIQUID        = 25  # <STOP CONSONANT> <LIQUID> - decrease <LIQUID> by 2
+
+# prolong_plosive_stop_consonants_code_41240
+RULE_PROLONG_PLOSIVE        = 26  # <STOP CONSONANT> -> <STOP CONSONANT> <STOP+1> <STOP+2>
+
+# insert_breath
+RULE_BREATH_PUNCT           = 27  # insert a break after punctuation
+RULE_BREATH_GLOTTAL_STOP    = 28  # replace the last pause with a glottal stop and a break after 232 frames
+
+RULE_COUNT = 29
+
+rule_names = [
+    'uw_alveolar',
+    'ch',
+    'j',
+    'diphthong_wx',
+    'diphthong_yx',
+    'ul',
+    'um',
+    'un',
+    'glottal_stop',
+    't_r',
+    'd_r',
+    'vowel_r',
+    'vowel_l',
+    'g_s',
+    'g_gx',
+    'k_kx',
+    's_unvoiced_stopcons',
+    'soften_t_d',
+    'copy_stress',
+    'lengthen_punct',
+    'vowel_rx_lx_consonant',
+    'vowel_unvoiced_plosive',
+    'vowel_voiced',
+    'nasal_stopcons',
+    'stopcons_stopcons',
+    'stopcons_liquid',
+    'prolong_plosive',
+    'breath_punct',
+    'breath_glottal_stop',
+]
+
+rule_descriptions = [
+    '<ALVEOLAR> UW -> <ALVEOLAR> UX',
+    'CH -> CH CH+1',
+    'J -> J J+1',
+    'insert WX following diphthong NOT ending in IY sound',
+    'insert YX following diphthong ending in IY sound',
+    'UL -> AX L*',
+    'UM -> AX M*',
+    'UN -> AX N*',
+    'Insert glottal stop between two stressed vowels with space between them',
+    'T* R* -> CH R*',
+    'D* R* -> J* R*',
+    '<VOWEL> R* -> <VOWEL> RX',
+    '<VOWEL> L* -> <VOWEL> LX',
+    'G S -> G Z',
+    'G <VOWEL OR DIPTHONG NOT ENDING WITH IY> -> GX <VOWEL OR DIPTHONG NOT ENDING WITH IY>',
+    'K <VOWEL OR DIPTHONG NOT ENDING WITH IY> -> KX <VOWEL OR DIPTHONG NOT ENDING WITH IY>',
+    'S* <UNVOICED STOP CONSONANT> -> S* <VOICED STOP CONSONANT>',
+    'Soften T or D following vowel or ER and preceding a pause -> DX',
+    '<CONSONANT> <STRESSED VOWEL> - copy stress + 1',
+    'Lengthen <!FRICATIVE> or <VOICED> between <VOWEL> and <PUNCTUATION> by 1.5',
+    '<VOWEL> <RX | LX> <CONSONANT> - decrease length of vowel by 1',
+    '<VOWEL> <UNVOICED PLOSIVE> - decrease vowel by 1/8th',
+    '<VOWEL> <VOWEL or VOICED CONSONANT> - increase vowel by 1/4 + 1',
+    '<NASAL> <STOP CONSONANT> - set nasal = 5, consonant = 6',
+    '<STOP CONSONANT> {optional silence} <STOP CONSONANT> - shorten both to 1/2 + 1',
+    '<STOP CONSONANT> <LIQUID> - decrease by 2',
+    '<STOP CONSONANT> - insert the two following stop consonant phases',
+    'Insert break after punctuation',
+    'Replace last pause with glottal stop and insert break',
+]
+
+# The stage that applies each rule
+rule_stages = (
+    ['parser2'] * (RULE_COPY_STRESS - RULE_UW_ALVEOLAR)
+    + ['copy_stress']
+    + ['adjust_lengths'] * (RULE_PROLONG_PLOSIVE - RULE_LENGTHEN_PUNCT)
+    + ['prolong_plosive_stop_consonants']
+    + ['insert_breath'] * (RULE_COUNT - RULE_BREATH_PUNCT)
+)
@@ -1,4 +1,4 @@
-from parser_engine.tables import combined_phoneme_length_table
+from parser_engine.compiled_tables import combined_phoneme_length_table
 from common.constants import END
 
 
@@ -0,0 +1,220 @@
+from common.constants import END
+from parser_engine.flag_tables import IS_PUNCT, IS_VOWEL
+from parser_engine.phoneme_buffer import PhonemeBuffer
+from parser_engine.parse1 import parser1
+from parser_engine.parser import FUSED_STAGES, run_insert_breath
+
+"""
+Incremental parsing.
+
+The input is split into segments that end with a punctuation phoneme. The rules of parser2, copy_stress,
+set_phoneme_length, adjust_lengths and prolong_plosive_stop_consonants_code_41240 do not look across a punctuation
+phoneme, with two exceptions that decide where a segment may end:
+
+    1. adjust_lengths lengthens the phonemes between a punctuation and the vowel in front of it. If there is no vowel
+       between two punctuations, the second one reaches back into the previous segment. A segment therefore only
+       ends at a punctuation that is followed by a vowel before the next punctuation.
+    2. adjust_lengths stops lengthening altogether if punctuation is found at position 1. This can only happen in the
+       first segment and is carried over to the following ones.
+
+Every segment after the first is parsed behind a short prefix holding the punctuation that ended the previous segment,
+so that the rules looking one phoneme back see the same phoneme as in a complete parse. The prefix is chosen so that
+adjust_lengths either keeps lengthening (PREFIX) or has stopped (PREFIX_STOPPED), and is dropped from the output.
+
+insert_breath keeps state across the whole input. It is run on a window holding everything that may still change:
+the phonemes from the last pause onwards, as a later break may be placed there.
+"""
+
+PREFIX = (0, 0)
+PREFIX_STOPPED = (0,)
+
+# Stages run on every segment, insert_breath is run on the joined segments
+SEGMENT_STAGES = tuple((name, run_stage) for name, run_stage in FUSED_STAGES if name != 'insert_breath')
+
+# insert_breath jumps to position 255 if 232 frames pass before the first pause
+FIRST_PAUSE_DEFAULT = 255
+
+
+def find_segment_end(tokens, start, stopped):
+    """
+    Find the first position where the tokens can be split into independent segments.
+
+    :param tokens: List of [phoneme, stress] tokens from parser1
+    :param start: The position to start searching at
+    :param stopped: True if adjust_lengths has stopped lengthening in the first segment
+    :return: The position behind the punctuation ending the segment, -1 if the tokens can not be split yet
+    """
+    end = -1
+    for pos in range(start, len(tokens)):
+        phoneme = tokens[pos][0]
+        if IS_PUNCT[phoneme]:
+            end = pos + 1
+            continue
+        if end != -1 and (stopped or IS_VOWEL[phoneme]):
+            return end
+    return -1
+
+
+def parse_segment(tokens, punct=None, stopped=False, stages=SEGMENT_STAGES):
+    """
+    Run the segment stages on a segment of tokens.
+
+    :param tokens: List of [phoneme, stress] tokens from parser1
+    :param punct: The punctuation phoneme ending the previous segment, None for the first segment
+    :param stopped: True if adjust_lengths has stopped lengthening in the first segment
+    :param stages: The stages to run, SEGMENT_STAGES or another implementation of them
+    :return: Tuple of (list of (phoneme, length, stress) tuples, stopped)
+    """
+    if punct is None:
+        prefix = ()
+    else:
+        prefix = (PREFIX_STOPPED if stopped else PREFIX) + (punct,)
+
+    buffer = PhonemeBuffer(len(prefix) + len(tokens) + 1)
+    for phoneme in prefix:
+        buffer.append_phoneme(phoneme)
+    for phoneme, stress in tokens:
+        buffer.append_phoneme(phoneme)
+        if stress:
+            buffer.set_last_stress(stress)
+    buffer.append_phoneme(END)
+
+    for name, run_stage in stages:
+        run_stage(buffer)
+        if name == 'parser2' and punct is None:
+            # Punctuation at position 1 stops the lengthening in adjust_lengths for the whole input
+            stopped = buffer.size > 2 and IS_PUNCT[buffer.get(1)[0]]
+
+    return buffer.to_list(len(prefix), buffer.size - 1), stopped
+
+
+class BreathWindow:
+    """
+    Runs insert_breath incrementally over the joined segments.
+    """
+
+    def __init__(self):
+        self.buffer = PhonemeBuffer()
+        self.buffer.append_phoneme(END)
+        self.state = None
+
+    def add(self, phonemes, final=False):
+        """
+        Add the parsed phonemes of a segment.
+
+        :param phonemes: List of (phoneme, length, stress) tuples
+        :param final: True if no more phonemes follow
+        :return: List of the (phoneme, length, stress) tuples that can no longer change
+        """
+        buffer = self.buffer
+        buffer.delete(buffer.size - 1)
+        buffer.extend(phonemes)
+        buffer.append_phoneme(END)
+
+        if not final and self.state is None and buffer.size <= FIRST_PAUSE_DEFAULT + 1:
+            # Wait until the phoneme insert_breath jumps to without a prior pause exists
+            return []
+
+        self.state = run_insert_breath(buffer, self.state)
+        if final:
+            return buffer.to_list()
+
+        # Everything in front of the last pause and up to the last processed position is final
+        pos, len_val, mem54 = self.state
+        done = min(mem54, pos + 1)
+        if done <= 0:
+            return []
+        result = buffer.to_list(0, done)
+        buffer.delete(0, done)
+        self.state = (pos - done, len_val, mem54 - done)
+        return result
+
+
+class StreamingParser:
+    """
+    Push-style incremental parser.
+
+    Feed the phoneme text in chunks of any size, feed() and close() return the (phoneme, length, stress) tuples that
+    can no longer change. Joined together, they are the same as the result of parser() on the complete text.
+
+    Memory use depends on the distance between punctuation and pauses, not on the length of the input. Text without
+    punctuation is held back until close().
+    """
+
+    def __init__(self):
+        self.text = ''  # Characters not parsed by parser1 yet
+        self.tokens = []  # [phoneme, stress] tokens not parsed by the segment stages yet
+        self.punct = None  # The punctuation ending the previous segment
+        self.stopped = False
+        self.breath = BreathWindow()
+        self.started = False
+        self.closed = False
+
+    def add_phoneme(self, value):
+        self.tokens.append([value, 0])
+
+    def add_stress(self, value):
+        if not self.tokens:
+            raise IndexError('Stress without a prior phoneme')
+        self.tokens[-1][1] = value
+
+    def feed(self, chunk):
+        """
+        :param chunk: The next part of the phoneme text
+        :return: List of (phoneme, length, stress) tuples
+        """
+        if self.closed:
+            raise ValueError('feed() after close()')
+        if not chunk:
+            return []
+        self.started = True
+        text = self.text + chunk
+        self.text = text[parser1(text, self.add_phoneme, self.add_stress, final=False):]
+        return self.flush_segments()
+
+    def flush_segments(self):
+        result = []
+        tokens = self.tokens
+        start = 0
+        while True:
+            end = find_segment_end(tokens, start, self.stopped)
+            if end == -1:
+                break
+            phonemes, self.stopped = parse_segment(tokens[start:end], self.punct, self.stopped)
+            self.punct = tokens[end - 1][0]
+            result += self.breath.add(phonemes)
+            start = end
+        if start:
+            del tokens[:start]
+        return result
+
+    def close(self):
+        """
+        Parse the rest of the input.
+
+        :return: List of (phoneme, length, stress) tuples, ending with END
+        """
+        if self.closed:
+            return []
+        self.closed = True
+        if not self.started:
+            return []
+        parser1(self.text, self.add_phoneme, self.add_stress)
+        self.text = ''
+        result = self.flush_segments()
+        phonemes, self.stopped = parse_segment(self.tokens, self.punct, self.stopped)
+        self.tokens = []
+        return result + self.breath.add(phonemes, final=True)
+
+
+def parse_stream(chunks):
+    """
+    Parse phoneme text arriving in chunks.
+
+    :param chunks: Iterable of strings
+    :return: Generator of (phoneme, length, stress) tuples, the same as parser() on the joined chunks
+    """
+    streaming_parser = StreamingParser()
+    for chunk in chunks:
+        yield from streaming_parser.feed(chunk)
+    yield from streaming_parser.close()
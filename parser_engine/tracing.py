@@ -0,0 +1,166 @@
+from collections import namedtuple
+from common.constants import BREAK, END
+from parser_engine.tables import phoneme_name_table
+from parser_engine.rules import rule_descriptions
+
+"""
+Trace levels
+
+    TRACE_OFF
+        Nothing is traced. parser() runs the stages directly against the phoneme buffer.
+    TRACE_RULES
+        Every change to the phoneme buffer that was made by a rule (see rules.py) is reported.
+    TRACE_FULL
+        Every change to the phoneme buffer is reported, including the table lookups of set_phoneme_length, and the
+        whole buffer is dumped after parser1 and at the end.
+"""
+TRACE_OFF = 0
+TRACE_RULES = 1
+TRACE_FULL = 2
+
+EVENT_CHANGE = 'change'
+EVENT_INSERT = 'insert'
+EVENT_STRESS = 'stress'
+EVENT_LENGTH = 'length'
+EVENT_DUMP = 'dump'
+
+"""
+A single trace event
+
+Args:
+    stage (str): The name of the stage that was running
+    event (str): One of EVENT_CHANGE, EVENT_INSERT, EVENT_STRESS, EVENT_LENGTH or EVENT_DUMP
+    position (int): The position in the phoneme buffer, None for dumps
+    rule (int): The rule id from rules.py, None if the change was not made by a rule
+    old: The previous value, None for insertions and dumps
+    new: The new value. The inserted phoneme for insertions, a list of (phoneme, length, stress) tuples for dumps
+"""
+TraceEvent = namedtuple('TraceEvent', ['stage', 'event', 'position', 'rule', 'old', 'new'])
+
+
+class Tracer:
+    """
+    Collects the trace events of parser() runs.
+
+    Events are passed to the sink, which defaults to appending them to the events list.
+    """
+
+    def __init__(self, level=TRACE_RULES, sink=None):
+        """
+        :param level: TRACE_OFF, TRACE_RULES or TRACE_FULL
+        :param sink: Callable receiving every TraceEvent
+        """
+        self.level = level
+        self.events = []
+        self.sink = sink if sink is not None else self.events.append
+        self.stage = None
+
+    def emit(self, event, position, rule, old, new):
+        self.sink(TraceEvent(self.stage, event, position, rule, old, new))
+
+    def dump(self, buffer):
+        if self.level >= TRACE_FULL:
+            self.emit(EVENT_DUMP, None, None, None, buffer.to_list())
+
+
+class TracingBuffer:
+    """
+    Wraps a PhonemeBuffer and reports the changes made through it to a Tracer.
+
+    It is only used when tracing is enabled, the stages run against the plain PhonemeBuffer otherwise.
+    """
+
+    def __init__(self, buffer, tracer):
+        self.buffer = buffer
+        self.tracer = tracer
+        self.full = tracer.level >= TRACE_FULL
+        # Reads are not traced
+        self.get_phoneme = buffer.get_phoneme
+        self.get_stress = buffer.get_stress
+        self.get_length = buffer.get_length
+        self.append_phoneme = buffer.append_phoneme
+        self.set_last_stress = buffer.set_last_stress
+        self.truncate_invalid = buffer.truncate_invalid
+        self.to_list = buffer.to_list
+
+    def set_phoneme(self, pos, value, rule=None):
+        if rule is not None or self.full:
+            self.tracer.emit(EVENT_CHANGE, pos, rule, self.buffer.get(pos)[0], value)
+        self.buffer.set_phoneme(pos, value, rule)
+
+    def insert_phoneme(self, pos, value, stress_value, length=0, rule=None):
+        if rule is not None or self.full:
+            self.tracer.emit(EVENT_INSERT, pos, rule, None, value)
+        self.buffer.insert_phoneme(pos, value, stress_value, length, rule)
+
+    def set_stress(self, pos, stress_value, rule=None):
+        if rule is not None or self.full:
+            self.tracer.emit(EVENT_STRESS, pos, rule, self.buffer.get(pos)[2], stress_value)
+        self.buffer.set_stress(pos, stress_value, rule)
+
+    def set_length(self, pos, length, rule=None):
+        if rule is not None or self.full:
+            self.tracer.emit(EVENT_LENGTH, pos, rule, self.buffer.get(pos)[1], length)
+        self.buffer.set_length(pos, length, rule)
+
+
+def phoneme_name(phoneme):
+    if phoneme < len(phoneme_name_table):
+        return phoneme_name_table[phoneme]
+    if phoneme == END:
+        return "  "
+    if phoneme == BREAK:
+        return "BR"
+    return "??"
+
+
+def format_event(event):
+    """
+    Format a trace event the way the parser used to print its debug output.
+
+    :param event: The TraceEvent
+    :return: String
+    """
+    if event.event == EVENT_DUMP:
+        return format_phonemes(event.new)
+    rule = "" if event.rule is None else f" RULE: {rule_descriptions[event.rule]}"
+    if event.event == EVENT_CHANGE:
+        change = f"CHANGE: {phoneme_name(event.old)} -> {phoneme_name(event.new)}"
+    elif event.event == EVENT_INSERT:
+        change = f"INSERT: {phoneme_name(event.new) if event.new != BREAK else 'undefined'}"
+    elif event.event == EVENT_STRESS:
+        change = f"SET STRESS: {event.old} -> {event.new}"
+    else:
+        change = f"SET LENGTH: {event.old} -> {event.new}"
+    return f"[{event.stage}] {event.position}{rule} {change}"
+
+
+def print_sink(event):
+    print(format_event(event))
+
+
+def format_phonemes(phonemes):
+    """
+    Format the internal phoneme presentation as a table.
+
+    :param phonemes: Iterable of (phoneme, length, stress) tuples
+    :return: String
+    """
+    def pad(num):
+        s = "000" + str(num)
+        return s[-3:]
+
+    lines = [
+        "==================================",
+        "Internal Phoneme presentation:",
+        " pos  idx  phoneme  length  stress",
+        "----------------------------------",
+    ]
+    for i, (phoneme, length, stress) in enumerate(phonemes):
+        lines.append(f" {pad(i)}  {pad(phoneme)}  {phoneme_name(phoneme)}       {pad(length)}     {pad(stress)}")
+    lines.append("==================================")
+    return "\n".join(lines)
+
+
+def print_phonemes(phoneme_index, phoneme_length, stress):
+    print(format_phonemes(zip(phoneme_index, phoneme_length, stress)))
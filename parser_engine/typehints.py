@@ -16,6 +16,7 @@ Set a phoneme in the buffer
 Args:
     position (int): The position in the phoneme array to set
     phoneme (int): The phoneme to set
+    rule (int, optional): The id of the rule making the change, see rules.py (default is None)
 """
 
 """
@@ -26,6 +27,7 @@ Args:
     phoneme (int): The phoneme to insert
     stress_value (int): The stress value
     length (int, optional): The optional phoneme length (default is 0)
+    rule (int, optional): The id of the rule making the change, see rules.py (default is None)
 """
 
 """
@@ -34,6 +36,7 @@ Set the length for a phoneme in the buffer
 Args:
     position (int): The position in the phoneme array to set
     length (int): The phoneme length to set
+    rule (int, optional): The id of the rule making the change, see rules.py (default is None)
 """
 
 """
@@ -52,6 +55,7 @@ Set the stress for a phoneme in the buffer
 Args:
     position (int): The position in the phoneme array to set
     stress (int): The phoneme stress to set
+    rule (int, optional): The id of the rule making the change, see rules.py (default is None)
 """
 
 """
@@ -0,0 +1,286 @@
+from common.constants import END
+from parser_engine.constants import (
+    FLAG_FRICATIVE, FLAG_LIQUIC, FLAG_NASAL, FLAG_PUNCT, FLAG_VOWEL, FLAG_CONSONANT, FLAG_VOICED, FLAG_STOPCONS,
+    FLAG_UNVOICED_STOPCONS
+)
+from parser_engine.flag_tables import np
+from parser_engine.compiled_tables import combined_phoneme_length_table, phoneme_flags
+from parser_engine.rules import (
+    RULE_COPY_STRESS, RULE_LENGTHEN_PUNCT, RULE_VOWEL_RX_LX_CONSONANT, RULE_VOWEL_UNVOICED_PLOSIVE,
+    RULE_VOWEL_VOICED, RULE_NASAL_STOPCONS, RULE_STOPCONS_STOPCONS, RULE_STOPCONS_LIQUID
+)
+from parser_engine.rule_counters import rule_changes
+from parser_engine.set_phoneme_length import set_phoneme_length
+from parser_engine.fused_stages import copy_stress_and_set_phoneme_length
+from parser_engine.adjust_lengths import adjust_lengths
+
+"""
+NumPy versions of copy_stress, set_phoneme_length and adjust_lengths.
+
+The stages are computed as operations on the uint8 columns of the phoneme buffer. The flags of all phonemes are
+gathered from a 256 entry table in one step, neighbours are compared by shifting the arrays by one position, and the
+results are written back with one slice assignment per column.
+
+The scalar stages visit the phonemes in order and some changes build on earlier ones, for example a stop consonant
+between two others is halved twice. Those cases are resolved explicitly, the results are exactly those of the scalar
+stages, including the rule counters. Where a scalar stage would fail (punctuation at the start, a phoneme missing
+from the length table, a length that does not fit in 7 bits) nothing is written and the scalar stage is run instead,
+so it raises the same error. The columns are copied, no view of the buffer storage is kept.
+
+Converting the columns costs a few microseconds, the vectorized stages pay off from a few hundred phonemes on. All
+functions require numpy.
+"""
+
+RX = 18
+LX = 19
+
+# The stop consonant length behind a nasal, and the nasal length in front of a stop consonant
+NASAL_STOP_LENGTH = 6
+NASAL_LENGTH = 5
+
+if np is not None:
+    FLAGS = np.zeros(256, dtype=np.uint16)
+    FLAGS[:len(phoneme_flags)] = phoneme_flags
+    LENGTH_TABLE = np.array(combined_phoneme_length_table, dtype=np.uint16)
+
+
+def read_columns(buffer):
+    """
+    Copy the buffer up to the first END into arrays.
+
+    :param buffer: PhonemeBuffer
+    :return: Tuple of (phonemes, stress, lengths) uint8 arrays of n + 1 entries, n being the position of the first
+        END. The last phoneme is always END
+    """
+    buffer.compact()
+    size = buffer.size
+    phonemes = np.frombuffer(buffer.phoneme_index[:size], dtype=np.uint8)
+    ends = np.flatnonzero(phonemes[:size - 1] == END)
+    count = int(ends[0]) if len(ends) else size - 1
+    phonemes = phonemes[:count + 1].copy()
+    phonemes[count] = END  # get_phoneme() returns END for the last position, whatever is stored there
+    stress = np.frombuffer(buffer.stress[:count + 1], dtype=np.uint8)
+    lengths = np.frombuffer(buffer.phoneme_length[:count + 1], dtype=np.uint8)
+    return phonemes, stress, lengths
+
+
+def write_column(column, values):
+    """
+    :param column: bytearray of the buffer, compacted
+    :param values: uint8 array written to the start of the column
+    """
+    with memoryview(column) as view:
+        view[:len(values)] = values
+
+
+def copied_stress(phonemes, stress):
+    """
+    :param phonemes: Phonemes ending with END
+    :param stress: Stress values, same size
+    :return: Tuple of (the stress values after copy_stress, the number of phonemes changed)
+    """
+    count = len(phonemes) - 1
+    flags = FLAGS[phonemes]
+    following_stress = stress[1:]
+    copied = (
+        ((flags[:count] & FLAG_CONSONANT) != 0)
+        & ((flags[1:] & FLAG_VOWEL) != 0)  # END has no flags
+        & (following_stress != 0) & (following_stress < 0x80)
+    )
+    # The stress of the following phoneme is read before it is changed itself
+    result = stress.copy()
+    result[:count][copied] = following_stress[copied] + 1
+    return result, int(np.count_nonzero(copied))
+
+
+def phoneme_lengths(phonemes, stress):
+    """
+    :param phonemes: Phonemes ending with END
+    :param stress: Stress values after copy_stress, same size
+    :return: The lengths set by set_phoneme_length without the END entry, None if set_phoneme_length would fail
+    """
+    current = phonemes[:-1]
+    if len(current) and current.max() >= len(LENGTH_TABLE):
+        return None
+    lengths = LENGTH_TABLE[current]
+    current_stress = stress[:-1]
+    unstressed = (current_stress == 0) | (current_stress > 0x7F)
+    lengths = np.where(unstressed, lengths & 0xFF, lengths >> 8)
+    if (lengths & 128).any():
+        return None
+    return lengths.astype(np.uint8)
+
+
+def lengthened_before_punctuation(flags, lengths):
+    """
+    The lengths after the first pass of adjust_lengths.
+
+    For every punctuation the scalar pass backs up to the closest vowel from position 2 on, or to position 1 if there
+    is none, and lengthens the phonemes from there to the punctuation. Backing up can pass earlier punctuation, so a
+    phoneme may be lengthened several times: the number of ranges covering a phoneme is counted and the lengthening
+    is applied that many times.
+
+    :param flags: The flags of the phonemes, ending with the (empty) flags of END
+    :param lengths: int16 lengths without the END entry, changed in place
+    :return: The number of changes, None if the scalar pass would fail
+    """
+    count = len(flags) - 1
+    current = flags[:count]
+    punctuation = np.flatnonzero(current & FLAG_PUNCT)
+    if not len(punctuation):
+        return 0
+    if punctuation[0] == 0:
+        return None  # backs up to position -1
+    if punctuation[0] == 1:
+        return 0  # backs up to the start, which ends the pass
+
+    positions = np.arange(count)
+    vowel_from_2 = np.where(((current & FLAG_VOWEL) != 0) & (positions >= 2), positions, 1)
+    starts = np.maximum.accumulate(vowel_from_2)[punctuation - 1]
+    covered = np.cumsum(
+        np.bincount(starts, minlength=count + 1) - np.bincount(punctuation, minlength=count + 1)
+    )[:count]
+    # Only <!FRICATIVE> or <VOICED> phonemes are lengthened
+    covered[((current & FLAG_FRICATIVE) != 0) & ((current & FLAG_VOICED) == 0)] = 0
+
+    for times in range(1, int(covered.max()) + 1):
+        lengthened = covered >= times
+        lengths[lengthened] += (lengths[lengthened] >> 1) + 1
+        if lengths.max() > 127:
+            return None
+    return int(covered.sum())
+
+
+def neighbour_lengths(phonemes, flags, lengths):
+    """
+    The lengths after the second pass of adjust_lengths.
+
+    The scalar pass visits the phonemes in order. A stop consonant followed by another one, with only pauses between
+    them, has its length halved when the loop reaches the first one, and again if its own following phoneme is a stop
+    consonant. Those two changes, and the length set behind a nasal, are applied in the same order here.
+
+    :param phonemes: Phonemes ending with END
+    :param flags: The flags of the phonemes
+    :param lengths: int16 lengths without the END entry, changed in place
+    :return: Dictionary of rule id -> number of changes, None if the scalar pass would fail
+    """
+    count = len(phonemes) - 1
+    current = flags[:count]
+    following = flags[1:]
+    following_phoneme = phonemes[1:]
+    old = lengths.copy()
+
+    vowel = (current & FLAG_VOWEL) != 0
+    not_vowel = ~vowel
+    nasal = not_vowel & ((current & FLAG_NASAL) != 0)
+    stop = not_vowel & ~nasal & ((current & FLAG_STOPCONS) != 0)
+    liquid = not_vowel & ~nasal & ~stop & ((current & FLAG_LIQUIC) != 0)
+    following_consonant = (following & FLAG_CONSONANT) != 0
+    following_voiced = (following & FLAG_VOICED) != 0
+    following_stop = (following & FLAG_STOPCONS) != 0  # END has no flags
+
+    # <VOWEL> <RX | LX> <CONSONANT>, <VOWEL> <UNVOICED PLOSIVE>, <VOWEL> <VOWEL or VOICED CONSONANT>
+    after_following_consonant = np.append((flags[2:] & FLAG_CONSONANT) != 0, False)
+    rx_lx = (vowel & ~following_consonant & ((following_phoneme == RX) | (following_phoneme == LX))
+             & after_following_consonant)
+    unvoiced_plosive = (vowel & following_consonant & ~following_voiced
+                        & ((following & FLAG_UNVOICED_STOPCONS) != 0))
+    voiced = vowel & following_consonant & following_voiced
+    lengths[rx_lx] -= 1
+    lengths[unvoiced_plosive] -= old[unvoiced_plosive] >> 3
+    lengths[voiced] += (old[voiced] >> 2) + 1
+
+    # <NASAL> <STOP CONSONANT>
+    nasals = np.flatnonzero(nasal & following_stop)
+
+    # <STOP CONSONANT> {optional silence} <STOP CONSONANT>
+    not_silent = np.flatnonzero(phonemes)  # END is not silent, every search ends
+    next_not_silent = not_silent[np.searchsorted(not_silent, np.arange(count), side='right')]
+    stop_stop = stop & ((flags[next_not_silent] & FLAG_STOPCONS) != 0)
+    second_stops = next_not_silent[stop_stop]
+
+    # <STOP CONSONANT> <LIQUID>
+    liquid[1:] &= (current[:-1] & FLAG_STOPCONS) != 0
+    liquid[:1] = False
+
+    # The second stop of a pair is halved when the first one is visited, a stop behind a nasal is set when the nasal
+    # is visited. Both happen before the stop is visited itself
+    lengths[second_stops] = (old[second_stops] >> 1) + 1
+    lengths[nasals + 1] = NASAL_STOP_LENGTH
+    lengths[nasals] = NASAL_LENGTH
+    lengths[stop_stop] = (lengths[stop_stop] >> 1) + 1
+    lengths[liquid] -= 2
+
+    if count and (lengths.min() < 0 or lengths.max() > 127):
+        return None
+    return {
+        RULE_VOWEL_RX_LX_CONSONANT: int(np.count_nonzero(rx_lx)),
+        RULE_VOWEL_UNVOICED_PLOSIVE: int(np.count_nonzero(unvoiced_plosive)),
+        RULE_VOWEL_VOICED: int(np.count_nonzero(voiced)),
+        RULE_NASAL_STOPCONS: 2 * len(nasals),
+        RULE_STOPCONS_STOPCONS: 2 * len(second_stops),
+        RULE_STOPCONS_LIQUID: int(np.count_nonzero(liquid)),
+    }
+
+
+def vectorized_copy_stress(buffer):
+    """
+    copy_stress on a PhonemeBuffer.
+
+    :param buffer: PhonemeBuffer
+    """
+    phonemes, stress, _ = read_columns(buffer)
+    stress, changed = copied_stress(phonemes, stress)
+    write_column(buffer.stress, stress)
+    rule_changes[RULE_COPY_STRESS] += changed
+
+
+def vectorized_set_phoneme_length(buffer):
+    """
+    set_phoneme_length on a PhonemeBuffer.
+
+    :param buffer: PhonemeBuffer
+    """
+    phonemes, stress, _ = read_columns(buffer)
+    lengths = phoneme_lengths(phonemes, stress)
+    if lengths is None:
+        set_phoneme_length(buffer.get_phoneme, buffer.get_stress, buffer.set_length)
+        return
+    write_column(buffer.phoneme_length, lengths)
+
+
+def vectorized_copy_stress_and_set_phoneme_length(buffer):
+    """
+    copy_stress_and_set_phoneme_length on a PhonemeBuffer, reading and writing the columns once.
+
+    :param buffer: PhonemeBuffer
+    """
+    phonemes, stress, _ = read_columns(buffer)
+    stress, changed = copied_stress(phonemes, stress)
+    lengths = phoneme_lengths(phonemes, stress)
+    if lengths is None:
+        copy_stress_and_set_phoneme_length(buffer.get_phoneme, buffer.get_stress, buffer.set_stress, buffer.set_length)
+        return
+    write_column(buffer.stress, stress)
+    write_column(buffer.phoneme_length, lengths)
+    rule_changes[RULE_COPY_STRESS] += changed
+
+
+def vectorized_adjust_lengths(buffer):
+    """
+    adjust_lengths on a PhonemeBuffer.
+
+    :param buffer: PhonemeBuffer
+    """
+    phonemes, _, lengths = read_columns(buffer)
+    flags = FLAGS[phonemes]
+    lengths = lengths[:-1].astype(np.int16)
+    lengthened = lengthened_before_punctuation(flags, lengths)
+    changes = neighbour_lengths(phonemes, flags, lengths) if lengthened is not None else None
+    if changes is None:
+        adjust_lengths(buffer.get_phoneme, buffer.set_length, buffer.get_length)
+        return
+    write_column(buffer.phoneme_length, lengths.astype(np.uint8))
+    rule_changes[RULE_LENGTHEN_PUNCT] += lengthened
+    for rule, count in changes.items():
+        rule_changes[rule] += count
@@ -0,0 +1,263 @@
+import re
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+from reciter_engine.rules import rules
+
+"""
+Text to phoneme conversion.
+
+The original reciter walks the whole rule list of a letter at every position and matches the contexts character by
+character. Here every rule is compiled once: the rules are indexed by their first character, and the prefix and
+suffix become regular expressions. At each position only the rules starting with the current character are tried,
+and a rule whose matched text does not start at the position is rejected with a single startswith() before any
+context is looked at.
+
+The prefix is matched against the reversed text, so it can be anchored at the position like the suffix.
+
+Most rules only look at the word they are applied to, and at the characters directly around it. A few, like
+" (THE) #", look past the boundary into the next word. Words are converted and cached on their own, unless such a
+rule was tried on them.
+"""
+
+VOWELS = 'AEIOUY'
+CONSONANTS = 'BCDFGHJKLMNPQRSTVWXZ'
+
+# Wildcards of the suffix, see rules.py
+SUFFIX_WILDCARDS = {
+    ' ': '[^A-Z]',
+    '#': '[AEIOUY]+',
+    '.': '[BDGJLMNRVWZ]',
+    '&': '(?:CH|SH|[SCGZXJ])',
+    '@': '(?:TH|CH|SH|[TSRDLZNJ])',
+    '^': f'[{CONSONANTS}]',
+    '+': '[EIY]',
+    ':': f'[{CONSONANTS}]*',
+    '%': '(?:ING|ELY|ER|ES|ED|E)',
+}
+
+# Wildcards of the prefix, matched against the reversed text
+PREFIX_WILDCARDS = {
+    ' ': '[^A-Z]',
+    '#': '[AEIOUY]+',
+    '.': '[BDGJLMNRVWZ]',
+    '&': '(?:HC|HS|[SCGZXJ])',
+    '@': '(?:HT|HC|HS|[TSRDLZNJ])',
+    '^': f'[{CONSONANTS}]',
+    '+': '[EIY]',
+    ':': f'[{CONSONANTS}]*',
+}
+
+"""
+A compiled reciter rule
+
+Args:
+    match (str): The text replaced by the rule
+    prefix: Compiled pattern of the reversed prefix, None if the rule has no prefix
+    suffix: Compiled pattern of the suffix, None if the rule has no suffix
+    phonemes (str): The replacement
+    crosses_boundary (bool): True if the prefix or suffix looks past the character in front of or behind the word
+    source (str): The rule as written in rules.py
+"""
+Rule = namedtuple('Rule', ['match', 'prefix', 'suffix', 'phonemes', 'crosses_boundary', 'source'])
+
+
+def compile_context(context, wildcards):
+    if not context:
+        return None
+    return re.compile(''.join(wildcards.get(char, re.escape(char)) for char in context))
+
+
+def compile_rule(source):
+    """
+    :param source: A rule of the form "prefix(match)suffix=phonemes"
+    :return: Rule
+    """
+    open_pos = source.index('(')
+    close_pos = source.index(')', open_pos + 2)
+    equals_pos = source.index('=', close_pos)
+    pattern = source[:equals_pos]
+    phonemes = source[equals_pos + 1:]
+    prefix = pattern[:open_pos]
+    suffix = pattern[close_pos + 1:]
+    if '%' in prefix:
+        raise ValueError(f"'%' is only allowed in the suffix: {source}")
+    return Rule(
+        pattern[open_pos + 1:close_pos],
+        compile_context(prefix[::-1], PREFIX_WILDCARDS),
+        compile_context(suffix, SUFFIX_WILDCARDS),
+        phonemes,
+        ' ' in prefix.lstrip(' ') or ' ' in suffix.rstrip(' '),
+        source
+    )
+
+
+def build_rule_index(sources):
+    """
+    :param sources: The rules in the order they are tried
+    :return: Dictionary of first character -> tuple of Rule
+    """
+    index = {}
+    for source in sources:
+        rule = compile_rule(source)
+        index.setdefault(rule.match[0], []).append(rule)
+    return {char: tuple(char_rules) for char, char_rules in index.items()}
+
+
+rule_index = build_rule_index(rules)
+
+
+def convert(text, start, end, index=None):
+    """
+    Convert text[start:end] to phonemes. The characters outside the range are only used as context.
+
+    :param text: The upper case text
+    :param start: The first position to convert
+    :param end: The position behind the last one to convert
+    :param index: The rule index, see build_rule_index()
+    :return: Tuple of (string of phonemes, True if a rule looking past the boundary of a word was tried)
+    """
+    if index is None:
+        index = rule_index
+    reversed_text = text[::-1]
+    length = len(text)
+    output = []
+    crosses_boundary = False
+    pos = start
+    while pos < end:
+        char = text[pos]
+        if char == '.' and not text[pos + 1:pos + 2].isdigit():
+            # A period is the end of a sentence, unless it is part of a number
+            output.append('.')
+            pos += 1
+            continue
+
+        for rule in index.get(char, ()):
+            match = rule.match
+            if not text.startswith(match, pos):
+                continue
+            crosses_boundary |= rule.crosses_boundary
+            after = pos + len(match)
+            if rule.suffix is not None and rule.suffix.match(text, after) is None:
+                continue
+            if rule.prefix is not None and rule.prefix.match(reversed_text, length - pos) is None:
+                continue
+            output.append(rule.phonemes)
+            pos = after
+            break
+        else:
+            # There is no rule for the character, it is ignored
+            pos += 1
+
+    return ''.join(output), crosses_boundary
+
+
+class Reciter:
+    """
+    Converts English text to the phoneme strings parser() expects.
+
+    The text is converted word by word and the words are cached. Words a rule looking into the neighbouring words
+    was tried on are cached together with their surroundings.
+    """
+
+    def __init__(self, cache_size=4096, index=None):
+        """
+        :param cache_size: The number of words to cache, 0 disables the cache, None for no limit
+        :param index: The rule index, see build_rule_index()
+        """
+        self.index = rule_index if index is None else index
+        if cache_size == 0:
+            self.convert_word = self.convert_word_uncached
+            self.convert_in_context = self.convert_in_context_uncached
+        else:
+            self.convert_word = lru_cache(maxsize=cache_size)(self.convert_word_uncached)
+            self.convert_in_context = lru_cache(maxsize=cache_size)(self.convert_in_context_uncached)
+
+    def convert_word_uncached(self, word):
+        """
+        :param word: Upper case text without white space
+        :return: Tuple of (string of phonemes, True if the result may depend on the neighbouring words)
+        """
+        return convert(' ' + word + ' ', 1, len(word) + 1, self.index)
+
+    def convert_in_context_uncached(self, before, word, after):
+        """
+        :param before: The text in front of the word
+        :param word: Upper case text without white space
+        :param after: The text behind the word
+        :return: String of phonemes
+        """
+        return convert(before + word + after, len(before), len(before) + len(word), self.index)[0]
+
+    def text_to_phonemes(self, text):
+        """
+        :param text: English text, for example "Hello, my name is SAM."
+        :return: String of phonemes, for example "/HEHLOW, MAY NEYM IHZ SAEM."
+        """
+        words = WORD_PATTERN.findall(text.upper())
+        output = []
+        for pos, word in enumerate(words):
+            if word[0].isspace():
+                output.append(' ' * len(word))
+                continue
+            phonemes, crosses_boundary = self.convert_word(word)
+            if crosses_boundary:
+                before = ''.join(words[max(pos - 2, 0):pos]) or ' '
+                after = ''.join(words[pos + 1:pos + 3]) or ' '
+                phonemes = self.convert_in_context(before, word, after)
+            output.append(phonemes)
+        return ''.join(output)
+
+    def cache_info(self):
+        """
+        :return: functools cache statistics (hits, misses, maxsize, currsize) of the word cache, None if the cache is
+            disabled
+        """
+        cache_info = getattr(self.convert_word, 'cache_info', None)
+        return cache_info() if cache_info is not None else None
+
+
+WORD_PATTERN = re.compile(r'\s+|\S+')
+
+default_reciter = Reciter()
+
+
+def text_to_phonemes(text):
+    """
+    Convert English text to phonemes with the shared default Reciter.
+
+    :param text: English text
+    :return: String of phonemes
+    """
+    return default_reciter.text_to_phonemes(text)
+
+
+"""
+Reciter throughput
+
+Args:
+    words (int): The number of words converted
+    seconds (float): The time it took
+    words_per_second (float): words / seconds
+"""
+Throughput = namedtuple('Throughput', ['words', 'seconds', 'words_per_second'])
+
+
+def measure_throughput(text, rounds=10, reciter=None):
+    """
+    Measure how many words per second the reciter converts.
+
+    :param text: The text to convert in every round
+    :param rounds: The number of rounds
+    :param reciter: The Reciter to measure, defaults to a new one without a cache
+    :return: Throughput
+    """
+    if reciter is None:
+        reciter = Reciter(cache_size=0)
+    words = len(text.split()) * rounds
+    start = time.perf_counter()
+    for _ in range(rounds):
+        reciter.text_to_phonemes(text)
+    seconds = time.perf_counter() - start
+    return Throughput(words, seconds, words / seconds if seconds else float('inf'))
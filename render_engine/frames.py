@@ -0,0 +1,232 @@
+from collections import namedtuple
+
+import numpy as np
+
+from common.constants import BREAK, END
+from parser_engine.constants import PHONEME_PERIOD, PHONEME_QUESTION, FLAG_FRICATIVE, FLAG_VOICED
+from parser_engine.tables import phoneme_flags
+from render_engine.tables import (
+    freq1_table, freq2_table, freq3_table, ampl1_table, ampl2_table, ampl3_table, mouth_formants_5_29,
+    throat_formants_5_29, mouth_formants_48_53, throat_formants_48_53, blend_rank_table, out_blend_length_table,
+    in_blend_length_table, stress_pitch_table, amplitude_rescale_table, RISING_INFLECTION, FALLING_INFLECTION,
+    INFLECTION_FRAMES
+)
+
+"""
+Per-frame synthesis parameters of a breath group. Every field is an int array with one entry per frame.
+
+Args:
+    pitch: The length of a glottal pulse in synthesizer ticks, a lower value is a higher pitch
+    frequency1: The formant 1 frequency, the phase step per tick of the first sine oscillator
+    frequency2: The formant 2 frequency, the phase step per tick of the second sine oscillator
+    frequency3: The formant 3 frequency, the phase step per tick of the rectangle oscillator
+    amplitude1: The formant 1 amplitude, 0 to 15
+    amplitude2: The formant 2 amplitude, 0 to 15
+    amplitude3: The formant 3 amplitude, 0 to 15
+    noise: NOISE_NONE, NOISE_VOICED or NOISE_UNVOICED
+"""
+Frames = namedtuple('Frames', [
+    'pitch', 'frequency1', 'frequency2', 'frequency3', 'amplitude1', 'amplitude2', 'amplitude3', 'noise'
+])
+
+NOISE_NONE = 0
+NOISE_VOICED = 1  # the end of every glottal pulse is replaced with noise
+NOISE_UNVOICED = 2  # noise only, no glottal pulses
+
+# Stop consonants are followed by two phases (see prolong_plosive_stop_consonants.py). The first phase of an
+# unvoiced stop consonant is the closure and stays silent, the release phases are noise
+UNVOICED_STOP_RELEASES = (67, 68, 70, 71, 73, 74, 76, 77)
+
+
+def build_noise_table():
+    table = []
+    for flags in phoneme_flags:
+        if flags & FLAG_FRICATIVE:
+            table.append(NOISE_VOICED if flags & FLAG_VOICED else NOISE_UNVOICED)
+        else:
+            table.append(NOISE_NONE)
+    for phoneme in (36, 37) + UNVOICED_STOP_RELEASES:  # /H, /X
+        table[phoneme] = NOISE_UNVOICED
+    return table
+
+
+noise_table = np.array(build_noise_table() + [NOISE_NONE] * (len(freq1_table) - len(phoneme_flags)))
+freq3_data = np.array(freq3_table)
+ampl1_data = np.array(ampl1_table)
+ampl2_data = np.array(ampl2_table)
+ampl3_data = np.array(ampl3_table)
+stress_pitch_data = np.array(stress_pitch_table)
+amplitude_rescale_data = np.array(amplitude_rescale_table)
+
+
+def scale_formant(setting, frequency):
+    return ((setting * frequency) >> 8) << 1
+
+
+def formant_tables(mouth=128, throat=128):
+    """
+    Apply the mouth and throat settings to the formant 1 and formant 2 frequencies.
+
+    :param mouth: The mouth setting, 0 to 255
+    :param throat: The throat setting, 0 to 255
+    :return: Tuple of (formant 1 frequencies, formant 2 frequencies) arrays, indexed by phoneme
+    """
+    freq1 = list(freq1_table)
+    freq2 = list(freq2_table)
+    for pos, (mouth_formant, throat_formant) in enumerate(zip(mouth_formants_5_29, throat_formants_5_29)):
+        freq1[pos + 5] = scale_formant(mouth, mouth_formant)
+        freq2[pos + 5] = scale_formant(throat, throat_formant)
+    for pos, (mouth_formant, throat_formant) in enumerate(zip(mouth_formants_48_53, throat_formants_48_53)):
+        freq1[pos + 48] = scale_formant(mouth, mouth_formant)
+        freq2[pos + 48] = scale_formant(throat, throat_formant)
+    return np.array(freq1), np.array(freq2)
+
+
+def breath_groups(phonemes):
+    """
+    Split the parser output at every BREAK. Pauses and phonemes without length produce no frames and are dropped.
+
+    :param phonemes: Iterable of (phoneme index, phoneme length, stress) tuples, as returned by parser()
+    :return: Generator of lists of (phoneme index, phoneme length, stress) tuples
+    """
+    group = []
+    for phoneme, length, stress in phonemes:
+        if phoneme == END:
+            break
+        if phoneme == BREAK:
+            if group:
+                yield group
+            group = []
+            continue
+        if phoneme == 0 or length == 0:
+            continue
+        group.append((phoneme, length, stress))
+    if group:
+        yield group
+
+
+def add_inflection(pitch, direction, end):
+    """
+    Let the pitch rise or fall over the frames leading up to a period or question mark.
+
+    :param pitch: The pitch array
+    :param direction: RISING_INFLECTION or FALLING_INFLECTION
+    :param end: The first frame of the punctuation
+    """
+    start = max(end - INFLECTION_FRAMES, 0)
+    if start < end:
+        pitch[start:end] = pitch[start] + direction * np.arange(1, end - start + 1)
+
+
+def interpolate(values, start, width, delta):
+    """
+    Replace the values following `start` with a linear ramp of `width` steps of `delta` in total.
+
+    :param values: The array to change
+    :param start: The position of the start value
+    :param width: The number of steps
+    :param delta: The difference between the start and the end value
+    """
+    last = len(values) - 1
+    base = values[min(max(start, 0), last)]
+    steps = np.arange(1, width)
+    ramp = base + np.sign(delta) * (abs(delta) * steps // width)
+    positions = start + steps
+    valid = (positions >= 0) & (positions <= last)
+    values[positions[valid]] = ramp[valid]
+
+
+def create_transitions(frames, phonemes, lengths):
+    """
+    Blend the frames of every phoneme into the next one.
+
+    :param frames: Frames of the breath group
+    :param phonemes: List of the phoneme indexes
+    :param lengths: List of the phoneme lengths
+    """
+    last = len(frames.pitch) - 1
+    blended = (frames.frequency1, frames.frequency2, frames.frequency3,
+               frames.amplitude1, frames.amplitude2, frames.amplitude3)
+    boundary = 0
+    for pos in range(len(phonemes) - 1):
+        phoneme = phonemes[pos]
+        next_phoneme = phonemes[pos + 1]
+        rank = blend_rank_table[phoneme]
+        next_rank = blend_rank_table[next_phoneme]
+        if rank == next_rank:
+            phase1 = out_blend_length_table[phoneme]
+            phase2 = out_blend_length_table[next_phoneme]
+        elif rank < next_rank:
+            phase1 = in_blend_length_table[next_phoneme]
+            phase2 = out_blend_length_table[next_phoneme]
+        else:
+            phase1 = out_blend_length_table[phoneme]
+            phase2 = in_blend_length_table[phoneme]
+
+        boundary += lengths[pos]
+        start = boundary - phase1
+        width = phase1 + phase2
+        if not 2 <= width < 130:
+            continue
+
+        # The pitch is blended from the middle of the phoneme to the middle of the next one
+        cur_width = lengths[pos] // 2
+        next_width = lengths[pos + 1] // 2
+        pitch = frames.pitch
+        delta = pitch[min(boundary + next_width, last)] - pitch[max(boundary - cur_width, 0)]
+        if cur_width + next_width:
+            interpolate(pitch, start, cur_width + next_width, delta)
+
+        end = min(boundary + phase2, last)
+        for values in blended:
+            interpolate(values, start, width, values[end] - values[max(start, 0)])
+
+
+def create_frames(group, pitch=64, freq1=None, freq2=None):
+    """
+    Expand a breath group into frames. Every phoneme produces as many frames as its length.
+
+    :param group: List of (phoneme index, phoneme length, stress) tuples, see breath_groups()
+    :param pitch: The base pitch, a lower value is a higher pitch
+    :param freq1: The formant 1 frequencies by phoneme, see formant_tables()
+    :param freq2: The formant 2 frequencies by phoneme, see formant_tables()
+    :return: Frames
+    """
+    if freq1 is None or freq2 is None:
+        freq1, freq2 = formant_tables()
+
+    phonemes = [phoneme for phoneme, _, _ in group]
+    lengths = [length for _, length, _ in group]
+    phoneme_array = np.array(phonemes)
+    length_array = np.array(lengths)
+    stress_array = np.minimum(np.array([stress for _, _, stress in group]), len(stress_pitch_table) - 1)
+
+    frame_phonemes = np.repeat(phoneme_array, length_array)
+    frames = Frames(
+        np.repeat(pitch + stress_pitch_data[stress_array], length_array),
+        freq1[frame_phonemes],
+        freq2[frame_phonemes],
+        freq3_data[frame_phonemes],
+        ampl1_data[frame_phonemes],
+        ampl2_data[frame_phonemes],
+        ampl3_data[frame_phonemes],
+        noise_table[frame_phonemes]
+    )
+
+    starts = np.cumsum(length_array) - length_array
+    for phoneme, start in zip(phonemes, starts.tolist()):
+        if phoneme == PHONEME_PERIOD:
+            add_inflection(frames.pitch, RISING_INFLECTION, start)
+        elif phoneme == PHONEME_QUESTION:
+            add_inflection(frames.pitch, FALLING_INFLECTION, start)
+
+    create_transitions(frames, phonemes, lengths)
+
+    # Subtracting half the formant 1 frequency adds variety to the voice
+    frames.pitch[:] -= frames.frequency1 >> 1
+
+    last_amplitude = len(amplitude_rescale_table) - 1
+    for amplitude in (frames.amplitude1, frames.amplitude2, frames.amplitude3):
+        amplitude[:] = amplitude_rescale_data[np.clip(amplitude, 0, last_amplitude)]
+
+    return frames
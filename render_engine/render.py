@@ -0,0 +1,146 @@
+import numpy as np
+
+from render_engine.frames import NOISE_VOICED, NOISE_UNVOICED, breath_groups, create_frames, formant_tables
+
+"""
+Speech synthesis.
+
+The synthesizer runs on ticks: every frame lasts `speed` ticks and a tick is TICK_SAMPLES output samples long. Each
+glottal pulse restarts the three formant oscillators, the pulse length is the pitch of the frame it starts in. A
+tick outputs the sum of the oscillators weighted by the formant amplitudes as a 4 bit value, noise frames output
+random values instead.
+
+Only the pulse boundaries depend on each other. They are found in a loop over the pulses, everything else is
+computed for all ticks of a breath group at once.
+"""
+
+SAMPLE_RATE = 22050
+TICK_SAMPLES = 162 / 50
+
+SPEED = 72
+PITCH = 64
+MOUTH = 128
+THROAT = 128
+
+# 4 bit signed oscillator tables
+sine_table = np.clip(np.floor(np.sin(np.arange(256) * (2 * np.pi / 256)) * 8), -8, 7).astype(np.int32)
+rectangle_table = np.where(np.arange(256) < 128, -7, 7).astype(np.int32)
+
+# The two 4 bit values noise alternates between
+NOISE_LOW = 5
+NOISE_HIGH = 10
+
+
+def glottal_pulses(pitch, speed, ticks):
+    """
+    :param pitch: The pitch of every frame
+    :param speed: The number of ticks per frame
+    :param ticks: The number of ticks
+    :return: Tuple of (pulse index of every tick, pulse start ticks, pulse lengths) arrays
+    """
+    pitch = np.clip(pitch, 1, 255).tolist()
+    starts = []
+    lengths = []
+    tick = 0
+    while tick < ticks:
+        length = pitch[tick // speed]
+        starts.append(tick)
+        lengths.append(length)
+        tick += length
+    starts = np.array(starts)
+    durations = np.diff(np.append(starts, ticks))
+    return np.repeat(np.arange(len(starts)), durations), starts, np.array(lengths)
+
+
+def oscillator_phase(frequency, pulse, starts):
+    """
+    :param frequency: The phase step of every tick
+    :param pulse: The pulse index of every tick
+    :param starts: The start tick of every pulse
+    :return: The oscillator phase of every tick, 0 at the start of every pulse
+    """
+    total = np.cumsum(frequency) - frequency
+    return (total - total[starts][pulse]) & 255
+
+
+def synthesize(frames, speed=SPEED, noise=None):
+    """
+    Synthesize the ticks of a breath group.
+
+    :param frames: Frames, see create_frames()
+    :param speed: The number of ticks per frame
+    :param noise: Random bits for the noise frames, one per tick. Defaults to a fixed seed
+    :return: uint8 array of 4 bit values, one per tick
+    """
+    frame_count = len(frames.pitch)
+    ticks = frame_count * speed
+    frame = np.repeat(np.arange(frame_count), speed)
+    pulse, starts, lengths = glottal_pulses(frames.pitch, speed, ticks)
+
+    voice = (
+        sine_table[oscillator_phase(frames.frequency1[frame], pulse, starts)] * frames.amplitude1[frame] +
+        sine_table[oscillator_phase(frames.frequency2[frame], pulse, starts)] * frames.amplitude2[frame] +
+        rectangle_table[oscillator_phase(frames.frequency3[frame], pulse, starts)] * frames.amplitude3[frame]
+    )
+    output = np.clip(((voice >> 1) + 136) >> 4, 0, 15)
+
+    noise_type = frames.noise[frame]
+    if noise_type.any():
+        if noise is None:
+            noise = np.random.default_rng(0).integers(0, 2, ticks)
+        noise_values = np.where(noise[:ticks] != 0, NOISE_HIGH, NOISE_LOW)
+        # Voiced noise replaces the last quarter of every glottal pulse
+        pulse_lengths = lengths[pulse]
+        in_tail = (np.arange(ticks) - starts[pulse]) >= pulse_lengths - (pulse_lengths >> 2)
+        use_noise = (noise_type == NOISE_UNVOICED) | ((noise_type == NOISE_VOICED) & in_tail)
+        output = np.where(use_noise, noise_values, output)
+
+    return output.astype(np.uint8)
+
+
+def ticks_to_samples(ticks):
+    """
+    Resample synthesizer ticks to SAMPLE_RATE 8 bit unsigned samples.
+
+    :param ticks: uint8 array of 4 bit values
+    :return: uint8 array of samples
+    """
+    sample_count = int(len(ticks) * TICK_SAMPLES)
+    positions = (np.arange(sample_count) * 50) // 162
+    return ticks[positions] << 4
+
+
+def render(phonemes, speed=SPEED, pitch=PITCH, mouth=MOUTH, throat=THROAT, seed=0):
+    """
+    Render the output of parser() to speech.
+
+    :param phonemes: Iterable of (phoneme index, phoneme length, stress) tuples, as returned by parser()
+    :param speed: The number of ticks per frame, higher is slower
+    :param pitch: The base pitch, higher is lower
+    :param mouth: The mouth setting, 0 to 255
+    :param throat: The throat setting, 0 to 255
+    :param seed: The seed of the noise generator, the same seed renders the same samples
+    :return: uint8 array of SAMPLE_RATE 8 bit unsigned mono samples
+    """
+    if not phonemes:
+        return np.zeros(0, dtype=np.uint8)
+
+    freq1, freq2 = formant_tables(mouth, throat)
+    rng = np.random.default_rng(seed)
+    parts = []
+    for group in breath_groups(phonemes):
+        frames = create_frames(group, pitch, freq1, freq2)
+        parts.append(synthesize(frames, speed, rng.integers(0, 2, len(frames.pitch) * speed)))
+    if not parts:
+        return np.zeros(0, dtype=np.uint8)
+    return ticks_to_samples(np.concatenate(parts))
+
+
+def to_float(samples):
+    """
+    Convert 8 bit unsigned samples to float32 in the range [-1, 1), for example for playing them with sounddevice.
+
+    :param samples: uint8 array
+    :return: float32 array
+    """
+    return (samples.astype(np.float32) - 128) / 128
@@ -0,0 +1,163 @@
+"""
+Render tables, indexed by phoneme (see phoneme_name_table in parser_engine/tables.py).
+
+Every table has an entry for all 81 phonemes. UN (80) never reaches the renderer as parser2 replaces it, its entry
+is a copy of UM.
+"""
+
+# Formant 1 frequency (mouth)
+freq1_table = [
+    0x00, 0x13, 0x13, 0x13, 0x13, 0x0A, 0x0E, 0x12,  # 00 - 07
+    0x18, 0x1A, 0x16, 0x14, 0x10, 0x14, 0x0E, 0x12,  # 08 - 15
+    0x0E, 0x12, 0x12, 0x10, 0x0C, 0x0E, 0x0A, 0x12,  # 16 - 23
+    0x0E, 0x0A, 0x08, 0x06, 0x06, 0x06, 0x06, 0x11,  # 24 - 31
+    0x06, 0x06, 0x06, 0x06, 0x0E, 0x10, 0x09, 0x0A,  # 32 - 39
+    0x08, 0x0A, 0x06, 0x06, 0x06, 0x05, 0x06, 0x00,  # 40 - 47
+    0x12, 0x1A, 0x14, 0x1A, 0x12, 0x0C, 0x06, 0x06,  # 48 - 55
+    0x06, 0x06, 0x06, 0x06, 0x06, 0x06, 0x06, 0x06,  # 56 - 63
+    0x06, 0x06, 0x06, 0x06, 0x06, 0x06, 0x06, 0x06,  # 64 - 71
+    0x06, 0x0A, 0x0A, 0x06, 0x06, 0x06, 0x2C, 0x13,  # 72 - 79
+    0x13,                                            # 80
+]
+
+# Formant 2 frequency (throat)
+freq2_table = [
+    0x00, 0x43, 0x43, 0x43, 0x43, 0x54, 0x48, 0x42,  # 00 - 07
+    0x3E, 0x28, 0x2C, 0x1E, 0x24, 0x2C, 0x48, 0x30,  # 08 - 15
+    0x24, 0x1E, 0x32, 0x24, 0x1C, 0x44, 0x18, 0x32,  # 16 - 23
+    0x1E, 0x18, 0x52, 0x2E, 0x36, 0x56, 0x36, 0x43,  # 24 - 31
+    0x49, 0x4F, 0x1A, 0x42, 0x49, 0x25, 0x33, 0x42,  # 32 - 39
+    0x28, 0x2F, 0x4F, 0x4F, 0x42, 0x4F, 0x6E, 0x00,  # 40 - 47
+    0x48, 0x26, 0x1E, 0x2A, 0x1E, 0x22, 0x1A, 0x1A,  # 48 - 55
+    0x1A, 0x42, 0x42, 0x42, 0x6E, 0x6E, 0x6E, 0x54,  # 56 - 63
+    0x54, 0x54, 0x1A, 0x1A, 0x1A, 0x42, 0x42, 0x42,  # 64 - 71
+    0x6D, 0x56, 0x6D, 0x54, 0x54, 0x54, 0x7F, 0x7F,  # 72 - 79
+    0x7F,                                            # 80
+]
+
+# Formant 3 frequency
+freq3_table = [
+    0x00, 0x5B, 0x5B, 0x5B, 0x5B, 0x6E, 0x5D, 0x5B,  # 00 - 07
+    0x58, 0x59, 0x57, 0x58, 0x52, 0x59, 0x5D, 0x3E,  # 08 - 15
+    0x52, 0x58, 0x3E, 0x6E, 0x50, 0x5D, 0x5A, 0x3C,  # 16 - 23
+    0x6E, 0x5A, 0x6E, 0x51, 0x79, 0x65, 0x79, 0x5B,  # 24 - 31
+    0x63, 0x6A, 0x51, 0x79, 0x5D, 0x52, 0x5D, 0x67,  # 32 - 39
+    0x4C, 0x5D, 0x65, 0x65, 0x79, 0x65, 0x79, 0x00,  # 40 - 47
+    0x5A, 0x58, 0x58, 0x58, 0x58, 0x52, 0x51, 0x51,  # 48 - 55
+    0x51, 0x79, 0x79, 0x79, 0x70, 0x6E, 0x6E, 0x5E,  # 56 - 63
+    0x5E, 0x5E, 0x51, 0x51, 0x51, 0x79, 0x79, 0x79,  # 64 - 71
+    0x65, 0x65, 0x70, 0x5E, 0x5E, 0x5E, 0x08, 0x01,  # 72 - 79
+    0x01,                                            # 80
+]
+
+# Formant 1 amplitude
+ampl1_table = [
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x0D, 0x0D, 0x0E,  # 00 - 07
+    0x0F, 0x0F, 0x0F, 0x0F, 0x0F, 0x0C, 0x0D, 0x0C,  # 08 - 15
+    0x0F, 0x0F, 0x0D, 0x0D, 0x0D, 0x0E, 0x0D, 0x0C,  # 16 - 23
+    0x0D, 0x0D, 0x0D, 0x0C, 0x09, 0x09, 0x00, 0x00,  # 24 - 31
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x0B, 0x0B,  # 32 - 39
+    0x0B, 0x0B, 0x00, 0x00, 0x01, 0x0B, 0x00, 0x02,  # 40 - 47
+    0x0E, 0x0F, 0x0F, 0x0F, 0x0F, 0x0D, 0x02, 0x04,  # 48 - 55
+    0x00, 0x02, 0x04, 0x00, 0x01, 0x04, 0x00, 0x01,  # 56 - 63
+    0x04, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,  # 64 - 71
+    0x00, 0x0C, 0x00, 0x00, 0x00, 0x00, 0x0F, 0x0F,  # 72 - 79
+    0x0F,                                            # 80
+]
+
+# Formant 2 amplitude
+ampl2_table = [
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x0A, 0x0B, 0x0D,  # 00 - 07
+    0x0E, 0x0D, 0x0C, 0x0C, 0x0B, 0x09, 0x0B, 0x0B,  # 08 - 15
+    0x0C, 0x0C, 0x0C, 0x08, 0x08, 0x0C, 0x08, 0x0A,  # 16 - 23
+    0x08, 0x08, 0x0A, 0x03, 0x09, 0x06, 0x00, 0x00,  # 24 - 31
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x03, 0x05,  # 32 - 39
+    0x03, 0x04, 0x00, 0x00, 0x00, 0x05, 0x0A, 0x02,  # 40 - 47
+    0x0E, 0x0D, 0x0C, 0x0D, 0x0C, 0x08, 0x00, 0x01,  # 48 - 55
+    0x00, 0x00, 0x01, 0x00, 0x00, 0x01, 0x00, 0x00,  # 56 - 63
+    0x01, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,  # 64 - 71
+    0x00, 0x0A, 0x00, 0x00, 0x0A, 0x00, 0x00, 0x00,  # 72 - 79
+    0x00,                                            # 80
+]
+
+# Formant 3 amplitude
+ampl3_table = [
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x08, 0x07, 0x08,  # 00 - 07
+    0x08, 0x01, 0x01, 0x00, 0x01, 0x00, 0x07, 0x05,  # 08 - 15
+    0x01, 0x00, 0x06, 0x01, 0x00, 0x07, 0x00, 0x05,  # 16 - 23
+    0x01, 0x00, 0x08, 0x00, 0x00, 0x03, 0x00, 0x00,  # 24 - 31
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x01,  # 32 - 39
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x01, 0x0E, 0x01,  # 40 - 47
+    0x09, 0x01, 0x00, 0x01, 0x00, 0x00, 0x00, 0x00,  # 48 - 55
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,  # 56 - 63
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,  # 64 - 71
+    0x00, 0x07, 0x00, 0x00, 0x05, 0x00, 0x13, 0x10,  # 72 - 79
+    0x10,                                            # 80
+]
+
+# Mouth (formant 1) and throat (formant 2) frequencies the mouth and throat settings are applied to, for the phonemes
+# 5 to 29 and 48 to 53. They replace the entries of freq1_table and freq2_table
+mouth_formants_5_29 = [
+    10, 14, 19, 24, 27, 23, 21, 16, 20, 14, 18, 14, 18, 18, 16, 13, 15, 11, 18, 14, 11, 9, 6, 6, 6
+]
+throat_formants_5_29 = [
+    84, 73, 67, 63, 40, 44, 31, 37, 45, 73, 49, 36, 30, 51, 37, 29, 69, 24, 50, 30, 24, 83, 46, 54, 86
+]
+mouth_formants_48_53 = [19, 27, 21, 27, 18, 13]
+throat_formants_48_53 = [72, 39, 31, 43, 30, 34]
+
+# Blending between two phonemes uses the blend lengths of the phoneme with the higher rank
+blend_rank_table = [
+    0x00, 0x1F, 0x1F, 0x1F, 0x1F, 0x02, 0x02, 0x02,  # 00 - 07
+    0x02, 0x02, 0x02, 0x02, 0x02, 0x02, 0x05, 0x05,  # 08 - 15
+    0x02, 0x0A, 0x02, 0x08, 0x05, 0x05, 0x0B, 0x0A,  # 16 - 23
+    0x09, 0x08, 0x08, 0xA0, 0x08, 0x08, 0x17, 0x1F,  # 24 - 31
+    0x12, 0x12, 0x12, 0x12, 0x1E, 0x1E, 0x14, 0x14,  # 32 - 39
+    0x14, 0x14, 0x17, 0x17, 0x1A, 0x1A, 0x1D, 0x1D,  # 40 - 47
+    0x02, 0x02, 0x02, 0x02, 0x02, 0x02, 0x1A, 0x1D,  # 48 - 55
+    0x1B, 0x1A, 0x1D, 0x1B, 0x1A, 0x1D, 0x1B, 0x1A,  # 56 - 63
+    0x1D, 0x1B, 0x17, 0x1D, 0x17, 0x17, 0x1D, 0x17,  # 64 - 71
+    0x17, 0x1D, 0x17, 0x17, 0x1D, 0x17, 0x17, 0x17,  # 72 - 79
+    0x17,                                            # 80
+]
+
+# Number of frames at the end of a phoneme blended into the next one
+out_blend_length_table = [
+    0x00, 0x02, 0x02, 0x02, 0x02, 0x04, 0x04, 0x04,  # 00 - 07
+    0x04, 0x04, 0x04, 0x04, 0x04, 0x04, 0x04, 0x04,  # 08 - 15
+    0x04, 0x04, 0x03, 0x02, 0x04, 0x04, 0x02, 0x02,  # 16 - 23
+    0x02, 0x02, 0x02, 0x01, 0x01, 0x01, 0x01, 0x01,  # 24 - 31
+    0x01, 0x01, 0x01, 0x01, 0x01, 0x01, 0x02, 0x02,  # 32 - 39
+    0x02, 0x01, 0x00, 0x01, 0x00, 0x01, 0x00, 0x05,  # 40 - 47
+    0x05, 0x05, 0x05, 0x05, 0x04, 0x04, 0x02, 0x00,  # 48 - 55
+    0x01, 0x02, 0x00, 0x01, 0x02, 0x00, 0x01, 0x02,  # 56 - 63
+    0x00, 0x01, 0x02, 0x00, 0x02, 0x02, 0x00, 0x01,  # 64 - 71
+    0x03, 0x00, 0x02, 0x03, 0x00, 0x02, 0xA0, 0xA0,  # 72 - 79
+    0xA0,                                            # 80
+]
+
+# Number of frames at the start of a phoneme blended from the previous one
+in_blend_length_table = [
+    0x00, 0x02, 0x02, 0x02, 0x02, 0x04, 0x04, 0x04,  # 00 - 07
+    0x04, 0x04, 0x04, 0x04, 0x04, 0x04, 0x04, 0x04,  # 08 - 15
+    0x04, 0x04, 0x03, 0x03, 0x04, 0x04, 0x03, 0x03,  # 16 - 23
+    0x03, 0x03, 0x03, 0x01, 0x02, 0x03, 0x02, 0x01,  # 24 - 31
+    0x03, 0x03, 0x03, 0x03, 0x01, 0x01, 0x03, 0x03,  # 32 - 39
+    0x03, 0x02, 0x02, 0x03, 0x02, 0x03, 0x00, 0x00,  # 40 - 47
+    0x05, 0x05, 0x05, 0x05, 0x04, 0x04, 0x02, 0x00,  # 48 - 55
+    0x02, 0x02, 0x00, 0x03, 0x02, 0x00, 0x04, 0x02,  # 56 - 63
+    0x00, 0x03, 0x02, 0x00, 0x02, 0x02, 0x00, 0x02,  # 64 - 71
+    0x03, 0x00, 0x03, 0x03, 0x00, 0x03, 0xB0, 0xA0,  # 72 - 79
+    0xA0,                                            # 80
+]
+
+# Pitch offset by stress, a lower value is a higher pitch. Stress values above 8 use the last entry
+stress_pitch_table = [-32, -26, -20, -13, -7, 0, 6, 12, 6]
+
+# 4 bit formant amplitudes are mapped onto this scale
+amplitude_rescale_table = [0, 1, 2, 2, 2, 3, 3, 4, 4, 5, 6, 8, 9, 0x0B, 0x0D, 0x0F, 0]
+
+# Direction the pitch takes in the frames leading up to a period or question mark
+RISING_INFLECTION = 1
+FALLING_INFLECTION = -1
+INFLECTION_FRAMES = 30
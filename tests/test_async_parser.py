@@ -0,0 +1,141 @@
+import asyncio
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from threading import Event, Lock
+from parser_engine.async_parser import AsyncParser
+from parser_engine.batch import init_worker
+from parser_engine.parser import parser
+
+
+class GatedParser:
+    """
+    parser() that blocks until the gate is opened and records the inputs and the concurrency it was called with.
+    """
+
+    def __init__(self):
+        self.gate = Event()
+        self.lock = Lock()
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+
+    def __call__(self, input_string):
+        with self.lock:
+            self.calls.append(input_string)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            self.gate.wait(5)
+            return parser(input_string)
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+class TestAsyncParser(unittest.IsolatedAsyncioTestCase):
+    values = ['SAH5KSEHSFUHL', 'PREHNTIHS', '/HEHLOW , MAY NEYM IHZ SAEM.', 'KAHMPYUWTER']
+
+    async def test_parse_async(self):
+        async with AsyncParser(max_in_flight=2) as async_parser:
+            results = await asyncio.gather(*(async_parser.parse_async(value) for value in self.values))
+            self.assertEqual(results, [parser(value) for value in self.values])
+            with self.assertRaisesRegex(Exception, 'Could not parse char'):
+                await async_parser.parse_async('bad input')
+            self.assertIs(await async_parser.parse_async(''), False)
+
+    async def test_process_pool(self):
+        with ProcessPoolExecutor(2, initializer=init_worker) as executor:
+            async with AsyncParser(executor, max_in_flight=2) as async_parser:
+                results = await asyncio.gather(*(async_parser.parse_async(value) for value in self.values))
+        self.assertEqual(results, [parser(value) for value in self.values])
+
+    async def test_bounded_concurrency(self):
+        function = GatedParser()
+        async with AsyncParser(max_in_flight=2, function=function) as async_parser:
+            tasks = [asyncio.ensure_future(async_parser.parse_async(value)) for value in self.values]
+            await asyncio.sleep(0.05)
+            self.assertEqual(len(function.calls), 2)
+            function.gate.set()
+            self.assertEqual(await asyncio.gather(*tasks), [parser(value) for value in self.values])
+        self.assertEqual(function.max_running, 2)
+
+    async def test_merges_identical_requests(self):
+        function = GatedParser()
+        async with AsyncParser(function=function) as async_parser:
+            tasks = [asyncio.ensure_future(async_parser.parse_async('/HEHLOW')) for _ in range(5)]
+            await asyncio.sleep(0.01)
+            function.gate.set()
+            results = await asyncio.gather(*tasks)
+            self.assertEqual(function.calls, ['/HEHLOW'])
+            self.assertEqual(async_parser.merged, 4)
+            self.assertEqual(results, [parser('/HEHLOW')] * 5)
+            # Every request gets its own list
+            self.assertEqual(len({id(result) for result in results}), 5)
+            # Once finished, the same input is parsed again
+            await async_parser.parse_async('/HEHLOW')
+            self.assertEqual(function.calls, ['/HEHLOW'] * 2)
+
+    async def test_deadline(self):
+        function = GatedParser()
+        async with AsyncParser(max_in_flight=1, function=function) as async_parser:
+            first = asyncio.ensure_future(async_parser.parse_async('/HEHLOW'))
+            await asyncio.sleep(0.01)
+            # Waits for the slot held by the first request and gives up
+            started = time.monotonic()
+            with self.assertRaises(TimeoutError):
+                await async_parser.parse_async('KAHMPYUWTER', timeout=0.05)
+            self.assertLess(time.monotonic() - started, 1)
+            function.gate.set()
+            self.assertEqual(await first, parser('/HEHLOW'))
+            self.assertEqual(function.calls, ['/HEHLOW'])
+
+    async def test_cancellation(self):
+        function = GatedParser()
+        async with AsyncParser(max_in_flight=1, function=function) as async_parser:
+            first = asyncio.ensure_future(async_parser.parse_async('/HEHLOW'))
+            waiting = [asyncio.ensure_future(async_parser.parse_async('KAHMPYUWTER')) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            waiting[0].cancel()
+            await asyncio.sleep(0.01)
+            self.assertIn('KAHMPYUWTER', async_parser.jobs)
+            waiting[1].cancel()
+            await asyncio.sleep(0.01)
+            # No request waits for it any more, it is dropped before it runs
+            self.assertNotIn('KAHMPYUWTER', async_parser.jobs)
+            function.gate.set()
+            await first
+            await asyncio.sleep(0.01)
+            self.assertEqual(function.calls, ['/HEHLOW'])
+
+    async def test_parse_stream(self):
+        async def inputs():
+            for value in self.values + ['bad input']:
+                yield value
+
+        async with AsyncParser(max_in_flight=2) as async_parser:
+            results = [result async for result in async_parser.parse_stream(inputs())]
+            self.assertEqual([result.index for result in results], list(range(5)))
+            self.assertEqual([result.output for result in results[:4]], [parser(value) for value in self.values])
+            self.assertIsNone(results[4].output)
+            self.assertTrue(results[4].error.startswith('Exception'))
+            results = [result async for result in async_parser.parse_stream(self.values)]
+            self.assertEqual([result.output for result in results], [parser(value) for value in self.values])
+
+    async def test_stream_backpressure(self):
+        taken = []
+
+        def inputs():
+            for value in self.values * 5:
+                taken.append(value)
+                yield value
+
+        async with AsyncParser(max_in_flight=2) as async_parser:
+            stream = async_parser.parse_stream(inputs())
+            await stream.__anext__()
+            self.assertLessEqual(len(taken), 3)
+            await stream.aclose()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from parser_engine.parser import parser
+from parser_engine.batch import parse_many
+from parser_engine.packed import PackedPhonemes
+
+
+class TestParseMany(unittest.TestCase):
+    values = ['SAH5KSEHSFUHL', 'PREHNTIHS', 'bad input', '/HEHLOW , MAY NEYM IHZ SAEM.', '', 'KAHMPYUWTER'] * 5
+
+    def check_results(self, results):
+        self.assertEqual(sorted(result.index for result in results), list(range(len(self.values))))
+        for result in results:
+            with self.subTest(index = result.index):
+                self.assertEqual(result.input, self.values[result.index])
+                if result.input == 'bad input':
+                    self.assertIsNone(result.output)
+                    self.assertTrue(result.error.startswith('Exception'))
+                else:
+                    self.assertIsNone(result.error)
+                    self.assertEqual(result.output, parser(result.input))
+
+    def test_in_process(self):
+        results = list(parse_many(self.values, workers=0, chunksize=4))
+        self.assertEqual([result.index for result in results], list(range(len(self.values))))
+        self.check_results(results)
+
+    def test_process_pool_ordered(self):
+        results = list(parse_many(iter(self.values), workers=2, chunksize=3, max_pending=2))
+        self.assertEqual([result.index for result in results], list(range(len(self.values))))
+        self.check_results(results)
+
+    def test_process_pool_unordered(self):
+        self.check_results(list(parse_many((value for value in self.values), workers=2, chunksize=4, ordered=False)))
+
+    def test_packed(self):
+        results = list(parse_many(self.values, workers=2, chunksize=4, packed=True))
+        self.check_results(results)
+        self.assertIsInstance(results[0].output, PackedPhonemes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from parser_engine.parser import parser
+from benchmarks.corpus import build_corpus, synthetic_input
+from benchmarks.parser_benchmark import run_benchmark, compare, format_report, main, STAGE_NAMES
+
+
+class TestParserBenchmark(unittest.TestCase):
+    def test_corpus(self):
+        corpus = build_corpus(synthetic_lengths=(300,))
+        self.assertIn('/HEHLOW', corpus)
+        self.assertEqual(len(corpus), len(set(corpus)))
+        self.assertGreaterEqual(len(corpus[-1]), 300)
+        self.assertEqual(synthetic_input(300), corpus[-1])
+        self.assertTrue(parser(synthetic_input(2000, seed=3)))
+
+    def test_results(self):
+        results = run_benchmark(['SAH5KSEHSFUHL', '/HEHLOW , MAY NEYM IHZ SAEM.', '1'], rounds=1)
+        self.assertEqual(tuple(results['stages']), STAGE_NAMES)
+        self.assertEqual(results['corpus']['utterances'], 2)
+        self.assertEqual(results['corpus']['skipped'], 1)
+        self.assertEqual(results['corpus']['phonemes'], 11 + 26)
+        for name, result in results['stages'].items():
+            with self.subTest(stage = name):
+                self.assertGreater(result['us_per_utterance'], 0)
+        json.dumps(results)
+        self.assertIn('parser1', format_report(results))
+
+    def test_compare(self):
+        def results(us):
+            return {'stages': {name: {'us_per_utterance': value} for name, value in us.items()}}
+
+        baseline = results({'parser1': 10.0, 'parser2': 10.0, 'parser': 100.0})
+        current = results({'parser1': 10.5, 'parser2': 12.0, 'parser': 150.0, 'copy_stress': 5.0})
+        regressions = compare(baseline, current, 0.1)
+        self.assertEqual([regression.stage for regression in regressions], ['parser2', 'parser'])
+        self.assertAlmostEqual(regressions[1].change, 0.5)
+        self.assertEqual(compare(baseline, current, 1.0), [])
+
+    def test_main_fails_on_regression(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            with open(path, 'w') as json_file:
+                json.dump({'stages': {'parser': {'us_per_utterance': 1e-6}}}, json_file)
+            output = io.StringIO()
+            with redirect_stdout(output), redirect_stderr(output):
+                self.assertEqual(main(['--rounds', '1', '--baseline', path]), 1)
+            self.assertIn('REGRESSION', output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
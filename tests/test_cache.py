@@ -0,0 +1,80 @@
+import unittest
+from threading import Thread
+from parser_engine.parser import parser
+from parser_engine.cache import ParserCache, entry_size
+
+
+class TestParserCache(unittest.TestCase):
+    values = ['SAH5KSEHSFUHL', 'PREHNTIHS', '/HEHLOW , MAY NEYM IHZ SAEM.', 'KAHMPYUWTER']
+
+    def test_results(self):
+        cache = ParserCache()
+        for value in self.values * 2:
+            with self.subTest(value = value):
+                result = cache.parse(value)
+                self.assertIsInstance(result, tuple)
+                self.assertEqual(list(result), parser(value))
+        self.assertEqual(tuple(cache.stats()), (4, 4, 0, 4, cache.bytes))
+        self.assertIs(cache.parse(''), False)
+
+    def test_entry_budget(self):
+        cache = ParserCache(max_entries=2)
+        cache.parse(self.values[0])
+        cache.parse(self.values[1])
+        cache.parse(self.values[0])  # values[1] is now the least recently used
+        cache.parse(self.values[2])
+        self.assertEqual(list(cache.entries), [self.values[0], self.values[2]])
+        self.assertEqual(cache.stats().evictions, 1)
+
+    def test_byte_budget(self):
+        cache = ParserCache(max_bytes=2000)
+        for value in self.values * 3:
+            cache.parse(value)
+        stats = cache.stats()
+        self.assertLessEqual(stats.bytes, 2000)
+        self.assertGreater(stats.evictions, 0)
+        self.assertEqual(stats.bytes, sum(entry_size(key, result) for key, (result, _) in cache.entries.items()))
+
+    def test_normalize(self):
+        cache = ParserCache(normalize=str.strip)
+        self.assertEqual(cache.parse('  PREHNTIHS '), cache.parse('PREHNTIHS'))
+        self.assertEqual(cache.stats().hits, 1)
+
+    def test_errors_are_not_cached(self):
+        cache = ParserCache()
+        for _ in range(2):
+            with self.assertRaises(Exception):
+                cache.parse('bad input')
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats().misses, 2)
+
+    def test_warm_up(self):
+        cache = ParserCache()
+        self.assertEqual(cache.warm_up(self.values + ['bad input', '']), 4)
+        cache.parse(self.values[0])
+        self.assertEqual(cache.stats().hits, 1)
+
+    def test_threads(self):
+        cache = ParserCache(max_entries=3)
+        expected = {value: parser(value) for value in self.values}
+        wrong = []
+
+        def work():
+            for _ in range(50):
+                for value in self.values:
+                    if list(cache.parse(value)) != expected[value]:
+                        wrong.append(value)
+
+        threads = [Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(wrong, [])
+        stats = cache.stats()
+        self.assertEqual(stats.hits + stats.misses, 4 * 50 * 4)
+        self.assertEqual(stats.entries, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from parser_engine.parser import parser
+from parser_engine.cli import LineReader, RECORD_HEADER, parse_file, format_summary, main
+
+LINES = [b'/HEHLOW', b'', b'bad input', b'SAH5KSEHSFUHL', b'KAHMPYUWTER']
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.input_path = os.path.join(directory.name, 'input.txt')
+        self.output_path = os.path.join(directory.name, 'output')
+        with open(self.input_path, 'wb') as file:
+            file.write(b'\r\n'.join(LINES))  # CRLF line ends and no final line end
+
+    def read_binary(self, data):
+        records = {}
+        pos = 0
+        while pos < len(data):
+            line, count = RECORD_HEADER.unpack_from(data, pos)
+            pos += RECORD_HEADER.size
+            records[line] = [tuple(data[pos + i:pos + i + 3]) for i in range(0, count * 3, 3)]
+            pos += count * 3
+        return records
+
+    def test_line_reader(self):
+        expected = [line.decode() for line in LINES]
+        with open(self.input_path, 'rb') as file:
+            reader = LineReader(file)
+            self.assertEqual(list(reader), expected)
+            self.assertEqual(reader.bytes_read, os.path.getsize(self.input_path))
+        reader = LineReader(io.BytesIO(b'\r\n'.join(LINES)))
+        self.assertEqual(list(reader), expected)
+        self.assertEqual(list(LineReader(io.BytesIO())), [])
+
+    def test_jsonl(self):
+        output = io.BytesIO()
+        errors = io.StringIO()
+        with open(self.input_path, 'rb') as file:
+            summary = parse_file(file, output, 'jsonl', error_file=errors)
+        records = [json.loads(line) for line in output.getvalue().decode().splitlines()]
+        self.assertEqual([record['line'] for record in records], [1, 3, 4, 5])
+        self.assertEqual(records[0]['phonemes'], [list(phoneme) for phoneme in parser('/HEHLOW')])
+        self.assertEqual(records[1]['input'], 'bad input')
+        self.assertTrue(records[1]['error'].startswith('Exception'))
+        self.assertTrue(errors.getvalue().startswith('line 3: Exception'))
+        self.assertEqual(summary[:4], (5, 3, 1, 1))
+        self.assertEqual(summary.output_bytes, len(output.getvalue()))
+        self.assertIn('5 lines (3 parsed, 1 failed, 1 blank)', format_summary(summary))
+
+    def test_binary_with_jobs(self):
+        output = io.BytesIO()
+        with open(self.input_path, 'rb') as file:
+            summary = parse_file(file, output, 'binary', jobs=2, chunksize=2)
+        records = self.read_binary(output.getvalue())
+        self.assertEqual(sorted(records), [1, 4, 5])
+        for line, phonemes in records.items():
+            self.assertEqual(phonemes, parser(LINES[line - 1].decode()))
+        self.assertEqual(summary.phonemes, sum(len(phonemes) for phonemes in records.values()))
+
+    def test_main(self):
+        self.assertEqual(main([self.input_path, '-o', self.output_path, '--format', 'binary', '--quiet']), 1)
+        with open(self.output_path, 'rb') as file:
+            self.assertEqual(sorted(self.read_binary(file.read())), [1, 4, 5])
+
+    def test_module_entry_point(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        process = subprocess.run([sys.executable, '-m', 'parser_engine', '-'], input=b'/HEHLOW\nPREHNTIHS\n',
+                                 capture_output=True, cwd=root, env=dict(os.environ, PYTHONPATH=root))
+        self.assertEqual(process.returncode, 0, process.stderr)
+        self.assertEqual(len(process.stdout.splitlines()), 2)
+        self.assertIn(b'2 lines (2 parsed, 0 failed, 0 blank)', process.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import parser_engine.compiled_tables as compiled_tables
+import parser_engine.tables as tables
+from benchmarks.startup import run_python, parse_importtime, measure_startup
+from parser_engine.compile_tables import render_module, flag_names, OUTPUT_PATH
+from parser_engine.flag_tables import build_flag_table
+
+
+class TestCompiledTables(unittest.TestCase):
+    def test_generated_module_is_up_to_date(self):
+        with open(OUTPUT_PATH, encoding='utf-8') as file:
+            self.assertEqual(file.read(), render_module(),
+                             'compiled_tables.py is out of date, run python -m parser_engine.compile_tables')
+
+    def test_tables_match_source(self):
+        self.assertEqual(list(compiled_tables.stress_table), tables.stress_table)
+        self.assertEqual(list(compiled_tables.phoneme_name_table), tables.phoneme_name_table)
+        self.assertEqual(list(compiled_tables.phoneme_flags), tables.phoneme_flags)
+        self.assertEqual(list(compiled_tables.combined_phoneme_length_table), tables.combined_phoneme_length_table)
+        for name, flag in flag_names():
+            self.assertEqual(list(getattr(compiled_tables, 'IS_' + name)), list(build_flag_table(flag)), name)
+
+    def test_indexes_match_table_scan(self):
+        for name, i in compiled_tables.full_match_index.items():
+            self.assertEqual(tables.phoneme_name_table.index(name), i)
+        self.assertEqual(compiled_tables.stress_index['1'], tables.stress_table.index('1'))
+
+
+class TestStartup(unittest.TestCase):
+    def test_import_is_lazy(self):
+        output = run_python(['-c', 'import sys, parser_engine.parser; print(" ".join(sorted(sys.modules)))']).stdout
+        modules = output.split()
+        for name in ('numpy', 'parser_engine.tables', 'parser_engine.vectorized', 'parser_engine.tracing',
+                     'parser_engine.packed', 'pickle'):
+            self.assertNotIn(name, modules)
+
+    def test_parse_importtime(self):
+        output = ('import time: self [us] | cumulative | imported package\n'
+                  'import time:       120 |        120 |   parser_engine.constants\n'
+                  'import time:      2000 |      21000 | parser_engine.parser\n')
+        self.assertEqual(parse_importtime(output), {'parser_engine.constants': 120e-6, 'parser_engine.parser': 0.021})
+
+    def test_measure_startup(self):
+        startup = measure_startup(runs=1, top=3)
+        self.assertAlmostEqual(startup.total_seconds, startup.import_seconds + startup.parse_seconds)
+        self.assertEqual(len(startup.modules), 3)
+        self.assertIn('parser_engine.parser', [name for _, name in startup.modules])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from parser_engine.daemon import DaemonClient, DaemonError, HEADER, MAX_REQUEST_SIZE, STATUS_ERROR, STATUS_OK
+from parser_engine.daemon import decode_response, encode_request, parse_batch, run_load
+from parser_engine.parser import parser
+
+
+class TestParseBatch(unittest.TestCase):
+    def test_responses(self):
+        responses = parse_batch(['/HEHLOW', 'bad input', '', '/HEHLOW'])
+        self.assertEqual(decode_response(responses[0]), (STATUS_OK, parser('/HEHLOW', packed=True).data))
+        self.assertEqual(decode_response(responses[1]), (STATUS_ERROR, b'Exception: Could not parse char b'))
+        self.assertEqual(decode_response(responses[2]), (STATUS_OK, b''))
+        # Identical inputs of a batch share the response
+        self.assertIs(responses[3], responses[0])
+
+
+@unittest.skipUnless(hasattr(os, 'fork') and hasattr(socket, 'AF_UNIX'), 'the daemon needs fork and Unix sockets')
+class TestParserDaemon(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, 'parser.sock')
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(path or os.curdir for path in sys.path))
+        cls.process = subprocess.Popen(
+            [sys.executable, '-m', 'parser_engine.daemon', 'serve', '--socket', cls.path, '--workers', '2'], env=env
+        )
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                DaemonClient(cls.path).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline or cls.process.poll() is not None:
+                    cls.process.kill()
+                    raise
+                time.sleep(0.05)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.process.terminate()
+        cls.process.wait(10)
+        socket_removed = not os.path.exists(cls.path)
+        cls.directory.cleanup()
+        assert socket_removed, 'The daemon did not remove its socket'
+
+    values = ['SAH5KSEHSFUHL', 'PREHNTIHS', '/HEHLOW , MAY NEYM IHZ SAEM.', 'KAHMPYUWTER']
+
+    def test_parse(self):
+        with DaemonClient(self.path) as client:
+            for value in self.values:
+                with self.subTest(value = value):
+                    self.assertEqual(client.parse(value), parser(value))
+            self.assertEqual(len(client.parse('')), 0)
+            with self.assertRaisesRegex(DaemonError, 'Could not parse char'):
+                client.parse('bad input')
+            # The connection stays usable after an error
+            self.assertEqual(client.parse('/HEHLOW'), parser('/HEHLOW'))
+
+    def test_pipelined(self):
+        inputs = self.values * 20 + ['bad input']
+        with DaemonClient(self.path) as client:
+            results = client.parse_many(inputs)
+        self.assertEqual(results[:-1], [parser(value) for value in inputs[:-1]])
+        self.assertIsInstance(results[-1], DaemonError)
+
+    def read_until_eof(self, sock):
+        data = bytearray()
+        while True:
+            chunk = sock.recv(1 << 16)
+            if not chunk:
+                return data
+            data += chunk
+
+    def split_responses(self, data):
+        responses = []
+        while data:
+            size, = HEADER.unpack_from(data)
+            responses.append(decode_response(data[:HEADER.size + size]))
+            del data[:HEADER.size + size]
+        return responses
+
+    def test_request_too_large(self):
+        with DaemonClient(self.path) as client:
+            client.sock.sendall(HEADER.pack(MAX_REQUEST_SIZE + 1))
+            with self.assertRaisesRegex(DaemonError, 'too large'):
+                client.receive()
+
+    def test_request_too_large_after_valid_requests(self):
+        with DaemonClient(self.path) as client:
+            client.sock.sendall(encode_request('/HEHLOW') + encode_request('KAHMPYUWTER')
+                                + HEADER.pack(MAX_REQUEST_SIZE + 1))
+            responses = self.split_responses(self.read_until_eof(client.sock))
+        self.assertEqual(responses, [
+            (STATUS_OK, parser('/HEHLOW', packed=True).data), (STATUS_OK, parser('KAHMPYUWTER', packed=True).data),
+            (STATUS_ERROR, b'Request too large'),
+        ])
+
+    def test_half_closed_connection_gets_every_response(self):
+        for _ in range(5):
+            with DaemonClient(self.path) as client:
+                client.sock.sendall(b''.join(encode_request(value) for value in self.values[:3]))
+                client.sock.shutdown(socket.SHUT_WR)
+                responses = self.split_responses(self.read_until_eof(client.sock))
+            self.assertEqual(responses, [(STATUS_OK, parser(value, packed=True).data) for value in self.values[:3]])
+
+    def test_parse_many_larger_than_socket_buffers(self):
+        with DaemonClient(self.path) as client:
+            results = client.parse_many([self.values[2]] * 20000)
+        self.assertEqual(len(results), 20000)
+        self.assertEqual(results[-1], parser(self.values[2]))
+
+    def test_client_not_reading_does_not_stall_others(self):
+        # A client sending much more than it reads fills the socket buffers in both directions
+        flooder = DaemonClient(self.path)
+        self.addCleanup(flooder.close)
+        sender = threading.Thread(target=flooder.sock.sendall,
+                                  args=(encode_request(self.values[2]) * 50000,), daemon=True)
+        sender.start()
+        time.sleep(0.5)
+        for _ in range(4):
+            with DaemonClient(self.path, timeout=5) as client:
+                self.assertEqual(client.parse('/HEHLOW'), parser('/HEHLOW'))
+        for _ in range(50000):
+            flooder.receive()
+        sender.join(10)
+        self.assertFalse(sender.is_alive())
+
+    def test_load(self):
+        report = run_load(self.path, self.values, connections=3, requests=200, depth=4)
+        self.assertEqual((report.requests, report.errors), (200, 0))
+        self.assertGreater(report.requests_per_second, 0)
+        self.assertLessEqual(report.p50, report.p99)
+
+
+@unittest.skipUnless(hasattr(os, 'fork') and hasattr(socket, 'AF_UNIX'), 'the daemon needs fork and Unix sockets')
+class TestFailingWorker(unittest.TestCase):
+    script = """
+import sys
+from parser_engine.daemon import ParserDaemon, Worker
+
+def run(self):
+    raise RuntimeError('worker broke')
+
+Worker.run = run
+ParserDaemon(sys.argv[1], workers=2).serve_forever()
+"""
+
+    def test_crash_is_logged_and_respawns_are_rate_limited(self):
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(path or os.curdir for path in sys.path))
+            process = subprocess.Popen([sys.executable, '-c', self.script, os.path.join(directory, 'parser.sock')],
+                                       env=env, stderr=subprocess.PIPE, text=True)
+            time.sleep(2)
+            process.terminate()
+            _, stderr = process.communicate(timeout=10)
+        self.assertIn('RuntimeError: worker broke', stderr)
+        # Without a delay the daemon forks thousands of workers in two seconds
+        respawns = stderr.count('respawning in')
+        self.assertGreater(respawns, 0)
+        self.assertLess(respawns, 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
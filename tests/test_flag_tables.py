@@ -0,0 +1,34 @@
+import unittest
+import parser_engine.constants as constants
+import parser_engine.flag_tables as flag_tables
+from common.constants import BREAK, END
+from parser_engine.util import phoneme_has_flag
+
+
+class TestFlagTables(unittest.TestCase):
+    def flags(self):
+        for name in dir(constants):
+            if name.startswith('FLAG_'):
+                yield name[len('FLAG_'):], getattr(constants, name)
+
+    def test_tables_match_phoneme_has_flag(self):
+        for name, flag in self.flags():
+            table = getattr(flag_tables, 'IS_' + name)
+            with self.subTest(flag = name):
+                self.assertEqual(len(table), 256)
+                self.assertEqual(list(table), [phoneme_has_flag(i, flag) for i in range(256)])
+                self.assertFalse(table[END])
+                self.assertFalse(table[BREAK])
+
+    @unittest.skipIf(flag_tables.np is None, 'numpy is not installed')
+    def test_numpy_masks(self):
+        np = flag_tables.np
+        phonemes = np.arange(256, dtype=np.uint8)
+        for name, flag in self.flags():
+            with self.subTest(flag = name):
+                mask = flag_tables.flag_mask(flag)
+                self.assertEqual(mask[phonemes].tolist(), list(getattr(flag_tables, 'IS_' + name)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import random
+import unittest
+from common.constants import END
+from parser_engine.phoneme_buffer import PhonemeBuffer
+from parser_engine.parser import parser, parser1, run_parser2, run_copy_stress, run_set_phoneme_length
+from parser_engine.parser import run_copy_stress_and_set_phoneme_length
+from parser_engine.tables import phoneme_name_table
+from parser_engine.tracing import Tracer, TRACE_OFF
+
+
+class TestCopyStressAndSetPhonemeLength(unittest.TestCase):
+    def run_both(self, phonemes):
+        """
+        :param phonemes: List of (phoneme, stress) tuples
+        :return: Tuple of (result of the sequential stages, result of the fused stage), a result is the buffer
+            contents or the type of the exception raised
+        """
+        results = []
+        for stages in ((run_copy_stress, run_set_phoneme_length), (run_copy_stress_and_set_phoneme_length,)):
+            buffer = PhonemeBuffer(3)
+            for phoneme, stress in phonemes:
+                buffer.insert_phoneme(len(buffer), phoneme, stress)
+            buffer.append_phoneme(END)
+            try:
+                for run_stage in stages:
+                    run_stage(buffer)
+                results.append(buffer.to_list())
+            except Exception as e:
+                results.append(type(e))
+        return results
+
+    def test_random_buffers(self):
+        rng = random.Random(16)
+        stresses = [0] * 8 + list(range(1, 9)) + [0x7F, 0x80, 0x85]
+        for _ in range(2000):
+            phonemes = [(rng.randrange(80), rng.choice(stresses)) for _ in range(rng.randint(0, 40))]
+            with self.subTest(phonemes = phonemes):
+                sequential, fused = self.run_both(phonemes)
+                self.assertEqual(fused, sequential)
+
+    def test_random_inputs(self):
+        rng = random.Random(160)
+        names = [name[0] if name[1] == '*' else name for name in phoneme_name_table if name != '**']
+        for _ in range(1000):
+            tokens = []
+            for _ in range(rng.randint(1, 30)):
+                tokens.append(rng.choice(names) if rng.random() < 0.75 else rng.choice(' 12345678'))
+            input_string = 'AA' + ''.join(tokens)
+            buffer = PhonemeBuffer()
+            parser1(input_string, buffer.append_phoneme, buffer.set_last_stress)
+            buffer.append_phoneme(END)
+            run_parser2(buffer)
+            phonemes = [(phoneme, stress) for phoneme, _, stress in buffer.to_list(0, len(buffer) - 1)]
+            with self.subTest(input_string = input_string):
+                sequential, fused = self.run_both(phonemes)
+                self.assertEqual(fused, sequential)
+
+    def test_parser_uses_fused_stages(self):
+        value = 'LOY5TER KAHMPYUWTER, /HEHLOW.'
+        # A tracer with level TRACE_OFF still takes the fused path, a traced parse runs the separate stages
+        self.assertEqual(parser(value), parser(value, Tracer(TRACE_OFF)))
+        self.assertEqual(parser(value), parser(value, Tracer()))
+
+
+if __name__ == '__main__':
+    unittest.main()
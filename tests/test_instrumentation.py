@@ -0,0 +1,73 @@
+import tracemalloc
+import unittest
+from parser_engine.parser import parser, STAGES
+from parser_engine.instrumentation import Histogram, StageAggregator, StageHooks
+from parser_engine.tracing import Tracer, TRACE_FULL
+
+
+class TestHistogram(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = Histogram(lowest=1, highest=1000, buckets_per_octave=8)
+        self.assertIsNone(histogram.percentile(50))
+        for value in range(1, 101):
+            histogram.record(value)
+        self.assertEqual((histogram.count, histogram.min, histogram.max), (100, 1, 100))
+        for percent in (50, 90, 99):
+            with self.subTest(percent = percent):
+                self.assertAlmostEqual(histogram.percentile(percent), percent, delta=percent * 0.1)
+        self.assertEqual(histogram.percentile(100), 100)
+        self.assertEqual(histogram.percentile(0), 1)
+        histogram.record(5000)
+        self.assertEqual(histogram.percentile(100), 5000)
+        self.assertEqual(histogram.buckets()[-1], (float('inf'), 101))
+
+
+class TestStageHooks(unittest.TestCase):
+    values = ['SAH5KSEHSFUHL', '/HEHLOW , MAY NEYM IHZ SAEM.', 'CHUW AART, OYL.']
+
+    def test_records(self):
+        records = []
+        hooks = StageHooks(sink=records.append)
+        for value in self.values:
+            with self.subTest(value = value):
+                self.assertEqual(parser(value, hooks=hooks), parser(value))
+        stage_names = ['parser1'] + [name for name, _ in STAGES]
+        self.assertEqual([record.stage for record in records], stage_names * len(self.values))
+        for first, record in zip(records, records[1:]):
+            if record.stage != 'parser1':
+                self.assertEqual(record.phonemes_in, first.phonemes_out)
+        self.assertEqual(records[-1].phonemes_out, len(parser(self.values[-1])))
+        self.assertTrue(all(record.allocated_bytes is None for record in records))
+
+        snapshot = hooks.aggregator.snapshot()
+        self.assertEqual(list(snapshot), stage_names)
+        parser2 = snapshot['parser2']
+        self.assertEqual(parser2['count'], 3)
+        self.assertEqual(parser2['insertions'], parser2['phonemes_out'] - parser2['phonemes_in'])
+        self.assertGreater(parser2['insertions'], 0)
+        self.assertLessEqual(parser2['p50_seconds'], parser2['max_seconds'])
+        self.assertIn('insert_breath', hooks.aggregator.format_report())
+        hooks.aggregator.reset()
+        self.assertEqual(hooks.aggregator.snapshot(), {})
+
+    def test_with_tracer(self):
+        tracer = Tracer(TRACE_FULL)
+        aggregator = StageAggregator()
+        value = self.values[1]
+        self.assertEqual(parser(value, tracer, StageHooks(aggregator)), parser(value))
+        untimed = Tracer(TRACE_FULL)
+        parser(value, untimed)
+        self.assertEqual(tracer.events, untimed.events)
+        self.assertEqual(aggregator.snapshot()['parser1']['count'], 1)
+
+    def test_allocations(self):
+        was_tracing = tracemalloc.is_tracing()
+        with StageHooks(track_allocations=True) as hooks:
+            parser('/HEHLOW , MAY NEYM IHZ SAEM.' * 20, hooks=hooks)
+        self.assertEqual(tracemalloc.is_tracing(), was_tracing)
+        snapshot = hooks.aggregator.snapshot()
+        self.assertGreater(snapshot['parser2']['max_allocated_bytes'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
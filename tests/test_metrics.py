@@ -0,0 +1,60 @@
+import unittest
+from urllib.error import HTTPError
+from urllib.request import urlopen
+from parser_engine.parser import parser
+from parser_engine.rules import RULE_CH, RULE_VOWEL_R, RULE_PROLONG_PLOSIVE
+from parser_engine.rule_counters import rule_changes, rule_insertions, rule_counts, reset_rule_counters
+from parser_engine.instrumentation import StageHooks
+from parser_engine.metrics import format_prometheus, serve_metrics
+from parser_engine.tracing import Tracer
+
+
+class TestRuleCounters(unittest.TestCase):
+    value = 'CHUW AART, OYL.'
+
+    def setUp(self):
+        reset_rule_counters()
+
+    def test_counts(self):
+        parser(self.value)
+        self.assertEqual(rule_insertions[RULE_CH], 1)
+        self.assertEqual(rule_changes[RULE_CH], 0)
+        self.assertEqual(rule_changes[RULE_VOWEL_R], 1)
+        self.assertEqual(rule_counts()['vowel_r'], (1, 0))
+        parser(self.value, Tracer())
+        self.assertEqual(rule_insertions[RULE_CH], 2)
+        reset_rule_counters()
+        self.assertEqual(set(rule_counts().values()), {(0, 0)})
+
+    def test_prometheus_text(self):
+        hooks = StageHooks()
+        parser(self.value, hooks=hooks)
+        text = format_prometheus(hooks.aggregator)
+        self.assertTrue(text.endswith('\n'))
+        self.assertIn('# TYPE sam_parser_rule_changes_total counter\n', text)
+        self.assertIn('sam_parser_rule_insertions_total{rule="ch",stage="parser2"} 1\n', text)
+        prolong = rule_insertions[RULE_PROLONG_PLOSIVE]
+        self.assertIn(
+            f'sam_parser_rule_insertions_total{{rule="prolong_plosive",stage="prolong_plosive_stop_consonants"}} '
+            f'{prolong}\n', text)
+        self.assertIn('sam_parser_stage_seconds_bucket{stage="parser2",le="+Inf"} 1\n', text)
+        self.assertIn('sam_parser_stage_seconds_count{stage="insert_breath"} 1\n', text)
+        self.assertNotIn('stage_seconds', format_prometheus())
+
+    def test_http(self):
+        server = serve_metrics(0)
+        try:
+            parser(self.value)
+            url = f'http://127.0.0.1:{server.server_address[1]}'
+            with urlopen(url + '/metrics') as response:
+                self.assertTrue(response.headers['Content-Type'].startswith('text/plain'))
+                self.assertEqual(response.read().decode('utf-8'), format_prometheus())
+            with self.assertRaises(HTTPError):
+                urlopen(url + '/other')
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import pickle
+import sys
+import unittest
+from parser_engine.flag_tables import np
+from parser_engine.packed import PackedPhonemes
+from parser_engine.parser import parser
+from render_engine.render import render
+
+
+class TestPackedPhonemes(unittest.TestCase):
+    values = ['SAH5KSEHSFUHL', 'PREHNTIHS', '/HEHLOW , MAY NEYM IHZ SAEM.', 'KAHMPYUWTER']
+
+    def test_parser_output(self):
+        for value in self.values:
+            with self.subTest(value = value):
+                expected = parser(value)
+                packed = parser(value, packed=True)
+                self.assertIsInstance(packed, PackedPhonemes)
+                self.assertEqual(len(packed), len(expected))
+                self.assertEqual(list(packed), expected)
+                self.assertEqual(packed, expected)
+                self.assertEqual(packed.to_list(), expected)
+                self.assertEqual(packed[0], expected[0])
+                self.assertEqual(packed[-1], expected[-1])
+                self.assertEqual(list(packed[1:4]), expected[1:4])
+                self.assertEqual(list(packed[::2]), expected[::2])
+                self.assertEqual(packed.data, bytes(value for phoneme in expected for value in phoneme))
+        self.assertIs(parser('', packed=True), False)
+
+    def test_sequence(self):
+        packed = PackedPhonemes.from_tuples([(1, 2, 3), (4, 5, 6)])
+        self.assertEqual(packed, PackedPhonemes(bytearray(b'\x01\x02\x03\x04\x05\x06')))
+        self.assertEqual(hash(packed), hash(PackedPhonemes(bytearray(packed.data))))
+        self.assertNotEqual(packed, [(1, 2, 3)])
+        self.assertEqual(len(PackedPhonemes()), 0)
+        self.assertEqual([column.tolist() for column in packed.columns()], [[1, 4], [2, 5], [3, 6]])
+        with self.assertRaises(IndexError):
+            packed[2]
+        with self.assertRaises(ValueError):
+            PackedPhonemes(b'\x01\x02')
+
+    def test_read_only(self):
+        data = bytearray(b'\x01\x02\x03')
+        packed = PackedPhonemes(data)
+        with self.assertRaises(TypeError):
+            packed.data[0] = 9
+        # The wrapped object is shared, not copied
+        data[0] = 9
+        self.assertEqual(packed[0], (9, 2, 3))
+
+    @unittest.skipIf(sys.version_info < (3, 12), 'the buffer protocol for Python classes needs Python 3.12')
+    def test_buffer_protocol(self):
+        packed = parser('/HEHLOW', packed=True)
+        self.assertEqual(bytes(memoryview(packed)), packed.data)
+
+    def test_pickle(self):
+        packed = parser('/HEHLOW , MAY NEYM IHZ SAEM.', packed=True)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol = protocol):
+                self.assertEqual(pickle.loads(pickle.dumps(packed, protocol)), packed)
+        buffers = []
+        data = pickle.dumps(packed, 5, buffer_callback=buffers.append)
+        self.assertEqual(len(buffers), 1)
+        self.assertNotIn(packed.data, data)
+        restored = pickle.loads(data, buffers=buffers)
+        self.assertEqual(restored, packed)
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_numpy(self):
+        expected = parser('/HEHLOW , MAY NEYM IHZ SAEM.')
+        array = parser('/HEHLOW , MAY NEYM IHZ SAEM.', packed=True).to_numpy()
+        self.assertEqual(array.dtype.names, ('phoneme', 'length', 'stress'))
+        self.assertEqual(array['phoneme'].tolist(), [phoneme for phoneme, _, _ in expected])
+        self.assertEqual(array['length'].tolist(), [length for _, length, _ in expected])
+        self.assertEqual(array['stress'].tolist(), [stress for _, _, stress in expected])
+        self.assertFalse(array.flags.writeable)
+
+    def test_render(self):
+        value = '/HEHLOW , MAY NEYM IHZ SAEM.'
+        self.assertEqual(render(parser(value, packed=True)).tolist(), render(parser(value)).tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
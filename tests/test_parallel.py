@@ -0,0 +1,49 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from benchmarks.corpus import synthetic_input
+from parser_engine.batch import init_worker
+from parser_engine.parallel import Tokens, parse_parallel, split_tasks
+from parser_engine.parse1 import parser1
+from parser_engine.parser import parser
+
+
+class TestParseParallel(unittest.TestCase):
+    def test_same_as_parser(self):
+        with ThreadPoolExecutor(4) as executor:
+            for seed in range(10):
+                text = synthetic_input(5000 + 3000 * seed, seed)
+                with self.subTest(seed = seed):
+                    self.assertEqual(parse_parallel(text, 4, executor), parser(text))
+
+    def test_stopped_lengthening(self):
+        # Punctuation at position 1 stops adjust_lengths for the whole input, which changes the cut points
+        text = 'AH. ' + synthetic_input(8000, 3)
+        with ThreadPoolExecutor(4) as executor:
+            self.assertEqual(parse_parallel(text, 4, executor), parser(text))
+
+    def test_process_pool(self):
+        text = synthetic_input(20000, 1)
+        self.assertEqual(parse_parallel(text, 2), parser(text))
+        with ProcessPoolExecutor(2, initializer=init_worker) as executor:
+            self.assertEqual(parse_parallel(text, 2, executor), parser(text))
+
+    def test_split_tasks(self):
+        text = synthetic_input(20000, 2)
+        tokens = Tokens()
+        parser1(text, tokens.add_phoneme, tokens.add_stress)
+        tasks = split_tasks(tokens, 10, False, 1024)
+        self.assertGreater(len(tasks), 5)
+        self.assertEqual(b''.join(phonemes for phonemes, _, _ in tasks), bytes(tokens.phonemes[10:]))
+        for phonemes, _, _ in tasks[:-1]:
+            self.assertGreaterEqual(len(phonemes), 1024)
+
+    def test_short_and_failing_inputs(self):
+        with ThreadPoolExecutor(2) as executor:
+            self.assertIs(parse_parallel('', 2, executor), False)
+            self.assertEqual(parse_parallel('/HEHLOW', 2, executor), parser('/HEHLOW'))
+            with self.assertRaisesRegex(Exception, 'Could not parse char'):
+                parse_parallel(synthetic_input(8000, 4) + 'bad input', 2, executor)
+
+
+if __name__ == '__main__':
+    unittest.main()
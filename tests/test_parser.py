@@ -1,5 +1,6 @@
 import unittest
 from parser_engine.parser import parser
+from fixture_reader import load_fixture
 
 class Test(unittest.TestCase):
     def test_parser(self):
@@ -22,5 +23,14 @@ class Test(unittest.TestCase):
                 result = parser(value)
                 self.assertIsNot(result, False, 'Parser did not succeed')
 
+    def test_parser_with_fixtures(self):
+        files = ['parser-1.json']
+        for file in files:
+            test_data = load_fixture(file)
+            for test in test_data:
+                with self.subTest(value = test['input']):
+                    result = parser(test['input'])
+                    self.assertEqual([list(item) for item in result], test['output'], 'Output mismatches')
+
 if __name__ == '__main__':
     unittest.main()
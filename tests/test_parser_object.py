@@ -0,0 +1,72 @@
+import unittest
+from threading import Thread
+from parser_engine.parser import Parser, parser, run_parser
+from parser_engine.phoneme_buffer import PhonemeBuffer
+
+
+def parse_fresh(input_string):
+    return run_parser(PhonemeBuffer(len(input_string) + 1), input_string, None, None, False)
+
+
+class TestParser(unittest.TestCase):
+    values = ['SAH5KSEHSFUHL', 'PREHNTIHS', '/HEHLOW , MAY NEYM IHZ SAEM.', 'KAHMPYUWTER', 'WIHZAA5RD']
+
+    def test_reuse(self):
+        instance = Parser(8)
+        for value in self.values * 3:
+            with self.subTest(value = value):
+                self.assertEqual(instance.parse(value), parse_fresh(value))
+                self.assertEqual(instance.parse(value, packed=True), parse_fresh(value))
+        self.assertIs(instance.parse(''), False)
+
+    def test_reuse_after_error(self):
+        instance = Parser()
+        with self.assertRaises(Exception):
+            instance.parse('.HEHLOW')
+        self.assertFalse(instance.busy)
+        self.assertEqual(instance.parse('/HEHLOW'), parse_fresh('/HEHLOW'))
+
+    def test_max_capacity(self):
+        instance = Parser(16, max_capacity=64)
+        buffer = instance.buffer
+        instance.parse('/HEHLOW')
+        self.assertIs(instance.buffer, buffer)
+        value = '/HEHLOW , MAY NEYM IHZ SAEM. ' * 10
+        self.assertEqual(instance.parse(value), parse_fresh(value))
+        self.assertIsNot(instance.buffer, buffer)
+        self.assertEqual(instance.buffer.capacity, 16)
+
+    def test_nested_parse(self):
+        instance = Parser()
+
+        class Hooks:
+            results = []
+
+            def stage_started(self, name, buffer):
+                if name == 'truncate':
+                    self.results.append(instance.parse('KAHMPYUWTER'))
+
+            def stage_finished(self, name, buffer, token):
+                pass
+
+        self.assertEqual(instance.parse('/HEHLOW', hooks=Hooks()), parse_fresh('/HEHLOW'))
+        self.assertEqual(Hooks.results, [parse_fresh('KAHMPYUWTER')])
+
+    def test_threads(self):
+        results = {}
+
+        def work(index):
+            results[index] = [parser(value) for value in self.values * 20]
+
+        threads = [Thread(target=work, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        expected = [parse_fresh(value) for value in self.values * 20]
+        for index in range(4):
+            self.assertEqual(results[index], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
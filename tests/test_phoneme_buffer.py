@@ -0,0 +1,75 @@
+import unittest
+from common.constants import END
+from parser_engine.phoneme_buffer import PhonemeBuffer
+
+
+class TestPhonemeBuffer(unittest.TestCase):
+    def make_buffer(self, phonemes, capacity=2):
+        buffer = PhonemeBuffer(capacity)
+        for phoneme in phonemes:
+            buffer.append_phoneme(phoneme)
+        buffer.append_phoneme(END)
+        return buffer
+
+    def test_append_grows_capacity(self):
+        buffer = self.make_buffer(range(1, 40))
+        self.assertEqual(len(buffer), 40)
+        self.assertGreaterEqual(buffer.capacity, 40)
+        self.assertEqual([buffer.get_phoneme(i) for i in range(39)], list(range(1, 40)))
+        self.assertEqual(buffer.get_phoneme(39), END)
+
+    def test_stress_applies_to_last_phoneme(self):
+        buffer = PhonemeBuffer()
+        with self.assertRaises(IndexError):
+            buffer.set_last_stress(4)
+        buffer.append_phoneme(9)
+        buffer.set_last_stress(4)
+        buffer.append_phoneme(10)
+        self.assertEqual((buffer.get_stress(0), buffer.get_stress(1)), (4, 0))
+
+    def test_insert_shifts_all_columns(self):
+        buffer = self.make_buffer([5, 6, 7])
+        buffer.set_length(1, 9)
+        buffer.set_stress(1, 3)
+        buffer.insert_phoneme(1, 20, 2, 4)
+        self.assertEqual(buffer.to_list(), [(5, 0, 0), (20, 4, 2), (6, 9, 3), (7, 0, 0), (END, 0, 0)])
+
+    def test_extend_columns(self):
+        buffer = PhonemeBuffer(2)
+        buffer.append_phoneme(5)
+        buffer.insert_phoneme(0, 4, 1)  # Leaves the gap in front of 5
+        buffer.extend_columns(b'\x06\x07\x08', b'\x01\x02\x03', b'\x00\x04\x00')
+        buffer.append_phoneme(END)
+        self.assertEqual(buffer.to_list(), [(4, 0, 1), (5, 0, 0), (6, 1, 0), (7, 2, 4), (8, 3, 0), (END, 0, 0)])
+        with self.assertRaises(ValueError):
+            buffer.extend_columns(b'\x01', b'', b'\x01')
+
+    def test_get_phoneme_out_of_bounds(self):
+        buffer = self.make_buffer([5])
+        with self.assertRaises(ValueError):
+            buffer.get_phoneme(-1)
+        with self.assertRaises(ValueError):
+            buffer.get_phoneme(2)
+
+    def test_set_length_rejects_flag(self):
+        buffer = self.make_buffer([5])
+        with self.assertRaises(ValueError):
+            buffer.set_length(0, 0x80)
+        with self.assertRaises(ValueError):
+            buffer.set_length(0, -1)
+
+    def test_view_is_zero_copy(self):
+        buffer = self.make_buffer([5, 6])
+        phonemes, lengths, stress = buffer.view()
+        self.assertEqual(bytes(phonemes), bytes([5, 6, END]))
+        buffer.set_length(1, 7)
+        self.assertEqual(lengths[1], 7)
+
+    def test_truncate_invalid(self):
+        buffer = self.make_buffer([5, 90, 6])
+        self.assertEqual(buffer.truncate_invalid(80), 1)
+        self.assertEqual(buffer.get_phoneme(1), END)
+
+
+if __name__ == '__main__':
+    unittest.main()
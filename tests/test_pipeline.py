@@ -0,0 +1,77 @@
+import unittest
+from parser_engine.instrumentation import StageAggregator, StageHooks
+from parser_engine.parser import parser
+from parser_engine.pipeline import Pipeline, make_stage, DEFAULT_PIPELINE, FUSED_PIPELINE, VECTORIZED_PIPELINE
+from parser_engine.pipeline import PARSER2, COPY_STRESS, COPY_STRESS_AND_SET_PHONEME_LENGTH
+from parser_engine.tracing import Tracer
+
+
+class TestPipeline(unittest.TestCase):
+    values = ['SAH5KSEHSFUHL', '/HEHLOW , MAY NEYM IHZ SAEM.', 'IHZ KAORREHKT, PLEY5 AXGEH4N? AOR DUW YUW PRIY4FER PAONX?']
+
+    def test_predefined_pipelines(self):
+        long_value = ' '.join(self.values) * 10
+        for pipeline in (DEFAULT_PIPELINE, FUSED_PIPELINE, VECTORIZED_PIPELINE):
+            for value in self.values + [long_value]:
+                with self.subTest(pipeline = pipeline, value = value):
+                    self.assertEqual(pipeline.parse(value), parser(value))
+                    self.assertEqual(pipeline.parser(8).parse(value, packed=True), parser(value))
+
+    def test_traced(self):
+        value = self.values[2]
+        tracers = {}
+        for pipeline in (DEFAULT_PIPELINE, FUSED_PIPELINE, VECTORIZED_PIPELINE):
+            tracers[pipeline] = Tracer()
+            self.assertEqual(pipeline.parse(value, tracers[pipeline]), parser(value))
+        expected = Tracer()
+        parser(value, expected)
+        self.assertEqual(tracers[DEFAULT_PIPELINE].events, expected.events)
+        # The vectorized stages are traced by running their callback versions
+        self.assertEqual(tracers[VECTORIZED_PIPELINE].events, tracers[FUSED_PIPELINE].events)
+        self.assertIn('copy_stress_and_set_phoneme_length', {event.stage for event in tracers[FUSED_PIPELINE].events})
+
+    def test_hooks(self):
+        aggregator = StageAggregator()
+        pipeline = FUSED_PIPELINE.without('insert_breath')
+        pipeline.parse(self.values[1], hooks=StageHooks(aggregator))
+        self.assertEqual(list(aggregator.snapshot()), ['parser1'] + pipeline.names())
+
+    def test_until(self):
+        pipeline = DEFAULT_PIPELINE.until('parser2')
+        self.assertEqual(pipeline.names(), ['parser2'])
+        result = pipeline.parse('/HEHLOW')
+        self.assertEqual([phoneme for phoneme, _, _ in result], [36, 7, 19, 52, 20, 255])
+        self.assertEqual({(length, stress) for _, length, stress in result}, {(0, 0)})
+        self.assertEqual(FUSED_PIPELINE.until('copy_stress').names(), ['parser2', 'copy_stress_and_set_phoneme_length'])
+
+    def test_without(self):
+        pipeline = DEFAULT_PIPELINE.without('insert_breath', 'truncate')
+        self.assertNotIn('insert_breath', pipeline.names())
+        self.assertEqual(pipeline.parse('/HEHLOW'), parser('/HEHLOW'))
+        with self.assertRaisesRegex(ValueError, 'requires copy_stress'):
+            DEFAULT_PIPELINE.without('copy_stress')
+        with self.assertRaisesRegex(ValueError, 'No stage'):
+            DEFAULT_PIPELINE.without('reciter')
+
+    def test_replace(self):
+        self.assertEqual(DEFAULT_PIPELINE.replace('copy_stress', COPY_STRESS_AND_SET_PHONEME_LENGTH).names(),
+                         FUSED_PIPELINE.names())
+        calls = []
+
+        def run_counted(buffer):
+            calls.append(len(buffer))
+            COPY_STRESS.run(buffer)
+
+        pipeline = DEFAULT_PIPELINE.replace('copy_stress', make_stage('counted', run_counted, provides=['copy_stress']))
+        self.assertEqual(pipeline.parse('/HEHLOW'), parser('/HEHLOW'))
+        self.assertEqual(calls, [6])
+
+    def test_validation(self):
+        with self.assertRaisesRegex(ValueError, 'requires parser2'):
+            Pipeline([COPY_STRESS, PARSER2])
+        with self.assertRaisesRegex(ValueError, 'repeats copy_stress'):
+            Pipeline([PARSER2, COPY_STRESS, COPY_STRESS_AND_SET_PHONEME_LENGTH])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from parser_engine.parser import parser
+from reciter_engine.reciter import Reciter, convert, compile_rule, measure_throughput, text_to_phonemes
+
+
+class TestReciter(unittest.TestCase):
+    values = {
+        'Hello, my name is SAM.': '/HEHLOW, MAY NEYM IHZ SAEM.',
+        'The cat': 'DHAX KAET',
+        'the apple': 'DHIY AEPUL',
+        'Nation': 'NEY5SHUN',
+        'knight': 'NAY4T',
+        'I am a computer.': 'AY4 AEM AH KAHMPYUWTER.',
+        '3.5': ' THRIY4 POYNT FAY4V',
+    }
+
+    def test_text_to_phonemes(self):
+        for text, expected in self.values.items():
+            with self.subTest(text = text):
+                self.assertEqual(text_to_phonemes(text), expected)
+
+    def test_output_can_be_parsed(self):
+        for text in self.values:
+            with self.subTest(text = text):
+                self.assertTrue(parser(text_to_phonemes(text)))
+
+    def test_rule_contexts(self):
+        rule = compile_rule('#:^(L)%=UL')
+        self.assertEqual(rule.match, 'L')
+        # The prefix is matched against the reversed text
+        self.assertIsNotNone(rule.prefix.match('ABL'[::-1], 1))
+        self.assertIsNone(rule.prefix.match('BBL'[::-1], 1))
+        self.assertIsNotNone(rule.suffix.match('LING', 1))
+        rule = compile_rule('(=)= IY4KWULZ')
+        self.assertEqual((rule.match, rule.phonemes), ('=', ' IY4KWULZ'))
+        self.assertTrue(compile_rule(' (THE) #=DHIY').crosses_boundary)
+        self.assertFalse(compile_rule(' :(A)^+ =EY4').crosses_boundary)
+
+    def test_cache_matches_whole_text(self):
+        text = 'THE APPLE AND THE  ORANGE, THE END. THE 64 THEATERS OF THE UNITED STATES'
+        reciter = Reciter(cache_size=16)
+        for _ in range(2):
+            self.assertEqual(reciter.text_to_phonemes(text), convert(' ' + text + ' ', 1, len(text) + 1)[0])
+        self.assertGreater(reciter.cache_info().hits, 0)
+        self.assertIsNone(Reciter(cache_size=0).cache_info())
+
+    def test_throughput(self):
+        throughput = measure_throughput('Hello, my name is SAM.', rounds=2)
+        self.assertEqual(throughput.words, 10)
+        self.assertGreater(throughput.words_per_second, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
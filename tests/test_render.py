@@ -0,0 +1,57 @@
+import time
+import unittest
+from common.constants import BREAK, END
+from parser_engine.parser import parser
+
+try:
+    import numpy as np
+    from render_engine.frames import NOISE_NONE, NOISE_UNVOICED, breath_groups, create_frames
+    from render_engine.render import SAMPLE_RATE, render, synthesize
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestRender(unittest.TestCase):
+    text = '/HEHLOW , MAY NEYM IHZ SAEM. AY AEM AH KAHMPYUWTER?'
+
+    def test_breath_groups(self):
+        phonemes = [(0, 0, 0), (9, 5, 4), (BREAK, 0, 0), (BREAK, 0, 0), (32, 2, 0), (END, 0, 0), (9, 5, 4)]
+        self.assertEqual(list(breath_groups(phonemes)), [[(9, 5, 4)], [(32, 2, 0)]])
+
+    def test_frames(self):
+        group = [(9, 10, 4), (32, 5, 0)]  # AA S*
+        frames = create_frames(group)
+        self.assertEqual(len(frames.pitch), 15)
+        for values in frames:
+            self.assertEqual(len(values), 15)
+        self.assertEqual(frames.noise[0], NOISE_NONE)
+        self.assertEqual(frames.noise[-1], NOISE_UNVOICED)
+        # The formants are blended across the boundary
+        self.assertGreater(len(set(frames.frequency2.tolist())), 2)
+
+    def test_synthesize(self):
+        frames = create_frames([(9, 10, 4)])
+        ticks = synthesize(frames, speed=10)
+        self.assertEqual(len(ticks), 100)
+        self.assertLessEqual(int(ticks.max()), 15)
+
+    def test_render(self):
+        phonemes = parser(self.text)
+        samples = render(phonemes)
+        self.assertEqual(samples.dtype, np.uint8)
+        self.assertGreater(len(samples), SAMPLE_RATE)
+        self.assertTrue((samples == render(phonemes)).all())
+        self.assertGreater(len(render(phonemes, speed=100)), len(samples))
+        self.assertEqual(len(render(False)), 0)
+
+    def test_faster_than_real_time(self):
+        phonemes = parser(self.text * 5)
+        start = time.perf_counter()
+        samples = render(phonemes)
+        elapsed = time.perf_counter() - start
+        self.assertGreater(len(samples) / SAMPLE_RATE / elapsed, 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
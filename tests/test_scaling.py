@@ -0,0 +1,35 @@
+import os
+import unittest
+from benchmarks.scaling import measure_scaling, superlinear_stages, fit_exponent, n_log_n_exponent, STAGE_NAMES
+
+
+class TestScaling(unittest.TestCase):
+    def test_fit_exponent(self):
+        sizes = [1000, 3000, 10000, 30000]
+        self.assertAlmostEqual(fit_exponent(sizes, [3 * size for size in sizes]), 1.0)
+        self.assertAlmostEqual(fit_exponent(sizes, [size * size for size in sizes]), 2.0)
+        self.assertTrue(1.0 < n_log_n_exponent(sizes) < 1.2)
+        with self.assertRaises(ValueError):
+            fit_exponent([10, 10], [1, 2])
+
+    def test_results_and_memory_scale_at_most_n_log_n(self):
+        # Peak memory does not depend on the load of the machine, the runtimes are only checked below
+        results = measure_scaling(sizes=(1000, 3000, 10000, 30000), repeat=1)
+        self.assertEqual([result.stage for result in results], list(STAGE_NAMES))
+        for result in results:
+            self.assertEqual(len(result.phonemes), 4)
+            self.assertEqual(len(result.seconds), 4)
+            self.assertEqual(len(result.peak_bytes), 4)
+            self.assertLessEqual(result.memory_exponent, result.limit,
+                                 f'{result.stage} memory grows faster than O(n log n)')
+
+    # Runtime exponents are skewed by anything else running on the machine, python -m benchmarks.scaling is the gate
+    @unittest.skipUnless(os.environ.get('SAM_TIMING_TESTS'), 'set SAM_TIMING_TESTS=1 to run wall clock tests')
+    def test_stages_scale_at_most_n_log_n(self):
+        results = measure_scaling(sizes=(1000, 3000, 10000, 30000), repeat=3)
+        for result in superlinear_stages(results):
+            self.fail(f'{result.stage} grows faster than O(n log n): runtime exponent {result.time_exponent:.2f}, '
+                      f'memory exponent {result.memory_exponent:.2f}, limit {result.limit:.2f}')
+
+if __name__ == '__main__':
+    unittest.main()
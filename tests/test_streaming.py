@@ -0,0 +1,63 @@
+import random
+import unittest
+from common.constants import END
+from parser_engine.parser import parser
+from parser_engine.streaming import StreamingParser, parse_stream
+
+
+class TestStreamingParser(unittest.TestCase):
+    words = ['SAH5KSEHSFUHL', 'PREHNTIHS', 'AENIHZAAGAEMAXS', '/HEHLOW', 'KAHMPYUWTER', 'WIHZAA5RD', 'DHAX', 'KAET',
+             'AH5GLIY', 'JAH5ST', 'TEHSTIHNX', 'NUW', 'CHUW', 'OYL', 'TRAEK', 'DRAY', 'SPAY', 'PAARTIY', 'AWEY']
+    separators = [' ', ' ', ' ', ', ', '. ', '? ', ' - ']
+
+    def random_text(self, rng, words):
+        return ''.join(rng.choice(self.words) + rng.choice(self.separators) for _ in range(words))
+
+    def random_chunks(self, rng, text):
+        chunks = []
+        pos = 0
+        while pos < len(text):
+            size = rng.randint(1, 12)
+            chunks.append(text[pos:pos + size])
+            pos += size
+        return chunks
+
+    def test_same_as_parser(self):
+        rng = random.Random(1)
+        for i in range(100):
+            text = 'AH5 ' + self.random_text(rng, rng.randint(1, 80))
+            with self.subTest(text = text):
+                self.assertEqual(list(parse_stream(self.random_chunks(rng, text))), parser(text))
+
+    def test_single_characters(self):
+        text = '/HEHLOW , MAY NEYM IHZ SAEM. KAHMPYUWTER? AH5GLIY'
+        self.assertEqual(list(parse_stream(text)), parser(text))
+
+    def test_emits_before_close(self):
+        rng = random.Random(2)
+        text = 'AH5 ' + self.random_text(rng, 400)
+        streaming_parser = StreamingParser()
+        early = []
+        for chunk in self.random_chunks(rng, text):
+            early += streaming_parser.feed(chunk)
+            self.assertLess(len(streaming_parser.breath.buffer), 300)
+        rest = streaming_parser.close()
+        self.assertGreater(len(early), len(rest))
+        self.assertEqual(rest[-1][0], END)
+        self.assertEqual(early + rest, parser(text))
+
+    def test_empty(self):
+        self.assertEqual(list(parse_stream([])), [])
+        self.assertEqual(list(parse_stream(['', ''])), [])
+
+    def test_errors(self):
+        with self.assertRaises(Exception):
+            list(parse_stream(['AH5 ', 'bad input']))
+        streaming_parser = StreamingParser()
+        streaming_parser.close()
+        with self.assertRaises(ValueError):
+            streaming_parser.feed('AH')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from parser_engine.parser import parser
+from parser_engine.rules import RULE_CH, RULE_VOWEL_R, rule_names, rule_descriptions, RULE_COUNT
+from parser_engine.tracing import Tracer, TRACE_OFF, TRACE_RULES, TRACE_FULL, EVENT_DUMP, format_event
+
+
+class TestTracing(unittest.TestCase):
+    value = 'CHUW AART, OYL.'
+
+    def test_rule_tables(self):
+        self.assertEqual(len(rule_names), RULE_COUNT)
+        self.assertEqual(len(rule_descriptions), RULE_COUNT)
+        self.assertEqual(len(set(rule_names)), RULE_COUNT)
+
+    def test_tracing_does_not_change_result(self):
+        expected = parser(self.value)
+        for level in (TRACE_OFF, TRACE_RULES, TRACE_FULL):
+            with self.subTest(level = level):
+                self.assertEqual(parser(self.value, Tracer(level)), expected)
+
+    def test_off_level_emits_nothing(self):
+        tracer = Tracer(TRACE_OFF)
+        parser(self.value, tracer)
+        self.assertEqual(tracer.events, [])
+
+    def test_rule_events(self):
+        tracer = Tracer(TRACE_RULES)
+        parser(self.value, tracer)
+        self.assertTrue(all(event.rule is not None for event in tracer.events))
+        self.assertIn(('parser2', 'insert', 1, RULE_CH, None, 43), tracer.events)
+        self.assertIn(('parser2', 'change', 6, RULE_VOWEL_R, 23, 18), tracer.events)
+
+    def test_full_events(self):
+        events = []
+        parser(self.value, Tracer(TRACE_FULL, events.append))
+        dumps = [event for event in events if event.event == EVENT_DUMP]
+        self.assertEqual(len(dumps), 2)
+        self.assertEqual(dumps[-1].new, parser(self.value))
+        self.assertTrue(any(event.rule is None for event in events))
+        for event in events:
+            self.assertIsInstance(format_event(event), str)
+
+
+if __name__ == '__main__':
+    unittest.main()
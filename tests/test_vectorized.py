@@ -0,0 +1,80 @@
+import random
+import unittest
+from benchmarks.corpus import synthetic_input
+from common.constants import END
+from parser_engine.flag_tables import np
+from parser_engine.phoneme_buffer import PhonemeBuffer
+from parser_engine.parser import parser, parser1, FUSED_STAGES, VECTORIZED_STAGES
+from parser_engine.parser import run_copy_stress, run_set_phoneme_length, run_adjust_lengths
+from parser_engine.parser import run_copy_stress_and_set_phoneme_length
+from parser_engine.rule_counters import rule_changes, reset_rule_counters
+from parser_engine.constants import MIN_VECTORIZED_LENGTH
+from parser_engine.vectorized import vectorized_copy_stress, vectorized_set_phoneme_length
+from parser_engine.vectorized import vectorized_copy_stress_and_set_phoneme_length, vectorized_adjust_lengths
+
+
+def run_stage(run, phonemes):
+    """
+    :param run: The stage
+    :param phonemes: List of (phoneme, stress, length) tuples
+    :return: Tuple of (buffer contents or the type of the exception raised, rule change counters)
+    """
+    reset_rule_counters()
+    buffer = PhonemeBuffer(3)
+    for phoneme, stress, length in phonemes:
+        buffer.insert_phoneme(len(buffer), phoneme, stress, length)
+    buffer.append_phoneme(END)
+    try:
+        run(buffer)
+        result = buffer.to_list()
+    except Exception as e:
+        result = type(e)
+    return result, list(rule_changes)
+
+
+def parse_with(stages, input_string):
+    buffer = PhonemeBuffer()
+    parser1(input_string, buffer.append_phoneme, buffer.set_last_stress)
+    buffer.append_phoneme(END)
+    for _, run in stages:
+        run(buffer)
+    return buffer.to_list()
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestVectorizedStages(unittest.TestCase):
+    def tearDown(self):
+        reset_rule_counters()
+
+    def test_random_buffers(self):
+        rng = random.Random(17)
+        phonemes = list(range(80)) + [0, 0, 18, 19, 27, 28, 29, 54, 55, 66, 70]
+        stresses = [0] * 4 + list(range(1, 9)) + [0x7F, 0x80, 0x85]
+        lengths = [0, 1, 2, 3, 5, 8, 10, 12, 15, 20, 60, 100, 126, 127]
+        pairs = (
+            (run_copy_stress, vectorized_copy_stress),
+            (run_set_phoneme_length, vectorized_set_phoneme_length),
+            (run_copy_stress_and_set_phoneme_length, vectorized_copy_stress_and_set_phoneme_length),
+            (run_adjust_lengths, vectorized_adjust_lengths),
+        )
+        for _ in range(1500):
+            buffer = [(rng.choice(phonemes), rng.choice(stresses), rng.choice(lengths))
+                      for _ in range(rng.randint(0, 50))]
+            for scalar, vectorized in pairs:
+                with self.subTest(stage = scalar.__name__, phonemes = buffer):
+                    self.assertEqual(run_stage(vectorized, buffer), run_stage(scalar, buffer))
+
+    def test_long_inputs(self):
+        for seed in range(20):
+            input_string = synthetic_input(1000 + 100 * seed, seed)
+            with self.subTest(seed = seed):
+                self.assertEqual(parse_with(VECTORIZED_STAGES, input_string), parse_with(FUSED_STAGES, input_string))
+
+    def test_parser_uses_vectorized_stages(self):
+        value = 'LOY5TER KAHMPYUWTER, /HEHLOW. ' * (MIN_VECTORIZED_LENGTH // 20)
+        self.assertGreaterEqual(len(value), MIN_VECTORIZED_LENGTH)
+        self.assertEqual(parser(value), parse_with(FUSED_STAGES, value))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import io
+import os
+import tempfile
+import unittest
+import wave
+from array import array
+from util_package.util_file import (
+    text_to_uint8_array, uint8_array_to_text, uint32_to_uint8_array, uint16_to_uint8_array, set_uint32
+)
+from util_package.wav_writer import WavWriter, MappedWavWriter, write_wav, HEADER_SIZE
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TestUtilFile(unittest.TestCase):
+    def test_text(self):
+        self.assertEqual(text_to_uint8_array('SAM'), bytearray(b'SAM'))
+        self.assertEqual(uint8_array_to_text(bytearray(b'SAM')), 'SAM')
+
+    def test_integers(self):
+        self.assertEqual(uint32_to_uint8_array(0x12345678), bytearray(b'\x78\x56\x34\x12'))
+        self.assertEqual(uint16_to_uint8_array(0x1234), bytearray(b'\x34\x12'))
+        self.assertEqual(uint16_to_uint8_array(0x12345), bytearray(b'\x45\x23'))
+        buffer = bytearray(6)
+        set_uint32(buffer, 1, 0x12345678)
+        self.assertEqual(buffer, bytearray(b'\x00\x78\x56\x34\x12\x00'))
+
+
+class TestWavWriter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'out.wav')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self, source):
+        with wave.open(source, 'rb') as wav:
+            return wav.getframerate(), wav.getsampwidth(), wav.getnchannels(), wav.readframes(wav.getnframes())
+
+    def test_8_bit_chunks(self):
+        with WavWriter(self.path, 22050, 1) as writer:
+            writer.write(b'\x80\x81')
+            writer.write(bytearray(b'\x82'))
+            writer.write(memoryview(b'\x83\x84'))
+        self.assertEqual(self.read(self.path), (22050, 1, 1, b'\x80\x81\x82\x83\x84'))
+        self.assertEqual(os.path.getsize(self.path), HEADER_SIZE + 6)  # padded to an even size
+
+    def test_16_bit(self):
+        samples = array('h', [0, 1000, -1000, 32767])
+        buffer = io.BytesIO()
+        write_wav(buffer, samples, 16000, 2)
+        buffer.seek(0)
+        self.assertEqual(self.read(buffer), (16000, 2, 1, samples.tobytes()))
+        with self.assertRaises(ValueError):
+            WavWriter(io.BytesIO(), sample_width=3)
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_numpy(self):
+        samples = np.arange(-500, 500, 7, dtype=np.int16)
+        with WavWriter(self.path, sample_width=2) as writer:
+            writer.write(samples[:50])
+            writer.write(samples[50:][::-1])  # not contiguous
+            with self.assertRaises(ValueError):
+                writer.write(np.zeros(4, dtype=np.uint8))
+        expected = np.concatenate([samples[:50], samples[50:][::-1]])
+        self.assertEqual(self.read(self.path)[3], expected.astype('<i2').tobytes())
+
+    def test_mapped(self):
+        with MappedWavWriter(self.path, 4, 22050, 1) as writer:
+            writer.write(b'\x80\x81\x82')
+            with writer.samples(3) as target:
+                target[:] = b'\x90\x91\x92'
+            writer.write(bytes(range(100)))  # grows the file
+        self.assertEqual(self.read(self.path)[3], b'\x80\x81\x82\x90\x91\x92' + bytes(range(100)))
+        self.assertEqual(os.path.getsize(self.path), HEADER_SIZE + 106)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,10 @@
+import struct
+
+# Little endian, as used by RIFF/WAV files
+UINT32 = struct.Struct('<I')
+UINT16 = struct.Struct('<H')
+
+
 def matches_bitmask(bits, mask):
     """
     Test if a bit is set.
@@ -16,10 +23,7 @@ def text_to_uint8_array(text):
     :param text: The input text string
     :return: Uint8Array representing the text
     """
-    buffer = bytearray(len(text))
-    for index, char in enumerate(text):
-        buffer[index] = ord(char)
-    return buffer
+    return bytearray(text, 'latin-1')
 
 
 def uint8_array_to_text(buffer):
@@ -29,8 +33,7 @@ def uint8_array_to_text(buffer):
     :param buffer: The input Uint8Array
     :return: Text string representation of the Uint8Array
     """
-    text = ''.join(chr(byte) for byte in buffer)
-    return text
+    return bytes(buffer).decode('latin-1')
 
 
 def uint32_to_uint8_array(uint32):
@@ -40,12 +43,7 @@ def uint32_to_uint8_array(uint32):
     :param uint32: The input 32-bit integer
     :return: Uint8Array representing the integer
     """
-    result = bytearray(4)
-    result[0] = uint32 & 0xFF
-    result[1] = (uint32 >> 8) & 0xFF
-    result[2] = (uint32 >> 16) & 0xFF
-    result[3] = (uint32 >> 24) & 0xFF
-    return result
+    return bytearray(UINT32.pack(uint32 & 0xFFFFFFFF))
 
 
 def uint16_to_uint8_array(uint16):
@@ -55,7 +53,26 @@ def uint16_to_uint8_array(uint16):
     :param uint16: The input 16-bit integer
     :return: Uint8Array representing the integer
     """
-    result = bytearray(2)
-    result[0] = uint16 & 0xFF
-    result[1] = (uint16 >> 8) & 0xFF
-    return result
+    return bytearray(UINT16.pack(uint16 & 0xFFFF))
+
+
+def set_uint32(buffer, offset, uint32):
+    """
+    Store a 32-bit integer in a writable buffer, little endian.
+
+    :param buffer: The buffer, for example a bytearray or mmap
+    :param offset: The position of the first byte
+    :param uint32: The 32-bit integer
+    """
+    UINT32.pack_into(buffer, offset, uint32 & 0xFFFFFFFF)
+
+
+def set_uint16(buffer, offset, uint16):
+    """
+    Store a 16-bit integer in a writable buffer, little endian.
+
+    :param buffer: The buffer, for example a bytearray or mmap
+    :param offset: The position of the first byte
+    :param uint16: The 16-bit integer
+    """
+    UINT16.pack_into(buffer, offset, uint16 & 0xFFFF)
@@ -0,0 +1,244 @@
+import mmap
+import os
+import struct
+
+from util_package.util_file import set_uint32
+
+"""
+WAV output.
+
+A WAV file is a RIFF header, a format chunk and a data chunk. The sizes in the RIFF header and the data chunk header
+are only known at the end, the writers reserve the header first and patch the sizes when they are closed.
+"""
+
+HEADER = struct.Struct('<4sI4s4sIHHIIHH4sI')
+HEADER_SIZE = HEADER.size  # 44
+RIFF_SIZE_OFFSET = 4
+DATA_SIZE_OFFSET = 40
+
+# Sizes written to a stream that can not seek back, readers treat them as "until the end of the file"
+UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+def wav_header(sample_rate, sample_width, data_size):
+    """
+    :param sample_rate: The number of samples per second
+    :param sample_width: The number of bytes per sample, 1 (unsigned 8-bit) or 2 (signed 16-bit)
+    :param data_size: The number of bytes of sample data
+    :return: The 44 byte header of a mono PCM WAV file
+    """
+    if sample_width not in (1, 2):
+        raise ValueError('sample_width must be 1 or 2, got ' + str(sample_width))
+    riff_size = min(36 + data_size + (data_size & 1), UNKNOWN_SIZE)
+    return HEADER.pack(
+        b'RIFF', riff_size, b'WAVE',
+        b'fmt ', 16, 1, 1, sample_rate, sample_rate * sample_width, sample_width, sample_width * 8,
+        b'data', min(data_size, UNKNOWN_SIZE)
+    )
+
+
+def as_bytes(data, sample_width):
+    """
+    Get a byte view of PCM samples without copying them.
+
+    :param data: bytes, bytearray, memoryview, array.array or numpy array
+    :param sample_width: The number of bytes per sample
+    :return: memoryview of unsigned bytes
+    """
+    dtype = getattr(data, 'dtype', None)
+    if dtype is not None:
+        if dtype.itemsize != sample_width:
+            raise ValueError(f'Expected {sample_width} byte samples, got {dtype}')
+        if dtype.byteorder == '>' or not data.flags.c_contiguous:
+            data = data.astype(dtype.newbyteorder('<'), order='C')
+    view = memoryview(data)
+    if view.format != 'B' or not view.c_contiguous:
+        view = view.cast('B') if view.c_contiguous else memoryview(view.tobytes())
+    return view
+
+
+class WavWriter:
+    """
+    Streams mono PCM samples to a WAV file or file-like object.
+
+    The header is written first with zero sizes. close() patches the sizes, if the file can seek. Chunks are written
+    as they are, nothing is buffered or copied, so the memory use does not depend on the length of the file.
+
+    16-bit samples are signed and little endian, 8-bit samples are unsigned (128 is silence).
+    """
+
+    def __init__(self, target, sample_rate=22050, sample_width=1):
+        """
+        :param target: A path or a binary file-like object. A file opened from a path is closed by close()
+        :param sample_rate: The number of samples per second
+        :param sample_width: The number of bytes per sample, 1 or 2
+        """
+        header = wav_header(sample_rate, sample_width, 0)
+        if isinstance(target, (str, bytes, os.PathLike)):
+            self.file = open(target, 'wb')
+            self.owns_file = True
+        else:
+            self.file = target
+            self.owns_file = False
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.data_size = 0
+        self.closed = False
+
+        try:
+            self.seekable = self.file.seekable()
+        except AttributeError:
+            self.seekable = False
+        self.start = self.file.tell() if self.seekable else 0
+        if not self.seekable:
+            header = wav_header(sample_rate, sample_width, UNKNOWN_SIZE)
+        self.file.write(header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def sample_count(self):
+        return self.data_size // self.sample_width
+
+    def write(self, data):
+        """
+        Append PCM samples.
+
+        :param data: bytes, bytearray, memoryview, array.array or numpy array of samples
+        """
+        if self.closed:
+            raise ValueError('write() on a closed WavWriter')
+        view = as_bytes(data, self.sample_width)
+        if len(view):
+            self.file.write(view)
+            self.data_size += len(view)
+
+    def close(self):
+        """
+        Pad the data chunk to an even size and patch the sizes in the header.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if self.data_size & 1:
+            self.file.write(b'\0')
+        if self.seekable:
+            end = self.file.tell()
+            self.file.seek(self.start)
+            self.file.write(wav_header(self.sample_rate, self.sample_width, self.data_size))
+            self.file.seek(end)
+        self.file.flush()
+        if self.owns_file:
+            self.file.close()
+
+
+class MappedWavWriter:
+    """
+    Writes mono PCM samples to a memory-mapped WAV file.
+
+    The file is created with room for `capacity` samples and grows when more are written. samples() gives a
+    writable view of the sample data, so a renderer can produce its output directly in the file. close() patches
+    the header and cuts the file to the samples written.
+    """
+
+    def __init__(self, path, capacity, sample_rate=22050, sample_width=1):
+        """
+        :param path: The path of the WAV file
+        :param capacity: The number of samples to reserve
+        :param sample_rate: The number of samples per second
+        :param sample_width: The number of bytes per sample, 1 or 2
+        """
+        header = wav_header(sample_rate, sample_width, 0)
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.data_size = 0
+        self.closed = False
+        self.file = open(path, 'w+b')
+        self.size = HEADER_SIZE + max(capacity, 1) * sample_width
+        self.file.truncate(self.size)
+        self.map = mmap.mmap(self.file.fileno(), self.size)
+        self.map[:HEADER_SIZE] = header
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def sample_count(self):
+        return self.data_size // self.sample_width
+
+    def reserve(self, sample_count):
+        """
+        Make sure the file has room for `sample_count` more samples.
+
+        :param sample_count: The number of samples
+        """
+        needed = HEADER_SIZE + self.data_size + sample_count * self.sample_width
+        if needed <= self.size:
+            return
+        self.size = max(needed, self.size * 2)
+        self.map.resize(self.size)
+
+    def samples(self, sample_count):
+        """
+        Reserve the next `sample_count` samples and return a writable view of them. The samples count as written.
+
+        The view has to be released before the next call to samples(), write() or close().
+
+        :param sample_count: The number of samples
+        :return: memoryview of bytes
+        """
+        if self.closed:
+            raise ValueError('samples() on a closed MappedWavWriter')
+        self.reserve(sample_count)
+        start = HEADER_SIZE + self.data_size
+        self.data_size += sample_count * self.sample_width
+        return memoryview(self.map)[start:start + sample_count * self.sample_width]
+
+    def write(self, data):
+        """
+        Append PCM samples.
+
+        :param data: bytes, bytearray, memoryview, array.array or numpy array of samples
+        """
+        view = as_bytes(data, self.sample_width)
+        with self.samples(len(view) // self.sample_width) as target:
+            target[:] = view
+
+    def close(self):
+        """
+        Patch the sizes in the header and cut the file to the samples written.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        padded_size = HEADER_SIZE + self.data_size + (self.data_size & 1)
+        if padded_size > self.size:
+            self.map.resize(padded_size)
+        if self.data_size & 1:
+            self.map[padded_size - 1] = 0
+        set_uint32(self.map, RIFF_SIZE_OFFSET, 36 + self.data_size + (self.data_size & 1))
+        set_uint32(self.map, DATA_SIZE_OFFSET, self.data_size)
+        self.map.flush()
+        self.map.close()
+        self.file.truncate(padded_size)
+        self.file.close()
+
+
+def write_wav(path, samples, sample_rate=22050, sample_width=1):
+    """
+    Write a complete mono WAV file.
+
+    :param path: A path or a binary file-like object
+    :param samples: bytes, bytearray, memoryview, array.array or numpy array of samples
+    :param sample_rate: The number of samples per second
+    :param sample_width: The number of bytes per sample, 1 or 2
+    """
+    with WavWriter(path, sample_rate, sample_width) as writer:
+        writer.write(samples)